@@ -0,0 +1,8 @@
+"""
+Benchmarks de transferência do NokTech Deploy
+
+Gera árvores sintéticas e faz o deploy delas pelo LocalDeployer e pelos
+deployers SSH e FTP contra servidores asyncssh e aioftp em 127.0.0.1,
+medindo arquivos/s, MB/s e idas e voltas por arquivo. Execute a partir da
+raiz do projeto com python -m benchmarks.
+"""
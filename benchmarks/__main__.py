@@ -0,0 +1,152 @@
+"""
+Benchmark de transferência: python -m benchmarks --help
+"""
+from pathlib import Path
+from typing import List, Optional
+import argparse
+import asyncio
+import sys
+import tempfile
+
+from benchmarks.runner import (
+    TARGETS,
+    BenchmarkResult,
+    baseline_key,
+    compare,
+    format_table,
+    load_baseline,
+    run_case,
+    save_baseline,
+    write_results
+)
+from benchmarks.netem import LinkProfile
+from benchmarks.trees import TREES, generate
+
+DEFAULT_BASELINE = Path(__file__).with_name("baselines.json")
+
+_SIZE_SUFFIXES = {"k": 1024, "m": 1024 ** 2, "g": 1024 ** 3}
+
+
+def parse_size(value: str) -> float:
+    """Bytes com sufixo opcional K, M ou G (potências de 1024)"""
+    multiplier = _SIZE_SUFFIXES.get(value[-1:].lower(), 1)
+    number = value[:-1] if multiplier != 1 else value
+    try:
+        return float(number) * multiplier
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid size: {value}") from None
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Deploy synthetic trees through each deployer and report throughput"
+    )
+    parser.add_argument(
+        "--trees", default=",".join(TREES),
+        help=f"Comma-separated trees ({', '.join(TREES)})"
+    )
+    parser.add_argument(
+        "--targets", default=",".join(TARGETS),
+        help=f"Comma-separated targets ({', '.join(TARGETS)})"
+    )
+    parser.add_argument(
+        "--scale", type=float, default=1.0,
+        help="Tree size multiplier; 1.0 is 100k tiny files, a 5k-file web app and 3 x 2 GiB"
+    )
+    parser.add_argument(
+        "--work-dir", type=Path, default=Path(tempfile.gettempdir()) / "noktech-bench",
+        help="Where trees are generated (and reused) and deploys are written"
+    )
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--update-baseline", action="store_true",
+        help="Store these results as the baseline for this scale"
+    )
+    parser.add_argument(
+        "--tolerance", type=float, default=0.25,
+        help="Allowed throughput drop against the baseline (fraction)"
+    )
+    parser.add_argument("--output", type=Path, help="Also write the results as JSON")
+
+    link = parser.add_argument_group(
+        "emulated link",
+        "Route network targets through a local proxy that emulates a slow or flaky link"
+    )
+    link.add_argument("--rtt", type=float, default=0.0, help="Round-trip time in ms")
+    link.add_argument("--jitter", type=float, default=0.0, help="Per-packet jitter in ms (+/-)")
+    link.add_argument(
+        "--bandwidth", type=parse_size,
+        help="Per-direction cap in bytes/s per connection, e.g. 512K or 10M"
+    )
+    link.add_argument(
+        "--drop-after", type=parse_size,
+        help="Cut every connection after this many bytes"
+    )
+    link.add_argument(
+        "--fail-connects", type=int, default=0,
+        help="Refuse the first N connections"
+    )
+    link.add_argument(
+        "--attempts", type=int, default=1,
+        help="Retry a failed deploy incrementally up to N times, like the deploy manager"
+    )
+    return parser.parse_args()
+
+
+def link_profile(args: argparse.Namespace) -> Optional[LinkProfile]:
+    """Perfil do enlace pedido na linha de comando, ou None para conexão direta"""
+    if not (args.rtt or args.jitter or args.bandwidth or args.drop_after or args.fail_connects):
+        return None
+    return LinkProfile(
+        delay=args.rtt / 2000,
+        jitter=args.jitter / 1000,
+        bandwidth=args.bandwidth,
+        drop_after=int(args.drop_after) if args.drop_after else None,
+        fail_connects=args.fail_connects,
+    )
+
+
+async def run(args: argparse.Namespace, link: Optional[LinkProfile]) -> List[BenchmarkResult]:
+    results = []
+    for tree_name in args.trees.split(","):
+        source = args.work_dir / "trees" / f"{tree_name}-{args.scale:g}"
+        tree = generate(tree_name, source, args.scale)
+        print(f"Tree {tree_name}: {tree.files} files, {tree.bytes / 1024 / 1024:.1f} MB",
+              file=sys.stderr)
+        for target in args.targets.split(","):
+            if link and target == "local":
+                print("Skipping local: no network link to emulate", file=sys.stderr)
+                continue
+            results.append(await run_case(
+                tree, source, target, args.work_dir / "runs" / target, link, args.attempts
+            ))
+    return results
+
+
+def main() -> None:
+    args = parse_args()
+    link = link_profile(args)
+    results = asyncio.run(run(args, link))
+    key = baseline_key(args.scale, link)
+    baseline = load_baseline(args.baseline, key)
+
+    if link:
+        print(f"Emulated link: {link.label()}")
+    print(format_table(results, baseline))
+    if args.output:
+        write_results(args.output, args.scale, results, link)
+    if args.update_baseline:
+        save_baseline(args.baseline, key, results)
+        print(f"Baseline updated: {args.baseline}")
+        return
+
+    regressions = compare(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
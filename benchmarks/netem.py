@@ -0,0 +1,363 @@
+"""
+Proxy TCP que emula um enlace lento: latência, jitter, banda e quedas
+"""
+from dataclasses import dataclass
+from typing import Any, Coroutine, List, Optional, Set, Tuple, Union
+import asyncio
+import random
+import re
+
+_CHUNK_SIZE = 64 * 1024
+_QUEUE_CHUNKS = 64  # Blocos em trânsito por sentido antes de parar de ler
+_DATA_ACCEPT_TIMEOUT = 30.0
+
+_PASV = re.compile(rb"^227 .*?\((\d+),(\d+),(\d+),(\d+),(\d+),(\d+)\)")
+_EPSV = re.compile(rb"^229 .*?\((.)\1\1(\d+)\1\)")
+
+
+@dataclass
+class LinkProfile:
+    """
+    Características do enlace emulado
+
+    delay é o atraso de um sentido, então cada ida e volta custa 2 * delay
+    (mais o jitter). bandwidth limita cada sentido de cada conexão, em
+    bytes/s. drop_after corta cada conexão depois de tantos bytes nos dois
+    sentidos somados; fail_connects recusa as primeiras conexões.
+    """
+    delay: float = 0.0
+    jitter: float = 0.0
+    bandwidth: Optional[float] = None
+    drop_after: Optional[int] = None
+    fail_connects: int = 0
+    seed: int = 0
+
+    def label(self) -> str:
+        """Identificação curta, usada como chave de linha de base"""
+        parts = [f"rtt{self.delay * 2000:g}ms"]
+        if self.jitter:
+            parts.append(f"jitter{self.jitter * 1000:g}ms")
+        if self.bandwidth:
+            parts.append(f"bw{self.bandwidth:g}")
+        if self.drop_after:
+            parts.append(f"drop{self.drop_after}")
+        if self.fail_connects:
+            parts.append(f"fail{self.fail_connects}")
+        return "-".join(parts)
+
+
+class _Direction:
+    """Um sentido de uma conexão: atrasa e limita a banda de cada bloco"""
+
+    def __init__(self, proxy: "LatencyProxy", connection: "_Connection") -> None:
+        self.proxy = proxy
+        self.connection = connection
+        self.queue: asyncio.Queue[Tuple[float, bytes]] = asyncio.Queue(_QUEUE_CHUNKS)
+        self.link_free = 0.0
+        self.last_delivery = 0.0
+
+    def schedule(self, size: int) -> float:
+        """Instante de entrega do bloco que acabou de chegar"""
+        profile = self.proxy.profile
+        now = asyncio.get_running_loop().time()
+        start = max(now, self.link_free)
+        self.link_free = start + size / profile.bandwidth if profile.bandwidth else start
+        jitter = self.proxy.rng.uniform(-profile.jitter, profile.jitter) if profile.jitter else 0
+        # Jitter não reordena: TCP entrega em ordem
+        delivery = max(self.last_delivery, self.link_free + max(0.0, profile.delay + jitter))
+        self.last_delivery = delivery
+        return delivery
+
+    async def pump(
+        self,
+        reader: Union[asyncio.StreamReader, "_TurnCounter"],
+        rewrite: Optional["_FTPRewriter"] = None
+    ) -> None:
+        """Lê da origem e enfileira com o instante de entrega"""
+        try:
+            while chunk := await reader.read(_CHUNK_SIZE):
+                if rewrite:
+                    chunk = await rewrite.feed(chunk)
+                    if not chunk:
+                        continue
+                await self.queue.put((self.schedule(len(chunk)), chunk))
+        finally:
+            await self.queue.put((0.0, b""))
+
+    async def deliver(self, writer: asyncio.StreamWriter) -> None:
+        """Entrega os blocos no destino quando vence o atraso de cada um"""
+        loop = asyncio.get_running_loop()
+        broken = False
+        while True:
+            delivery, chunk = await self.queue.get()
+            if not chunk:
+                break
+            if broken or writer.transport.is_closing():
+                # Continua consumindo para não travar pump() na fila cheia
+                broken = True
+                continue
+            wait = delivery - loop.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            chunk = chunk[:self.connection.remaining()]
+            try:
+                writer.write(chunk)
+                await writer.drain()
+            except (ConnectionError, OSError):
+                broken = True
+                self.connection.close()
+                continue
+            self.connection.transferred(len(chunk))
+        if not broken and writer.can_write_eof():
+            writer.write_eof()
+
+
+class _FTPRewriter:
+    """
+    Reescreve as respostas PASV/EPSV do canal de controle
+
+    Para cada porta passiva anunciada pelo servidor o proxy abre uma porta
+    própria, com o mesmo perfil de enlace, e anuncia essa no lugar; assim
+    o canal de dados também passa pelo enlace emulado.
+    """
+
+    def __init__(self, proxy: "LatencyProxy") -> None:
+        self.proxy = proxy
+        self.buffer = b""
+
+    async def feed(self, data: bytes) -> bytes:
+        """Devolve as linhas completas, já reescritas"""
+        self.buffer += data
+        *lines, self.buffer = self.buffer.split(b"\n")
+        rewritten = [await self._rewrite(line + b"\n") for line in lines]
+        return b"".join(rewritten)
+
+    async def _rewrite(self, line: bytes) -> bytes:
+        pasv = _PASV.match(line)
+        if pasv:
+            numbers = [int(n) for n in pasv.groups()]
+            host = ".".join(str(n) for n in numbers[:4])
+            port = await self.proxy.open_data_port(host, numbers[4] * 256 + numbers[5])
+            address = self.proxy.listen_host.replace(".", ",")
+            return f"227 Entering Passive Mode ({address},{port // 256},{port % 256})\r\n".encode()
+
+        epsv = _EPSV.match(line)
+        if epsv:
+            port = await self.proxy.open_data_port(
+                self.proxy.target_host, int(epsv.group(2))
+            )
+            return f"229 Entering Extended Passive Mode (|||{port}|)\r\n".encode()
+        return line
+
+
+class _Connection:
+    """Uma conexão cliente-servidor atravessando o proxy"""
+
+    def __init__(self, proxy: "LatencyProxy") -> None:
+        self.proxy = proxy
+        self.bytes = 0
+        self.writers: List[asyncio.StreamWriter] = []
+
+    def remaining(self) -> Optional[int]:
+        """Bytes que ainda passam antes da queda, ou None sem limite"""
+        limit = self.proxy.profile.drop_after
+        return None if limit is None else max(0, limit - self.bytes)
+
+    def transferred(self, size: int) -> None:
+        self.bytes += size
+        limit = self.proxy.profile.drop_after
+        if limit is not None and self.bytes >= limit and not self.closed:
+            self.proxy.dropped += 1
+            self.close()
+
+    @property
+    def closed(self) -> bool:
+        return all(writer.transport.is_closing() for writer in self.writers)
+
+    def close(self) -> None:
+        for writer in self.writers:
+            # abort(): queda do enlace, sem FIN ordenado
+            writer.transport.abort()
+
+
+class LatencyProxy:
+    """
+    Proxy TCP em 127.0.0.1 na frente de um servidor de teste
+
+    Os deployers se conectam à porta do proxy como se fosse o servidor.
+    Além do atraso, o proxy conta conexões, quedas e "turnos": cada vez
+    que o cliente volta a enviar depois de receber algo, houve uma ida e
+    volta inteira no enlace, independente do protocolo. Com ftp=True as
+    respostas PASV/EPSV são reescritas para que o canal de dados também
+    atravesse o proxy.
+    """
+
+    def __init__(
+        self,
+        target_host: str,
+        target_port: int,
+        profile: LinkProfile,
+        ftp: bool = False,
+        listen_host: str = "127.0.0.1"
+    ) -> None:
+        self.target_host = target_host
+        self.target_port = target_port
+        self.profile = profile
+        self.ftp = ftp
+        self.listen_host = listen_host
+        self.port = 0
+        self.rng = random.Random(profile.seed)
+        self.connections = 0
+        self.refused = 0
+        self.dropped = 0
+        self.turns = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._data_servers: Set[asyncio.AbstractServer] = set()
+        self._live: Set[_Connection] = set()
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def __aenter__(self) -> "LatencyProxy":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.close()
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(
+            lambda r, w: self._accept(r, w, self.target_host, self.target_port, self.ftp),
+            self.listen_host,
+            0
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    def drop_all(self) -> None:
+        """Derruba todas as conexões abertas, como uma queda do enlace"""
+        for connection in list(self._live):
+            if not connection.closed:
+                self.dropped += 1
+                connection.close()
+
+    async def open_data_port(self, host: str, port: int) -> int:
+        """Porta de uso único que repassa uma conexão de dados FTP a host:port"""
+        accepted = asyncio.Event()
+
+        async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+            accepted.set()
+            await self._accept(reader, writer, host, port, ftp=False, primary=False)
+
+        server = await asyncio.start_server(handle, self.listen_host, 0)
+        self._data_servers.add(server)
+
+        async def close_when_used() -> None:
+            try:
+                await asyncio.wait_for(accepted.wait(), _DATA_ACCEPT_TIMEOUT)
+            except asyncio.TimeoutError:
+                pass
+            server.close()
+            self._data_servers.discard(server)
+
+        self._spawn(close_when_used())
+        return server.sockets[0].getsockname()[1]
+
+    def _spawn(self, coroutine: Coroutine[Any, Any, None]) -> asyncio.Task:
+        task = asyncio.ensure_future(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def _accept(
+        self,
+        client_reader: asyncio.StreamReader,
+        client_writer: asyncio.StreamWriter,
+        host: str,
+        port: int,
+        ftp: bool,
+        primary: bool = True
+    ) -> asyncio.Task:
+        return self._spawn(
+            self._relay(client_reader, client_writer, host, port, ftp, primary)
+        )
+
+    async def _relay(
+        self,
+        client_reader: asyncio.StreamReader,
+        client_writer: asyncio.StreamWriter,
+        host: str,
+        port: int,
+        ftp: bool,
+        primary: bool
+    ) -> None:
+        """
+        Repassa uma conexão nos dois sentidos até ambos encerrarem
+
+        Conexões primárias (não as de dados FTP) podem ser recusadas por
+        fail_connects e têm os turnos contados.
+        """
+        self.connections += 1
+        if primary and self.refused < self.profile.fail_connects:
+            self.refused += 1
+            client_writer.transport.abort()
+            return
+
+        try:
+            server_reader, server_writer = await asyncio.open_connection(host, port)
+        except OSError:
+            client_writer.transport.abort()
+            return
+
+        connection = _Connection(self)
+        connection.writers = [client_writer, server_writer]
+        self._live.add(connection)
+        upstream = _Direction(self, connection)
+        downstream = _Direction(self, connection)
+        source: Union[asyncio.StreamReader, _TurnCounter] = client_reader
+        if primary:
+            source = _TurnCounter(client_reader, self, downstream)
+
+        try:
+            await asyncio.gather(
+                upstream.pump(source),
+                upstream.deliver(server_writer),
+                downstream.pump(server_reader, _FTPRewriter(self) if ftp else None),
+                downstream.deliver(client_writer),
+                return_exceptions=True
+            )
+        finally:
+            self._live.discard(connection)
+            for writer in connection.writers:
+                writer.close()
+
+    async def close(self) -> None:
+        if self._server:
+            self._server.close()
+            self._server = None
+        for server in list(self._data_servers):
+            server.close()
+        self._data_servers.clear()
+        for connection in list(self._live):
+            connection.close()
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+class _TurnCounter:
+    """StreamReader do cliente que conta turnos: envio após ter recebido resposta"""
+
+    def __init__(
+        self, reader: asyncio.StreamReader, proxy: "LatencyProxy", downstream: _Direction
+    ) -> None:
+        self._reader = reader
+        self._proxy = proxy
+        self._downstream = downstream
+        self._seen_delivery = 0.0
+
+    async def read(self, size: int = -1) -> bytes:
+        data = await self._reader.read(size)
+        if data:
+            delivered = self._downstream.last_delivery
+            if delivered > self._seen_delivery:
+                self._seen_delivery = delivered
+                self._proxy.turns += 1
+        return data
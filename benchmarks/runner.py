@@ -0,0 +1,286 @@
+"""
+Execução dos cenários de benchmark e comparação com a linha de base
+"""
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import json
+import platform
+import shutil
+import sys
+import time
+
+from src.deployers.base_deployer import BaseDeployer
+from src.deployers.ftp_deployer import FTPDeployer
+from src.deployers.local_deployer import LocalDeployer
+from src.deployers.ssh_deployer import SSHDeployer
+from benchmarks.netem import LatencyProxy, LinkProfile
+from benchmarks.servers import FTPStandIn, SFTPStandIn, StandInServer
+from benchmarks.trees import TreeInfo
+
+TARGETS = ("local", "sftp", "sftp-tar", "ftp")
+
+# Idas e volta por arquivo são determinísticas; a folga cobre só a
+# variação na ordem em que os workers criam diretórios
+ROUND_TRIP_TOLERANCE = 0.05
+
+
+@dataclass
+class BenchmarkResult:
+    """Números de um deploy completo de uma árvore para um destino"""
+    tree: str
+    target: str
+    files: int
+    bytes: int
+    seconds: float
+    round_trips: int
+    requests: int
+    attempts: int = 1
+    completed: bool = True
+    turns: int = 0  # Idas e voltas vistas pelo proxy, com enlace emulado
+
+    @property
+    def key(self) -> str:
+        return f"{self.tree}/{self.target}"
+
+    @property
+    def files_per_second(self) -> float:
+        return self.files / self.seconds if self.seconds else 0.0
+
+    @property
+    def mb_per_second(self) -> float:
+        return self.bytes / 1024 / 1024 / self.seconds if self.seconds else 0.0
+
+    @property
+    def round_trips_per_file(self) -> float:
+        return self.round_trips / self.files if self.files else 0.0
+
+    def summary(self) -> Dict[str, float]:
+        """Valores guardados na linha de base"""
+        return {
+            "files_per_second": round(self.files_per_second, 2),
+            "mb_per_second": round(self.mb_per_second, 3),
+            "round_trips_per_file": round(self.round_trips_per_file, 3),
+        }
+
+
+@asynccontextmanager
+async def _through(
+    server: StandInServer, link: Optional[LinkProfile], ftp: bool = False
+) -> AsyncIterator[Tuple[Dict[str, Any], Optional[LatencyProxy]]]:
+    """Endereço que o deployer deve usar: o do servidor ou o de um proxy com o enlace"""
+    if link is None:
+        yield {}, None
+        return
+    async with LatencyProxy(server.host, server.port, link, ftp=ftp) as proxy:
+        yield {"host": proxy.listen_host, "port": proxy.port}, proxy
+
+
+@asynccontextmanager
+async def _target(
+    target: str, work: Path, link: Optional[LinkProfile] = None
+) -> AsyncIterator[
+    Tuple[type, Dict[str, Any], Optional[StandInServer], Optional[LatencyProxy]]
+]:
+    """Classe do deployer, configuração de conexão, servidor e proxy de um destino"""
+    dest = work / "dest"
+    if target == "local":
+        if link:
+            raise ValueError("The local target has no network link to emulate")
+        yield LocalDeployer, {"protocol": "local", "dest_path": str(dest)}, None, None
+    elif target in ("sftp", "sftp-tar"):
+        async with SFTPStandIn(allow_exec=target == "sftp-tar") as server:
+            async with _through(server, link) as (address, proxy):
+                yield SSHDeployer, {
+                    **server.deployer_config(),
+                    **address,
+                    "protocol": "ssh",
+                    "dest_path": str(dest),
+                    "transfer_mode": "tar" if target == "sftp-tar" else "sftp",
+                }, server, proxy
+    elif target == "ftp":
+        async with FTPStandIn(work / "ftp-root") as ftp:
+            async with _through(ftp, link, ftp=True) as (address, proxy):
+                yield FTPDeployer, {
+                    **ftp.deployer_config(),
+                    **address,
+                    "protocol": "ftp",
+                    "dest_path": "/dest",
+                }, ftp, proxy
+    else:
+        raise ValueError(f"Unknown benchmark target: {target}")
+
+
+async def run_case(
+    tree: TreeInfo,
+    source: Path,
+    target: str,
+    work: Path,
+    link: Optional[LinkProfile] = None,
+    attempts: int = 1
+) -> BenchmarkResult:
+    """
+    Faz o deploy completo (não incremental) de source para um destino vazio
+
+    O tempo cobre o deploy inteiro: conexão, varredura, diretórios, envio e
+    registro no manifesto. Com link, a conexão passa por um LatencyProxy;
+    um deploy que falha é repetido até attempts vezes, de forma incremental
+    como no DeployManager, e o tempo inclui as tentativas.
+    """
+    for leftover in (work / "dest", work / "ftp-root"):
+        shutil.rmtree(leftover, ignore_errors=True)
+    work.mkdir(parents=True, exist_ok=True)
+    (work / "manifest.json").unlink(missing_ok=True)
+
+    async with _target(target, work, link) as (deployer_class, config, server, proxy):
+        if server:
+            server.reset()
+        files = size = 0
+        completed = False
+
+        started = time.perf_counter()
+        for attempt in range(1, attempts + 1):
+            deployer: BaseDeployer = deployer_class(f"bench-{target}", {
+                **config,
+                "source_path": str(source),
+                "incremental": attempt > 1,
+                "metrics": {"enabled": False},
+            })
+            deployer.manifest.path = work / "manifest.json"
+            try:
+                await deployer.deploy()
+                completed = True
+            except Exception as e:
+                # Sem enlace emulado uma falha é um erro do próprio benchmark
+                if link is None and attempt == attempts:
+                    raise
+                print(f"{target}: attempt {attempt}/{attempts} failed: {e}", file=sys.stderr)
+            files += deployer.metrics.files_sent
+            size += deployer.metrics.bytes_sent
+            if completed:
+                break
+        seconds = time.perf_counter() - started
+
+        return BenchmarkResult(
+            tree=tree.name,
+            target=target,
+            files=files,
+            bytes=size,
+            seconds=seconds,
+            round_trips=server.round_trips if server else 0,
+            requests=server.requests if server else 0,
+            attempts=attempt,
+            completed=completed,
+            turns=proxy.turns if proxy else 0,
+        )
+
+
+def baseline_key(scale: float, link: Optional[LinkProfile] = None) -> str:
+    """Chave da linha de base: a escala e, com enlace emulado, o seu perfil"""
+    return f"{scale}@{link.label()}" if link else str(scale)
+
+
+def load_baseline(path: Path, key: str) -> Dict[str, Dict[str, float]]:
+    """Linha de base registrada para a chave (ver baseline_key), ou vazia"""
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text()).get("scales", {}).get(key, {})
+
+
+def save_baseline(path: Path, key: str, results: List[BenchmarkResult]) -> None:
+    """Registra os resultados como linha de base da chave, preservando as demais"""
+    data = json.loads(path.read_text()) if path.exists() else {}
+    data["recorded_on"] = f"{platform.platform()} / Python {platform.python_version()}"
+    scales = data.setdefault("scales", {})
+    entries = scales.setdefault(key, {})
+    entries.update({result.key: result.summary() for result in results})
+    path.write_text(json.dumps(data, indent=4, sort_keys=True) + "\n")
+
+
+def compare(
+    results: List[BenchmarkResult],
+    baseline: Dict[str, Dict[str, float]],
+    tolerance: float
+) -> List[str]:
+    """
+    Regressões em relação à linha de base
+
+    Vazão (arquivos/s, MB/s) pode cair até tolerance; idas e voltas por
+    arquivo, que não dependem da máquina, só ROUND_TRIP_TOLERANCE.
+    """
+    regressions = []
+    for result in results:
+        if not result.completed:
+            regressions.append(
+                f"{result.key}: did not complete in {result.attempts} attempt(s)"
+            )
+        reference = baseline.get(result.key)
+        if not reference:
+            continue
+        current = result.summary()
+        for name in ("files_per_second", "mb_per_second"):
+            if reference[name] and current[name] < reference[name] * (1 - tolerance):
+                regressions.append(
+                    f"{result.key}: {name} {current[name]} < baseline {reference[name]}"
+                )
+        limit = reference["round_trips_per_file"] * (1 + ROUND_TRIP_TOLERANCE)
+        if current["round_trips_per_file"] > limit + 1e-9:
+            regressions.append(
+                f"{result.key}: round_trips_per_file {current['round_trips_per_file']}"
+                f" > baseline {reference['round_trips_per_file']}"
+            )
+    return regressions
+
+
+def format_table(
+    results: List[BenchmarkResult], baseline: Dict[str, Dict[str, float]]
+) -> str:
+    """Tabela de resultados com a variação de arquivos/s sobre a linha de base"""
+    header = (
+        f"{'case':<18} {'files':>8} {'MB':>10} {'seconds':>9} {'files/s':>10}"
+        f" {'MB/s':>9} {'rt/file':>8} {'tries':>5} {'vs base':>8}"
+    )
+    lines = [header, "-" * len(header)]
+    for result in results:
+        reference = baseline.get(result.key, {}).get("files_per_second")
+        delta = (
+            f"{(result.files_per_second / reference - 1) * 100:+.0f}%" if reference else "-"
+        )
+        lines.append(
+            f"{result.key:<18} {result.files:>8} {result.bytes / 1024 / 1024:>10.1f}"
+            f" {result.seconds:>9.2f} {result.files_per_second:>10.1f}"
+            f" {result.mb_per_second:>9.1f} {result.round_trips_per_file:>8.2f}"
+            f" {result.attempts if result.completed else 'fail':>5} {delta:>8}"
+        )
+    return "\n".join(lines)
+
+
+def write_results(
+    path: Path,
+    scale: float,
+    results: List[BenchmarkResult],
+    link: Optional[LinkProfile] = None
+) -> None:
+    """Resultados completos em JSON, para anexar a uma issue ou comparar depois"""
+    path.write_text(json.dumps({
+        "scale": scale,
+        "link": asdict(link) if link else None,
+        "python": sys.version,
+        "platform": platform.platform(),
+        "results": [
+            {
+                "case": result.key,
+                "files": result.files,
+                "bytes": result.bytes,
+                "seconds": round(result.seconds, 4),
+                "round_trips": result.round_trips,
+                "requests": result.requests,
+                "attempts": result.attempts,
+                "completed": result.completed,
+                "turns": result.turns,
+                **result.summary(),
+            }
+            for result in results
+        ],
+    }, indent=4) + "\n")
@@ -0,0 +1,230 @@
+"""
+Servidores SFTP e FTP locais para benchmarks, com contagem de requisições
+"""
+from abc import ABC, abstractmethod
+from collections import Counter
+from pathlib import Path, PurePosixPath
+from typing import Any, Dict, Optional
+import asyncio
+import secrets
+
+import aioftp  # type: ignore
+import asyncssh
+
+# Requisições SFTP que carregam dados; o asyncssh as envia em pipeline, sem
+# esperar a resposta de cada uma, então não contam como ida e volta
+SFTP_DATA_REQUESTS = {"read", "write"}
+
+_SFTP_REQUESTS = (
+    "open", "close", "read", "write", "stat", "lstat", "fstat", "setstat", "fsetstat",
+    "mkdir", "rmdir", "remove", "rename", "posix_rename", "realpath", "scandir",
+)
+
+
+class _CountingSFTPServer(asyncssh.SFTPServer):
+    """SFTPServer que conta cada requisição recebida"""
+
+    counts: Counter  # definido por SFTPStandIn para cada servidor
+
+
+def _counted(name: str) -> Any:
+    original = getattr(asyncssh.SFTPServer, name)
+
+    def handler(self: _CountingSFTPServer, *args: Any, **kwargs: Any) -> Any:
+        self.counts[name] += 1
+        return original(self, *args, **kwargs)
+
+    return handler
+
+
+for _name in _SFTP_REQUESTS:
+    setattr(_CountingSFTPServer, _name, _counted(_name))
+
+
+class _PasswordServer(asyncssh.SSHServer):
+    def __init__(self, password: str) -> None:
+        self._password = password
+
+    def begin_auth(self, username: str) -> bool:
+        return True
+
+    def password_auth_supported(self) -> bool:
+        return True
+
+    def validate_password(self, username: str, password: str) -> bool:
+        return secrets.compare_digest(password, self._password)
+
+
+class StandInServer(ABC):
+    """Base dos servidores: endereço, contadores e configuração do deployer"""
+
+    def __init__(self) -> None:
+        self.host = "127.0.0.1"
+        self.port = 0
+        self.user = "bench"
+        self.password = secrets.token_hex(16)
+        self.counts: Counter = Counter()
+
+    @property
+    def requests(self) -> int:
+        """Requisições recebidas"""
+        return sum(self.counts.values())
+
+    @property
+    def round_trips(self) -> int:
+        """Requisições em que o cliente espera a resposta antes de seguir"""
+        return self.requests
+
+    def reset(self) -> None:
+        self.counts.clear()
+
+    def deployer_config(self) -> Dict[str, Any]:
+        """Campos de conexão para a configuração do host"""
+        return {
+            "host": self.host,
+            "port": self.port,
+            "user": self.user,
+            "password": self.password,
+        }
+
+    async def __aenter__(self) -> "StandInServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.close()
+
+    @abstractmethod
+    async def start(self) -> None:
+        """Sobe o servidor em host e define port"""
+        pass
+
+    @abstractmethod
+    async def close(self) -> None:
+        """Encerra o servidor"""
+        pass
+
+
+class SFTPStandIn(StandInServer):
+    """
+    Servidor SSH/SFTP do asyncssh em 127.0.0.1, com senha aleatória
+
+    Os caminhos remotos são caminhos locais. Com allow_exec os comandos
+    recebidos (tar do modo bulk, python3 do delta) são executados por um
+    shell local; cada comando conta como uma ida e volta.
+    """
+
+    def __init__(self, allow_exec: bool = False) -> None:
+        super().__init__()
+        self.allow_exec = allow_exec
+        self._server: Optional[asyncssh.SSHAcceptor] = None
+
+    @property
+    def round_trips(self) -> int:
+        return sum(n for name, n in self.counts.items() if name not in SFTP_DATA_REQUESTS)
+
+    def deployer_config(self) -> Dict[str, Any]:
+        return {**super().deployer_config(), "known_hosts": None}
+
+    async def start(self) -> None:
+        counts = self.counts
+
+        class Server(_CountingSFTPServer):
+            pass
+
+        Server.counts = counts
+        self._server = await asyncssh.create_server(
+            lambda: _PasswordServer(self.password),
+            self.host,
+            self.port,
+            server_host_keys=[asyncssh.generate_private_key("ssh-ed25519")],
+            sftp_factory=Server,
+            process_factory=self._run_command if self.allow_exec else None,
+            encoding=None,
+            allow_scp=False,
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def _run_command(self, process: asyncssh.SSHServerProcess) -> None:
+        """Executa o comando em um shell local, repassando stdin/stdout/stderr"""
+        self.counts["exec"] += 1
+        child = await asyncio.create_subprocess_shell(
+            process.command or "true",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        assert child.stdin is not None and child.stdout is not None and child.stderr is not None
+        stdin = child.stdin
+
+        async def pump_stdin() -> None:
+            while chunk := await process.stdin.read(256 * 1024):
+                stdin.write(chunk)
+                await stdin.drain()
+            stdin.close()
+
+        async def pump(reader: asyncio.StreamReader, writer: Any) -> None:
+            while chunk := await reader.read(256 * 1024):
+                writer.write(chunk)
+
+        # Como no sshd, o comando termina quando o processo sai: o cliente
+        # pode nunca enviar EOF (conn.run sem entrada, por exemplo)
+        feeder = asyncio.ensure_future(pump_stdin())
+        await asyncio.gather(
+            pump(child.stdout, process.stdout),
+            pump(child.stderr, process.stderr),
+        )
+        status = await child.wait()
+        feeder.cancel()
+        await asyncio.gather(feeder, return_exceptions=True)
+        process.exit(status)
+
+    async def close(self) -> None:
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+
+class _CountingFTPServer(aioftp.Server):
+    """aioftp.Server que conta cada comando recebido"""
+
+    counts: Counter
+
+    async def parse_command(self, stream: Any, censor_commands: Any = ("pass",)) -> Any:
+        command, rest = await super().parse_command(stream, censor_commands)
+        self.counts[command] += 1
+        return command, rest
+
+
+class FTPStandIn(StandInServer):
+    """
+    Servidor aioftp em 127.0.0.1 servindo root como "/"
+
+    Cada comando FTP é uma ida e volta no canal de controle.
+    """
+
+    def __init__(self, root: Path) -> None:
+        super().__init__()
+        self.root = root
+        self._server: Optional[_CountingFTPServer] = None
+
+    def remote_path(self, local: Path) -> str:
+        """Caminho remoto (dest_path) correspondente a um diretório sob root"""
+        return str(PurePosixPath("/") / local.relative_to(self.root).as_posix())
+
+    async def start(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        user = aioftp.User(
+            self.user, self.password, home_path=PurePosixPath("/"), base_path=self.root
+        )
+        server = _CountingFTPServer([user])
+        server.counts = self.counts
+        await server.start(self.host, self.port)
+        self.port = server.server.sockets[0].getsockname()[1]
+        self._server = server
+
+    async def close(self) -> None:
+        if self._server:
+            await self._server.close()
+            self._server = None
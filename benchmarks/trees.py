@@ -0,0 +1,107 @@
+"""
+Árvores sintéticas para benchmarks de deploy
+"""
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Tuple
+import json
+import os
+import random
+import shutil
+
+# Bloco aleatório reaproveitado no conteúdo dos arquivos: gerar bytes
+# aleatórios para gigabytes dominaria o tempo de preparação
+_BLOCK = os.urandom(1024 * 1024)
+
+GIB = 1024 ** 3
+
+
+@dataclass
+class TreeInfo:
+    """Resumo de uma árvore gerada"""
+    name: str
+    scale: float
+    seed: int
+    files: int
+    bytes: int
+
+
+def _content(rng: random.Random, size: int) -> Iterator[bytes]:
+    """Conteúdo em blocos, com deslocamento aleatório para variar entre arquivos"""
+    offset = rng.randrange(len(_BLOCK))
+    while size > 0:
+        chunk = _BLOCK[offset:offset + size]
+        offset = 0
+        size -= len(chunk)
+        yield chunk
+
+
+def _tiny(rng: random.Random, scale: float) -> Iterator[Tuple[str, int]]:
+    """100 mil arquivos de até 2 KB, 100 por diretório"""
+    for n in range(max(1, int(100_000 * scale))):
+        yield f"d{n // 10_000:02d}/d{n // 100 % 100:02d}/f{n:06d}.txt", rng.randrange(2048)
+
+
+def _webapp(rng: random.Random, scale: float) -> Iterator[Tuple[str, int]]:
+    """Aplicação web: fontes pequenos, imagens médias, alguns bundles grandes"""
+    kinds = [
+        (0.60, ("js", "css", "html", "json"), 1024, 20 * 1024),
+        (0.30, ("png", "jpg", "webp"), 20 * 1024, 300 * 1024),
+        (0.10, ("map", "woff2", "wasm"), 100 * 1024, 2 * 1024 * 1024),
+    ]
+    sections = ["assets", "static", "vendor", "pages", "components", "locales"]
+    for n in range(max(1, int(5_000 * scale))):
+        roll = rng.random()
+        for weight, extensions, low, high in kinds:
+            if roll < weight:
+                break
+            roll -= weight
+        depth = rng.randrange(1, 5)
+        parts = [rng.choice(sections)] + [f"m{rng.randrange(20):02d}" for _ in range(depth)]
+        yield f"{'/'.join(parts)}/file{n:05d}.{rng.choice(extensions)}", rng.randrange(low, high)
+
+
+def _large(rng: random.Random, scale: float) -> Iterator[Tuple[str, int]]:
+    """Poucos arquivos de vários GB"""
+    for n in range(3):
+        yield f"releases/image{n}.bin", max(1, int(2 * GIB * scale))
+
+
+TREES: Dict[str, Callable[[random.Random, float], Iterator[Tuple[str, int]]]] = {
+    "tiny": _tiny,
+    "webapp": _webapp,
+    "large": _large,
+}
+
+
+def generate(name: str, root: Path, scale: float = 1.0, seed: int = 0) -> TreeInfo:
+    """
+    Gera (ou reaproveita) a árvore name em root
+
+    A árvore é determinística para (name, scale, seed); uma árvore completa
+    de uma execução anterior é reaproveitada sem ser reescrita.
+    """
+    # Fora da árvore, para não entrar no deploy
+    marker = root.with_name(f"{root.name}.tree.json")
+    if marker.exists():
+        info = TreeInfo(**json.loads(marker.read_text()))
+        if (info.name, info.scale, info.seed) == (name, scale, seed):
+            return info
+    if root.exists():
+        shutil.rmtree(root)
+    root.mkdir(parents=True)
+
+    rng = random.Random(f"{name}:{seed}")
+    files = size_total = 0
+    for rel_path, size in TREES[name](rng, scale):
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as file:
+            for chunk in _content(rng, size):
+                file.write(chunk)
+        files += 1
+        size_total += size
+
+    info = TreeInfo(name, scale, seed, files, size_total)
+    marker.write_text(json.dumps(asdict(info)))
+    return info
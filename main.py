@@ -12,6 +12,7 @@ from src.deploy_client import DeployClient
 from src.utils.config import ConfigManager
 from src.utils.logger import CustomLogger
 from src.i18n import I18n
+from src.core import profiling
 from src.core.constants import (
     PROJECT_NAME,
     PROJECT_VERSION,
@@ -46,7 +47,9 @@ async def main(config_file: Optional[str] = None, watch: bool = False) -> None:
             config["watch"] = {"enabled": True}
             
         await client.setup(config)
-        await client.run()
+        if not await client.run():
+            # Os hosts com falha já estão no resumo do DeployManager
+            sys.exit(1)
     except KeyboardInterrupt:
         logger.info("Operation cancelled by user")
         sys.exit(0)
@@ -68,9 +71,11 @@ def cli():
     parser.add_argument("--config", "-c", help=i18n.get("input.config"))
     parser.add_argument("--watch", "-w", action="store_true", help=i18n.get("input.watch"))
     parser.add_argument("--version", "-v", action="version", version=f"{PROJECT_NAME} v{PROJECT_VERSION}")
+    profiling.add_arguments(parser, i18n)
     
     args = parser.parse_args()
-    asyncio.run(main(args.config, args.watch))
+    with profiling.diagnostics_from_args(args):
+        asyncio.run(main(args.config, args.watch))
 
 
 if __name__ == "__main__":
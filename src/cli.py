@@ -10,7 +10,9 @@ from typing import Optional, Dict, Any
 import inquirer  # type: ignore
 from colorama import init, Fore, Style
 
+from src.core import profiling
 from src.core.config import ConfigManager
+from src.core.deploy_manager import DeployManager
 from src.core.watcher import FileWatcher
 from src.deployers.factory import DeployerFactory
 from src.utils.logger import CustomLogger
@@ -59,7 +61,30 @@ class CLI:
             help=self.i18n.get("cli.watch_help")
         )
         
-        return parser.parse_args()
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help=self.i18n.get("cli.full_help")
+        )
+        
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help=self.i18n.get("cli.all_help")
+        )
+        
+        parser.add_argument(
+            "--group",
+            help=self.i18n.get("cli.group_help")
+        )
+
+        profiling.add_arguments(parser, self.i18n)
+        
+        args = parser.parse_args()
+        if args.watch and (args.all or args.group):
+            # O watch acompanha uma única origem e um único destino
+            parser.error(self.i18n.get("cli.error.watch_hosts"))
+        return args
 
     async def interactive_mode(self, config: Dict[str, Any]) -> None:
         """Modo interativo"""
@@ -92,7 +117,8 @@ class CLI:
         self,
         config: Dict[str, Any],
         host: str,
-        watch: bool = False
+        watch: bool = False,
+        full: bool = False
     ) -> None:
         """Executa deploy"""
         try:
@@ -102,6 +128,8 @@ class CLI:
                 host_config["protocol"],
                 host_config
             )
+            if full:
+                deployer.incremental = False
             
             if watch:
                 self.logger.info(self.i18n.get("mode.watch"))
@@ -117,9 +145,25 @@ class CLI:
             self.logger.error(str(e))
             sys.exit(1)
 
-    async def run(self) -> None:
+    async def deploy_hosts(
+        self,
+        config: Dict[str, Any],
+        group: Optional[str] = None,
+        full: bool = False
+    ) -> None:
+        """Executa deploy em todos os hosts habilitados (ou de um grupo)"""
+        try:
+            results = await DeployManager(config).deploy_all(group, full)
+        except KeyboardInterrupt:
+            self.logger.info(self.i18n.get("deploy.cancelled"))
+            return
+
+        if not all(result.success for result in results):
+            sys.exit(1)
+
+    async def run(self, args: Optional[argparse.Namespace] = None) -> None:
         """Executa aplicativo"""
-        args = self.parse_args()
+        args = args or self.parse_args()
         
         if args.config:
             self.config_manager.config_path = args.config
@@ -131,8 +175,10 @@ class CLI:
                 self.logger.error(self.i18n.get("config.error.invalid"))
                 sys.exit(1)
             
-            if args.host:
-                await self.deploy(config, args.host, args.watch)
+            if args.all or args.group:
+                await self.deploy_hosts(config, args.group, args.full)
+            elif args.host:
+                await self.deploy(config, args.host, args.watch, args.full)
             else:
                 await self.interactive_mode(config)
                 
@@ -144,7 +190,9 @@ class CLI:
 def main() -> None:
     """Função principal"""
     cli = CLI()
-    asyncio.run(cli.run())
+    args = cli.parse_args()
+    with profiling.diagnostics_from_args(args):
+        asyncio.run(cli.run(args))
 
 
 if __name__ == "__main__":
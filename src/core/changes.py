@@ -0,0 +1,213 @@
+"""
+Agrupamento de alterações de arquivos detectadas no modo watch
+"""
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.core.constants import WATCH_MAX_PENDING
+
+
+class ChangeKind(Enum):
+    """Alteração líquida de um caminho"""
+    CREATED = "created"
+    MODIFIED = "modified"
+    DELETED = "deleted"
+    MOVED = "moved"
+
+
+class FullSyncCause(Enum):
+    """Motivo que trocou o lote por uma sincronização completa"""
+    OVERFLOW = "overflow"
+    STORM = "storm"
+    DROP = "drop"
+    FAILURE = "failure"
+
+
+@dataclass
+class Operation:
+    """Operação estrutural (MOVED ou DELETED) aplicada no destino na ordem em que ocorreu"""
+    kind: ChangeKind
+    path: Path
+    is_dir: bool = False
+    dest: Optional[Path] = None
+
+
+@dataclass
+class ChangeBatch:
+    """Lote drenado de um ChangeSet"""
+    operations: List[Operation] = field(default_factory=list)
+    changes: Dict[Path, ChangeKind] = field(default_factory=dict)
+    full_sync: bool = False
+
+    def __len__(self) -> int:
+        return len(self.operations) + len(self.changes)
+
+    def uploads(self) -> List[Path]:
+        """Arquivos que precisam ser enviados"""
+        return [path for path, kind in self.changes.items() if kind != ChangeKind.DELETED]
+
+    def deletions(self) -> List[Path]:
+        """Arquivos que precisam ser removidos do destino"""
+        return [path for path, kind in self.changes.items() if kind == ChangeKind.DELETED]
+
+
+def _is_under(path: Path, parent: Path) -> bool:
+    return path != parent and path.is_relative_to(parent)
+
+
+class ChangeSet:
+    """
+    Alterações pendentes, uma por caminho
+
+    Eventos repetidos do mesmo caminho se reduzem à alteração líquida:
+    criado e depois modificado continua criado, criado e depois removido
+    some do lote, removido e recriado vira modificado. Renomeações e
+    remoções de diretórios viram operações ordenadas, aplicadas no destino
+    antes das remoções de arquivos e dos envios.
+
+    O conjunto é limitado a max_paths entradas: acima disso os caminhos
+    individuais são descartados e o lote passa a pedir uma sincronização
+    completa da árvore, que sai mais barata que repetir cada evento.
+    """
+
+    def __init__(self, max_paths: int = WATCH_MAX_PENDING) -> None:
+        self._changes: Dict[Path, ChangeKind] = {}
+        self._operations: List[Operation] = []
+        self.max_paths = max_paths
+        self.full_sync = False
+        self.coalesced = 0
+        self.full_syncs: Dict[FullSyncCause, int] = dict.fromkeys(FullSyncCause, 0)
+
+    def __len__(self) -> int:
+        return len(self._changes) + len(self._operations)
+
+    def __bool__(self) -> bool:
+        return bool(self._changes or self._operations or self.full_sync)
+
+    @property
+    def overflows(self) -> int:
+        """Sincronizações completas pedidas por estouro de max_paths"""
+        return self.full_syncs[FullSyncCause.OVERFLOW]
+
+    def require_full_sync(self, cause: FullSyncCause = FullSyncCause.OVERFLOW) -> None:
+        """Troca as alterações individuais por uma sincronização completa"""
+        if not self.full_sync:
+            self.full_syncs[cause] += 1
+        self.full_sync = True
+        self._changes = {}
+        self._operations = []
+
+    def _absorbed(self) -> bool:
+        """Verifica se o evento é coberto pela sincronização completa pendente"""
+        if self.full_sync:
+            self.coalesced += 1
+            return True
+        if len(self) >= self.max_paths:
+            self.require_full_sync()
+            return True
+        return False
+
+    def add(self, path: Path, kind: ChangeKind) -> None:
+        """Acrescenta um evento de arquivo, combinando com o pendente do mesmo caminho"""
+        if self._absorbed():
+            return
+        if kind == ChangeKind.DELETED and self._cancel_move_to(path):
+            self._changes.pop(path, None)
+            self.coalesced += 1
+            return
+
+        previous = self._changes.get(path)
+        if previous is None:
+            self._changes[path] = kind
+            return
+
+        self.coalesced += 1
+        if kind == ChangeKind.DELETED:
+            if previous == ChangeKind.CREATED:
+                # Nunca chegou ao destino
+                del self._changes[path]
+            else:
+                self._changes[path] = ChangeKind.DELETED
+        elif previous == ChangeKind.DELETED:
+            self._changes[path] = ChangeKind.MODIFIED
+        # CREATED/MODIFIED seguidos de CREATED/MODIFIED mantêm o anterior
+
+    def remove_dir(self, path: Path) -> None:
+        """Registra a remoção de um diretório inteiro"""
+        if self._absorbed():
+            return
+        for pending in [p for p in self._changes if _is_under(p, path)]:
+            del self._changes[pending]
+        if not self._cancel_move_to(path, is_dir=True):
+            self._operations.append(Operation(ChangeKind.DELETED, path, is_dir=True))
+
+    def move(self, src: Path, dest: Path, is_dir: bool = False) -> None:
+        """Registra uma renomeação dentro da árvore monitorada"""
+        if self._absorbed():
+            return
+        if self._implied_move(src, dest):
+            self.coalesced += 1
+            return
+
+        if is_dir:
+            # Renomeações dos filhos podem ter chegado antes da do diretório
+            self._operations = [
+                op for op in self._operations
+                if not (
+                    op.kind == ChangeKind.MOVED
+                    and _is_under(op.path, src)
+                    and op.dest == dest / op.path.relative_to(src)
+                )
+            ]
+            for pending in [p for p in self._changes if _is_under(p, src)]:
+                self._changes[dest / pending.relative_to(src)] = self._changes.pop(pending)
+            self._operations.append(Operation(ChangeKind.MOVED, src, True, dest))
+            return
+
+        previous = self._changes.pop(src, None)
+        self._changes.pop(dest, None)
+        if previous == ChangeKind.CREATED:
+            # Ainda não foi enviado: basta enviar com o nome novo
+            self._changes[dest] = ChangeKind.CREATED
+            return
+
+        for op in reversed(self._operations):
+            if op.kind == ChangeKind.MOVED and not op.is_dir and op.dest == src:
+                op.dest = dest
+                break
+        else:
+            self._operations.append(Operation(ChangeKind.MOVED, src, False, dest))
+        if previous == ChangeKind.MODIFIED:
+            self._changes[dest] = ChangeKind.MODIFIED
+
+    def _implied_move(self, src: Path, dest: Path) -> bool:
+        """Verifica se a renomeação é de um filho de um diretório já renomeado"""
+        return any(
+            op.kind == ChangeKind.MOVED
+            and op.is_dir
+            and op.dest is not None
+            and _is_under(src, op.path)
+            and dest == op.dest / src.relative_to(op.path)
+            for op in self._operations
+        )
+
+    def _cancel_move_to(self, path: Path, is_dir: bool = False) -> bool:
+        """Troca renomear para path e depois remover por remover a origem"""
+        for index, op in enumerate(self._operations):
+            if op.kind == ChangeKind.MOVED and op.dest == path and op.is_dir == is_dir:
+                del self._operations[index]
+                if is_dir:
+                    self._operations.append(Operation(ChangeKind.DELETED, op.path, is_dir=True))
+                else:
+                    self._changes[op.path] = ChangeKind.DELETED
+                return True
+        return False
+
+    def drain(self) -> ChangeBatch:
+        """Retorna e limpa as alterações pendentes"""
+        batch = ChangeBatch(self._operations, self._changes, self.full_sync)
+        self._operations, self._changes = [], {}
+        self.full_sync = False
+        return batch
@@ -142,7 +142,13 @@ class ConfigManager:
         """Retorna configuração de um host específico"""
         if host not in config["hosts"]:
             raise ValueError(self.i18n.get("config.error.host_not_found").format(host))
-        return config["hosts"][host]
+        # Padrões globais acompanham o host para compor as regras de ignore
+        host_config = config["hosts"][host]
+        return {
+            **host_config,
+            "global_ignore_patterns": config.get("ignore_patterns", []),
+            "metrics": {**config.get("metrics", {}), **host_config.get("metrics", {})}
+        }
 
     def update_host_config(
         self,
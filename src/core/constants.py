@@ -4,6 +4,7 @@ Constantes e configurações do NokTech Deploy
 
 from pathlib import Path
 from typing import Dict, Any
+import os
 
 # Informações do Projeto
 PROJECT_NAME = "noktech-deploy"
@@ -17,8 +18,13 @@ PROJECT_REPOSITORY = "https://github.com/Br3n0k/noktech-deploy"
 # Diretórios base
 ROOT_DIR = Path.cwd()  # Diretório atual onde a aplicação está rodando
 CONFIG_DIR = ROOT_DIR
-LOGS_DIR = ROOT_DIR / "logs"
+LOGS_DIR = Path(os.environ.get("NOKTECH_DEPLOY_LOGS_DIR") or ROOT_DIR / "logs")
 VERSION_LOG_DIR = LOGS_DIR / "version"  # Adicionado diretório específico para logs de versão
+MANIFEST_DIR = LOGS_DIR / "manifests"  # Manifestos de deploy incremental por host
+STAT_INDEX_DIR = LOGS_DIR / "index"  # Índice de stat/hash por diretório de origem
+METRICS_DIR = LOGS_DIR / "metrics"  # Relatórios de deploy em JSON lines
+PROFILE_DIR = LOGS_DIR / "profiles"  # Saída padrão de --profile e --trace
+DEFAULT_LOG_DIR = LOGS_DIR
 LANG_DIR = ROOT_DIR / "lang"
 
 # Arquivos de configuração
@@ -59,6 +65,7 @@ DEFAULT_IGNORE_PATTERNS = [
 # Template de configuração padrão
 DEFAULT_CONFIG_TEMPLATE = {
     "parallel_deploy": False,
+    "max_parallel_hosts": 4,
     "ignore_patterns": DEFAULT_IGNORE_PATTERNS,
     "logs": {
         "retention_days": 5,  # Dias para manter os logs
@@ -67,17 +74,23 @@ DEFAULT_CONFIG_TEMPLATE = {
     "hosts": {
         "local": {
             "enabled": True,
+            "groups": [],
             "protocol": "local",
             "source_path": "./src",
             "dest_path": "./deploy",
             "ignore_patterns": [],
+            "incremental": True,
             "watch": {
                 "enabled": False,
-                "interval": 1.0
+                "interval": 1.0,
+                "observer": "auto",
+                "quiet_period": 0.5,
+                "max_latency": 5.0
             }
         },
         "example_ssh": {
             "enabled": False,
+            "groups": ["production"],
             "protocol": "ssh",
             "host": "example.com",
             "user": "deploy",
@@ -86,13 +99,22 @@ DEFAULT_CONFIG_TEMPLATE = {
             "source_path": "./",
             "dest_path": "/var/www/app",
             "ignore_patterns": [],
+            "incremental": True,
+            "max_concurrent_transfers": 8,
+            "transfer_mode": "sftp",
+            "tar_compression": None,
+            "delta_transfer": False,
             "watch": {
                 "enabled": False,
-                "interval": 1.0
+                "interval": 1.0,
+                "observer": "auto",
+                "quiet_period": 0.5,
+                "max_latency": 5.0
             }
         },
         "example_ftp": {
             "enabled": False,
+            "groups": ["production"],
             "protocol": "ftp",
             "host": "ftp.example.com",
             "user": "ftpuser",
@@ -101,9 +123,13 @@ DEFAULT_CONFIG_TEMPLATE = {
             "source_path": "./dist",
             "dest_path": "/public_html",
             "ignore_patterns": [],
+            "incremental": True,
             "watch": {
                 "enabled": False,
-                "interval": 1.0
+                "interval": 1.0,
+                "observer": "auto",
+                "quiet_period": 0.5,
+                "max_latency": 5.0
             }
         },
     },
@@ -111,14 +137,73 @@ DEFAULT_CONFIG_TEMPLATE = {
 
 # Configurações de Deploy
 DEPLOY_PARALLEL = False
+DEPLOY_MAX_PARALLEL_HOSTS = 4  # Hosts em deploy simultâneo com parallel_deploy
 DEPLOY_RETRY_ATTEMPTS = 3
 DEPLOY_RETRY_DELAY = 5.0
+DEPLOY_INCREMENTAL = True  # Envia apenas arquivos novos ou alterados
+SCAN_BATCH_SIZE = 256  # Arquivos por lote entregue pela varredura
+SCAN_QUEUE_SIZE = 1024  # Arquivos aguardando envio enquanto a varredura continua
+MANIFEST_HASH_ALGORITHM = "sha256"  # Qualquer algoritmo do hashlib (sha256, blake2b...)
+HASH_EXECUTOR = "thread"  # thread (hashlib libera o GIL) ou process
+HASH_WORKERS = None  # None usa os.cpu_count()
+HASH_MMAP_MIN_SIZE = 4 * 1024 * 1024  # Arquivos a partir deste tamanho são lidos por mmap
+HASH_CHUNK_SIZE = 1024 * 1024
+HASH_MEMO_SIZE = 65536  # Hashes memorizados por assinatura de stat
+SSH_MAX_CONCURRENT_TRANSFERS = 8  # Uploads SFTP simultâneos por host
+SSH_TRANSFER_MODE = "sftp"  # sftp, tar (stream tar via SSH) ou auto
+TAR_AUTO_MIN_FILES = 200  # Modo auto: mínimo de arquivos para usar tar
+TAR_AUTO_MAX_AVG_SIZE = 64 * 1024  # Modo auto: tamanho médio máximo por arquivo
+TAR_CHUNK_SIZE = 256 * 1024
+DELTA_TRANSFER = False  # Delta por blocos para arquivos grandes alterados (requer python3 remoto)
+DELTA_MIN_FILE_SIZE = 8 * 1024 * 1024
+DELTA_MIN_BLOCK_SIZE = 4 * 1024
+DELTA_MAX_BLOCK_SIZE = 128 * 1024
+DELTA_MAX_LITERAL_RATIO = 0.5  # Acima disso o arquivo é enviado inteiro
+# Trecho sem casamento a partir do qual só blocos alinhados são testados
+DELTA_MAX_UNMATCHED_BLOCKS = 16
+DELTA_CHUNK_SIZE = 1024 * 1024
+LOCAL_COPY_RANGE_SIZE = 64 * 1024 * 1024  # Bytes por chamada de cópia no kernel
+LOCAL_COPY_BUFFER_SIZE = 1024 * 1024  # Buffer da cópia sem suporte do kernel
 
 # Timeouts (em segundos)
 CONNECTION_TIMEOUT = 30
+CONNECTION_KEEPALIVE_INTERVAL = 30  # SSH keepalive / FTP NOOP em conexões persistentes
+CONNECTION_IDLE_TIMEOUT = 300  # Fecha conexões persistentes ociosas
 TRANSFER_TIMEOUT = 300
 WATCH_INTERVAL = 1.0
 
+# Monitoramento de arquivos
+WATCH_RECURSIVE = True
+WATCH_OBSERVER = "auto"  # auto (nativo, polling em NFS/SMB), native ou polling
+WATCH_PATTERNS = ["*"]
+WATCH_DELAY = 0.5
+WATCH_CATCH_UP = True  # Envia, ao iniciar, o que mudou enquanto o watch estava parado
+WATCH_QUIET_PERIOD = 0.5  # Silêncio exigido antes de enviar um lote de alterações
+WATCH_MAX_LATENCY = 5.0  # Espera máxima do primeiro evento de um lote sob alterações contínuas
+WATCH_SYNC_DELETES = True  # Remove do destino o que foi removido da origem
+WATCH_EVENT_QUEUE_SIZE = 1024  # Lotes de eventos aguardando o consumidor no loop
+# Alterações pendentes acima das quais o watch faz uma sincronização completa
+WATCH_MAX_PENDING = 5000
+# Eventos por segundo que caracterizam uma tempestade (checkout, install, build)
+WATCH_STORM_RATE = 500
+WATCH_STORM_SETTLE = 2.0  # Silêncio exigido antes da sincronização completa após uma tempestade
+WATCH_EDITOR_FILTER = True  # Descarta swap, lock e temporários de salvamento de editores
+
+# Progresso
+PROGRESS_RENDER_INTERVAL = 0.1  # Intervalo entre quadros da barra no terminal
+PROGRESS_LOG_INTERVAL = 10.0  # Intervalo entre linhas de log quando stdout não é um terminal
+PROGRESS_SPEED_WINDOW = 3.0  # Constante de tempo (s) da média móvel exponencial da velocidade
+
+# Métricas
+METRICS_ENABLED = False  # Relatórios JSON lines por deploy e lote do watch, sob demanda
+METRICS_FILE_FORMAT = "metrics-%Y-%m.jsonl"
+METRICS_PREFIX = "noktech_deploy"  # Prefixo das métricas no textfile do Prometheus
+
+# Diagnóstico (--profile, --trace)
+PROFILE_FILE_FORMAT = "deploy-%Y%m%d-%H%M%S"
+TRACE_MAX_EVENTS = 1_000_000  # Spans guardados por execução; o excedente é descartado
+TRACE_MEMORY_TOP = 20  # Locais de alocação listados no trace com --trace-memory
+
 # Protocolos Suportados
 SUPPORTED_PROTOCOLS: Dict[str, Any] = {
     "ssh": "SSHDeployer",
@@ -0,0 +1,210 @@
+"""
+Transferência delta por blocos (estilo rsync)
+"""
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Tuple
+import hashlib
+import math
+import mmap
+import struct
+import zlib
+
+from src.core.constants import (
+    DELTA_MAX_BLOCK_SIZE,
+    DELTA_MAX_UNMATCHED_BLOCKS,
+    DELTA_MIN_BLOCK_SIZE
+)
+
+ADLER_MOD = 65521
+
+# Operações do protocolo enviado ao script remoto
+OP_COPY = b"C"  # >QI: primeiro bloco e quantidade de blocos do arquivo antigo
+OP_DATA = b"D"  # >I: tamanho, seguido dos bytes literais
+OP_END = b"E"
+
+# Executado no destino com 'python3 -c': "sig" lista as assinaturas dos blocos
+# do arquivo remoto e "patch" reconstrói o arquivo a partir das operações
+# recebidas na entrada padrão, trocando-o de forma atômica ao final.
+REMOTE_SCRIPT = r"""
+import hashlib, os, struct, sys, tempfile, zlib
+mode, path, bs = sys.argv[1], sys.argv[2], int(sys.argv[3])
+if mode == "sig":
+    out = sys.stdout
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(bs)
+            if not block:
+                break
+            strong = hashlib.blake2b(block, digest_size=16).hexdigest()
+            out.write("%d %s\n" % (zlib.adler32(block), strong))
+    sys.exit(0)
+inp = sys.stdin.buffer
+digest = hashlib.sha256()
+fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=".noktech-delta-")
+try:
+    with open(path, "rb") as old, os.fdopen(fd, "wb") as new:
+        while True:
+            op = inp.read(1)
+            if op == b"C":
+                start, count = struct.unpack(">QI", inp.read(12))
+                old.seek(start * bs)
+                remaining = count * bs
+                while remaining > 0:
+                    block = old.read(min(remaining, 1 << 20))
+                    if not block:
+                        break
+                    new.write(block)
+                    digest.update(block)
+                    remaining -= len(block)
+            elif op == b"D":
+                size = struct.unpack(">I", inp.read(4))[0]
+                data = inp.read(size)
+                new.write(data)
+                digest.update(data)
+            elif op == b"E":
+                break
+            else:
+                raise SystemExit("invalid delta stream")
+    os.chmod(tmp, os.stat(path).st_mode & 0o7777)
+    os.replace(tmp, path)
+except BaseException:
+    os.unlink(tmp)
+    raise
+sys.stdout.write(digest.hexdigest())
+"""
+
+
+class DeltaNotWorthwhile(Exception):
+    """O arquivo mudou demais para compensar a transferência delta"""
+
+
+@dataclass(frozen=True)
+class DeltaOp:
+    """Operação do delta: copiar blocos remotos ou enviar bytes literais"""
+    kind: bytes
+    start: int
+    length: int
+
+
+def block_size_for(size: int) -> int:
+    """Escolhe o tamanho de bloco proporcional à raiz do tamanho do arquivo"""
+    block = int(math.sqrt(size)) & ~0x3FF
+    return max(DELTA_MIN_BLOCK_SIZE, min(DELTA_MAX_BLOCK_SIZE, block))
+
+
+def strong_hash(data: bytes) -> str:
+    """Hash forte usado para confirmar um bloco"""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def parse_signatures(output: str) -> List[Tuple[int, str]]:
+    """Converte a saída do modo 'sig' do script remoto"""
+    signatures = []
+    for line in output.splitlines():
+        weak, strong = line.split()
+        signatures.append((int(weak), strong))
+    return signatures
+
+
+def compute_delta(
+    path: Path,
+    signatures: List[Tuple[int, str]],
+    block_size: int,
+    max_literal_ratio: float = 0.5,
+    max_unmatched_blocks: int = DELTA_MAX_UNMATCHED_BLOCKS
+) -> Tuple[List[DeltaOp], int]:
+    """
+    Calcula as operações que transformam o arquivo remoto no local
+
+    Blocos alinhados são testados primeiro com o adler32 do zlib; só nas
+    regiões alteradas o checksum é rolado byte a byte. Rolar em Python é
+    caro: depois de max_unmatched_blocks blocos seguidos sem casamento, só
+    as posições alinhadas ao bloco são testadas, até o próximo casamento.
+    Um arquivo reescrito chega ao limite de literais em passos de bloco, e
+    uma alteração no lugar ainda reaproveita os blocos seguintes.
+
+    Returns:
+        Tupla (operações, bytes literais a enviar)
+
+    Raises:
+        DeltaNotWorthwhile: Se os bytes literais passarem de max_literal_ratio
+    """
+    index: Dict[int, Dict[str, int]] = {}
+    for number, (weak, strong) in enumerate(signatures):
+        index.setdefault(weak, {}).setdefault(strong, number)
+
+    ops: List[DeltaOp] = []
+    literal_bytes = 0
+
+    def add_copy(block: int) -> None:
+        last = ops[-1] if ops else None
+        if last and last.kind == OP_COPY and last.start + last.length == block:
+            ops[-1] = DeltaOp(OP_COPY, last.start, last.length + 1)
+        else:
+            ops.append(DeltaOp(OP_COPY, block, 1))
+
+    with open(path, "rb") as f:
+        size = f.seek(0, 2)
+        if size < block_size:
+            return [DeltaOp(OP_DATA, 0, size)] if size else [], size
+        max_literal = size * max_literal_ratio
+        max_unmatched = max_unmatched_blocks * block_size
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            pos = 0
+            literal_start = 0
+            a = b = 0
+            fresh = True
+
+            while pos + block_size <= size:
+                if fresh:
+                    checksum = zlib.adler32(data[pos:pos + block_size])
+                    a, b = checksum & 0xFFFF, checksum >> 16
+                    fresh = False
+
+                candidates = index.get((b << 16) | a)
+                if candidates:
+                    block = candidates.get(strong_hash(data[pos:pos + block_size]))
+                    if block is not None:
+                        if literal_start < pos:
+                            ops.append(DeltaOp(OP_DATA, literal_start, pos - literal_start))
+                            literal_bytes += pos - literal_start
+                        add_copy(block)
+                        pos += block_size
+                        literal_start = pos
+                        fresh = True
+                        continue
+
+                if pos - literal_start + literal_bytes > max_literal:
+                    raise DeltaNotWorthwhile(str(path))
+
+                if pos - literal_start >= max_unmatched:
+                    pos += block_size
+                    fresh = True
+                    continue
+
+                if pos + block_size < size:
+                    out_byte = data[pos]
+                    in_byte = data[pos + block_size]
+                    a = (a - out_byte + in_byte) % ADLER_MOD
+                    b = (b - block_size * out_byte + a - 1) % ADLER_MOD
+                pos += 1
+
+            if literal_start < size:
+                ops.append(DeltaOp(OP_DATA, literal_start, size - literal_start))
+                literal_bytes += size - literal_start
+
+    if literal_bytes > max_literal:
+        raise DeltaNotWorthwhile(str(path))
+    return ops, literal_bytes
+
+
+def encode_copy(op: DeltaOp) -> bytes:
+    """Serializa uma operação de cópia"""
+    return OP_COPY + struct.pack(">QI", op.start, op.length)
+
+
+def encode_data_header(length: int) -> bytes:
+    """Serializa o cabeçalho de um trecho literal"""
+    return OP_DATA + struct.pack(">I", length)
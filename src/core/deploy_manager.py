@@ -1,58 +1,156 @@
 from typing import Dict, Any, Optional, List
+from contextlib import nullcontext
+from dataclasses import dataclass
 from pathlib import Path
+import asyncio
+import time
+
 from src.utils.logger import CustomLogger
-from src.deployers import BaseDeployer, SSHDeployer, FTPDeployer, LocalDeployer
+from src.i18n import I18n
+from src.deployers import BaseDeployer
+from src.deployers.factory import DeployerFactory
+from src.core.config import ConfigManager
 from src.core.constants import (
     SUPPORTED_PROTOCOLS,
     DEFAULT_PROTOCOL,
+    DEPLOY_MAX_PARALLEL_HOSTS,
+    DEPLOY_PARALLEL,
     DEPLOY_RETRY_ATTEMPTS,
     DEPLOY_RETRY_DELAY
 )
-import asyncio
+
+
+@dataclass
+class HostResult:
+    """Resultado do deploy de um host"""
+    host: str
+    success: bool
+    attempts: int
+    duration: float
+    error: str = ""
 
 
 class DeployManager:
-    """Gerencia operações de deploy"""
+    """Gerencia operações de deploy em um ou mais hosts"""
 
     def __init__(self, config: Dict[str, Any]) -> None:
         self.logger = CustomLogger.get_logger(__name__)
+        self.i18n = I18n()
         self.config = config
-        self._deployer: Optional[BaseDeployer] = None
-        self._setup_deployer()
-
-    def _setup_deployer(self) -> None:
-        """Configura o deployer baseado na configuração"""
-        protocol = self.config.get("protocol", DEFAULT_PROTOCOL)
-        deployers = {
-            "ssh": SSHDeployer,
-            "ftp": FTPDeployer,
-            "local": LocalDeployer
-        }
+        self.factory = DeployerFactory()
+        self.config_manager = ConfigManager()
+
+    def select_hosts(self, group: Optional[str] = None) -> List[str]:
+        """Hosts habilitados, opcionalmente filtrados por grupo"""
+        return [
+            name
+            for name, host_config in self.config.get("hosts", {}).items()
+            if host_config.get("enabled", True)
+            and (group is None or group in host_config.get("groups", []))
+        ]
 
+    def create_deployer(self, host_name: str) -> BaseDeployer:
+        """Cria o deployer de um host configurado"""
+        host_config = self.config_manager.get_host_config(self.config, host_name)
+        protocol = host_config.get("protocol", DEFAULT_PROTOCOL)
         if protocol not in SUPPORTED_PROTOCOLS:
             raise ValueError(f"Unsupported protocol: {protocol}")
+        return self.factory.create_deployer(host_name, protocol, host_config)
 
-        self._deployer = deployers[protocol](self.config)
+    def max_parallel_hosts(self) -> int:
+        """Limite global de hosts em deploy simultâneo"""
+        if not self.config.get("parallel_deploy", DEPLOY_PARALLEL):
+            return 1
+        return max(1, self.config.get("max_parallel_hosts", DEPLOY_MAX_PARALLEL_HOSTS))
 
-    async def deploy_host(self, host_name: str, host_config: Dict) -> None:
-        for attempt in range(DEPLOY_RETRY_ATTEMPTS):
-            try:
-                protocol = host_config.get("protocol", DEFAULT_PROTOCOL)
-                if protocol not in SUPPORTED_PROTOCOLS:
-                    raise ValueError(f"Protocol not supported: {protocol}")
+    async def deploy_host(
+        self,
+        host_name: str,
+        full: bool = False,
+        slot: Optional[asyncio.Semaphore] = None
+    ) -> HostResult:
+        """
+        Executa o deploy de um host com novas tentativas
 
-                deployer = self._deployer
-                await deployer.deploy_directory(Path(host_config["source_path"]))
-                break
+        Erros são devolvidos no resultado em vez de propagados, para que a
+        falha de um host não interrompa os demais. slot, o limite de hosts
+        simultâneos, é tomado a cada tentativa e liberado durante a espera
+        antes da próxima, para que um host com falha não segure a vez dos
+        outros.
+        """
+        start = time.monotonic()
+        error = ""
+        for attempt in range(1, DEPLOY_RETRY_ATTEMPTS + 1):
+            try:
+                async with slot or nullcontext():
+                    deployer = self.create_deployer(host_name)
+                    if full:
+                        deployer.incremental = False
+                    deployer.retries = attempt - 1
+                    await deployer.deploy()
+                return HostResult(host_name, True, attempt, time.monotonic() - start)
+            except (ValueError, KeyError) as e:
+                # Erro de configuração: repetir não resolve
+                error = str(e)
+                self.logger.error(f"Failed to deploy host {host_name}: {e}")
+                return HostResult(host_name, False, attempt, time.monotonic() - start, error)
             except Exception as e:
-                if attempt == DEPLOY_RETRY_ATTEMPTS - 1:
+                error = str(e)
+                if attempt == DEPLOY_RETRY_ATTEMPTS:
                     self.logger.error(f"Failed to deploy host {host_name}: {e}")
-                    raise
+                    break
+                self.logger.warning(
+                    f"Deploy of {host_name} failed (attempt {attempt}/{DEPLOY_RETRY_ATTEMPTS}), "
+                    f"retrying in {DEPLOY_RETRY_DELAY}s: {e}"
+                )
                 await asyncio.sleep(DEPLOY_RETRY_DELAY)
 
+        return HostResult(
+            host_name, False, DEPLOY_RETRY_ATTEMPTS, time.monotonic() - start, error
+        )
+
+    async def deploy_hosts(
+        self,
+        host_names: List[str],
+        full: bool = False,
+        max_parallel: Optional[int] = None
+    ) -> List[HostResult]:
+        """Executa o deploy dos hosts respeitando o limite de concorrência"""
+        limit = max_parallel or self.max_parallel_hosts()
+        semaphore = asyncio.Semaphore(limit)
+        self.logger.info(
+            self.i18n.get("deploy.hosts.start").format(len(host_names), limit)
+        )
+
+        results = list(await asyncio.gather(
+            *(self.deploy_host(name, full, semaphore) for name in host_names)
+        ))
+        self.log_summary(results)
+        return results
+
+    async def deploy_all(
+        self, group: Optional[str] = None, full: bool = False
+    ) -> List[HostResult]:
+        """Executa o deploy de todos os hosts habilitados"""
+        return await self.deploy_hosts(self.select_hosts(group), full)
+
+    def log_summary(self, results: List[HostResult]) -> None:
+        """Registra o resumo do deploy por host"""
+        for result in results:
+            status = "OK" if result.success else f"FAILED ({result.error})"
+            self.logger.info(
+                self.i18n.get("deploy.summary.host").format(
+                    result.host, status, f"{result.duration:.1f}s", result.attempts
+                )
+            )
+        succeeded = sum(1 for result in results if result.success)
+        self.logger.info(
+            self.i18n.get("deploy.summary.hosts").format(succeeded, len(results))
+        )
+
     async def deploy_changes(self, host_name: str, changes: List[Path]) -> None:
         try:
-            deployer = self._deployer
+            deployer = self.create_deployer(host_name)
             await deployer.deploy_files(changes)
         except Exception as e:
             self.logger.error(f"Failed to deploy changes for {host_name}: {e}")
@@ -0,0 +1,55 @@
+"""
+Reconhecimento de arquivos temporários criados por editores ao salvar
+"""
+from pathlib import Path
+from typing import List, Optional, Pattern, Tuple
+import re
+
+# Arquivos de estado do editor: nunca representam conteúdo a publicar
+_SCRATCH_PATTERNS: List[Pattern[str]] = [
+    re.compile(r"^\.(?P<target>.+)\.sw[a-p]$"),       # vim swap
+    re.compile(r"^4913$"),                              # vim: teste de escrita no diretório
+    re.compile(r"^\.#(?P<target>.+)$"),                 # emacs lock
+    re.compile(r"^#(?P<target>.+)#$"),                  # emacs auto-save
+    re.compile(r"^(?P<target>.+)\.kate-swp$"),          # Kate
+    re.compile(r"^\.~lock\.(?P<target>.+)#$"),          # LibreOffice
+]
+
+# Etapas de um salvamento atômico: cópia temporária ou backup do original
+_SAVE_PATTERNS: List[Pattern[str]] = [
+    re.compile(r"^(?P<target>.+)___jb_(?:tmp|old)___$"),  # JetBrains safe write
+    re.compile(r"^(?P<target>.+)~$"),                     # backup do vim/emacs/gedit
+    re.compile(r"^(?P<target>.+)\.crswap$"),              # File System Access (navegadores)
+    re.compile(r"^\.goutputstream-\w+$"),                 # GIO (gedit, GNOME)
+]
+
+
+def _match(patterns: List[Pattern[str]], path: Path) -> Tuple[bool, Optional[Path]]:
+    """(nome reconhecido, arquivo real quando o nome permite deduzi-lo)"""
+    for pattern in patterns:
+        match = pattern.match(path.name)
+        if match:
+            target = match.groupdict().get("target")
+            return True, path.with_name(target) if target else None
+    return False, None
+
+
+def is_scratch_file(path: Path) -> bool:
+    """Verifica se path é um arquivo de swap, lock ou auto-save de editor"""
+    return _match(_SCRATCH_PATTERNS, path)[0]
+
+
+def save_artifact_target(path: Path) -> Tuple[bool, Optional[Path]]:
+    """
+    Verifica se path é um temporário de salvamento atômico
+
+    Returns:
+        Tupla (é temporário, arquivo real que está sendo salvo quando o nome
+        permite deduzi-lo)
+    """
+    return _match(_SAVE_PATTERNS, path)
+
+
+def is_transient(path: Path) -> bool:
+    """Verifica se path é qualquer arquivo transitório de editor"""
+    return is_scratch_file(path) or save_artifact_target(path)[0]
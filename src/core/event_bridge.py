@@ -0,0 +1,84 @@
+"""
+Ponte entre as threads do watchdog e o loop asyncio
+"""
+from typing import Callable, Generic, List, Optional, TypeVar
+import asyncio
+import threading
+
+from src.utils.logger import CustomLogger
+from src.core.constants import WATCH_EVENT_QUEUE_SIZE
+
+T = TypeVar("T")
+
+
+class EventBridge(Generic[T]):
+    """
+    Entrega ao loop, em lotes, itens produzidos em outras threads
+
+    put() pode ser chamado de qualquer thread: os itens se acumulam em um
+    buffer e um único call_soon_threadsafe por lote os move para uma
+    asyncio.Queue limitada, consumida por uma única tarefa com get(). Se a
+    fila estiver cheia ou o loop encerrado, o lote é descartado e contado
+    em dropped; on_drop é chamado no loop para que o consumidor possa
+    reconciliar o que se perdeu.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        maxsize: int = WATCH_EVENT_QUEUE_SIZE,
+        on_drop: Optional[Callable[[int], None]] = None
+    ) -> None:
+        self.logger = CustomLogger.get_logger(__name__)
+        self._loop = loop
+        self._queue: asyncio.Queue[List[T]] = asyncio.Queue(maxsize)
+        self._on_drop = on_drop
+        self._buffer: List[T] = []
+        self._scheduled = False
+        self._lock = threading.Lock()
+        self.received = 0
+        self.batches = 0
+        self.dropped = 0
+
+    def put(self, item: T) -> None:
+        """Enfileira um item; seguro para chamar de qualquer thread"""
+        with self._lock:
+            self.received += 1
+            self._buffer.append(item)
+            if self._scheduled:
+                return
+            self._scheduled = True
+
+        try:
+            self._loop.call_soon_threadsafe(self._flush)
+        except RuntimeError:
+            # Loop encerrado: não há mais quem consuma
+            with self._lock:
+                self.dropped += len(self._buffer)
+                self._buffer = []
+                self._scheduled = False
+
+    def _flush(self) -> None:
+        """Move o buffer para a fila; executado no loop"""
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+            self._scheduled = False
+        if not batch:
+            return
+
+        try:
+            self._queue.put_nowait(batch)
+            self.batches += 1
+        except asyncio.QueueFull:
+            self.dropped += len(batch)
+            self.logger.warning(f"Event queue full, dropped {len(batch)} events")
+            if self._on_drop:
+                self._on_drop(len(batch))
+
+    async def get(self) -> List[T]:
+        """Próximo lote de itens, na ordem em que foram produzidos"""
+        return await self._queue.get()
+
+    def qsize(self) -> int:
+        """Lotes aguardando o consumidor"""
+        return self._queue.qsize()
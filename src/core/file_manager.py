@@ -1,13 +1,15 @@
 from __future__ import annotations
 from pathlib import Path
-from typing import List, Tuple, Optional, Callable, Awaitable, TypeAlias
+from typing import Dict, List, Tuple, Optional, Callable, Awaitable, TypeAlias
 from watchdog.observers.api import BaseObserver as Observer
-from watchdog.observers.polling import PollingObserverVFS
 
+from src.core.hashing import HashingService
 from src.core.ignore_rules import IgnoreRules
+from src.core.observers import start_observer
+from src.core.scanner import scan_directory
 from src.utils.logger import CustomLogger
 from src.core.watch_manager import AsyncWatchEventHandler
-from src.core.constants import WATCH_INTERVAL
+from src.core.constants import DEFAULT_IGNORE_PATTERNS, WATCH_INTERVAL
 
 OnChangeCallback: TypeAlias = Callable[[Path], Awaitable[None]]
 
@@ -15,11 +17,13 @@ OnChangeCallback: TypeAlias = Callable[[Path], Awaitable[None]]
 class FileManager:
     """Gerencia operações com arquivos"""
 
-    def __init__(self, base_path: Path) -> None:
+    def __init__(self, base_path: Path, hasher: Optional[HashingService] = None) -> None:
         self.logger = CustomLogger.get_logger(__name__)
         self.base_path = base_path
-        self.ignore_rules = IgnoreRules()
+        self.hasher = hasher or HashingService.shared()
+        self.ignore_rules = IgnoreRules.for_source(base_path, DEFAULT_IGNORE_PATTERNS)
         self.observer: Optional[Observer] = None
+        self.event_handler: Optional[AsyncWatchEventHandler] = None
 
     async def start_watching(
         self, on_change: "Callable[[Path], Awaitable[None]]"
@@ -29,20 +33,27 @@ class FileManager:
             return
 
         try:
-            self.observer = Observer(emitter_class=PollingObserverVFS)
-            event_handler = AsyncWatchEventHandler(on_change)
-            self.observer.schedule(
-                event_handler, 
-                str(self.base_path), 
-                recursive=True
+            self.event_handler = AsyncWatchEventHandler(on_change)
+            self.event_handler.bind()
+            self.observer = start_observer(
+                self.event_handler,
+                self.base_path,
+                recursive=True,
+                polling_interval=WATCH_INTERVAL
             )
-            self.observer.start()
             self.logger.info(f"Watching directory: {self.base_path}")
         except Exception as e:
             self.logger.error(f"Failed to start watching: {e}")
+            self._stop_handler()
             self.observer = None
             raise
 
+    def _stop_handler(self) -> None:
+        """Encerra o consumidor de eventos do handler"""
+        if self.event_handler:
+            self.event_handler.unbind()
+            self.event_handler = None
+
     def stop_watching(self) -> None:
         """Para monitoramento de arquivos"""
         if not self.observer:
@@ -52,6 +63,7 @@ class FileManager:
             self.observer.stop()
             self.observer.join()
             self.observer = None
+            self._stop_handler()
             self.logger.info("Stopped watching")
         except Exception as e:
             self.logger.error(f"Failed to stop watching: {e}")
@@ -60,15 +72,29 @@ class FileManager:
     def get_files(self) -> List[Tuple[Path, Path]]:
         """Retorna lista de arquivos para sincronização"""
         files: List[Tuple[Path, Path]] = []
+        pending = [self.base_path]
 
-        for file_path in self.base_path.rglob("*"):
-            if not file_path.is_file():
-                continue
-
-            if self.ignore_rules.should_ignore(file_path):
-                continue
-
-            rel_path = file_path.relative_to(self.base_path)
-            files.append((file_path, rel_path))
+        # Diretórios ignorados são podados sem serem percorridos
+        while pending:
+            directory = pending.pop()
+            prefix = (
+                "" if directory == self.base_path
+                else directory.relative_to(self.base_path).as_posix() + "/"
+            )
+            found, directories = scan_directory(directory, prefix, self.ignore_rules)
+            pending.extend(reversed(directories))
+            files.extend(
+                (file_path, file_path.relative_to(self.base_path)) for file_path, _ in found
+            )
 
         return files
+
+    def get_file_hashes(self) -> Dict[Path, str]:
+        """Retorna o hash de cada arquivo para sincronização, calculados em paralelo"""
+        hashes = self.hasher.hash_files(
+            (file_path, None) for file_path, _ in self.get_files()
+        )
+        return {
+            file_path.relative_to(self.base_path): digest
+            for file_path, digest in hashes.items()
+        }
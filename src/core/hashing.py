@@ -0,0 +1,185 @@
+"""
+Serviço de hash de arquivos em paralelo
+"""
+from collections import OrderedDict
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import ClassVar, Dict, Iterable, List, Optional, Tuple
+import asyncio
+import hashlib
+import mmap
+import os
+import threading
+
+from src.core.constants import (
+    HASH_CHUNK_SIZE,
+    HASH_EXECUTOR,
+    HASH_MEMO_SIZE,
+    HASH_MMAP_MIN_SIZE,
+    HASH_WORKERS,
+    MANIFEST_HASH_ALGORITHM
+)
+
+HashKey = Tuple[str, int, int, int, str]
+
+
+def file_digest(path: Path, algorithm: str = MANIFEST_HASH_ALGORITHM) -> str:
+    """
+    Calcula o hash do conteúdo de um arquivo
+
+    Arquivos grandes são lidos por mmap, sem cópias para buffers Python; o
+    hashlib libera o GIL durante o update, então várias threads hasheiam em
+    paralelo.
+    """
+    digest = hashlib.new(algorithm)
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size >= HASH_MMAP_MIN_SIZE:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                view = memoryview(data)
+                try:
+                    for start in range(0, size, HASH_CHUNK_SIZE):
+                        digest.update(view[start:start + HASH_CHUNK_SIZE])
+                finally:
+                    view.release()
+        else:
+            while chunk := f.read(HASH_CHUNK_SIZE):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _digest_worker(path: str, algorithm: str) -> str:
+    """Ponto de entrada picklable para o pool de processos"""
+    return file_digest(Path(path), algorithm)
+
+
+class HashingService:
+    """
+    Calcula hashes distribuindo os arquivos em um pool
+
+    O pool padrão é de threads, suficiente porque o hashlib libera o GIL;
+    com executor="process" os arquivos vão para um pool de processos.
+    Resultados ficam memorizados pela assinatura de stat, então um arquivo
+    inalterado não é lido duas vezes na mesma execução.
+    """
+
+    _shared: ClassVar[Dict[Tuple[str, str, Optional[int]], "HashingService"]] = {}
+    _shared_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def __init__(
+        self,
+        algorithm: str = MANIFEST_HASH_ALGORITHM,
+        executor: str = HASH_EXECUTOR,
+        workers: Optional[int] = HASH_WORKERS
+    ) -> None:
+        hashlib.new(algorithm)  # Valida o algoritmo
+        self.algorithm = algorithm
+        self.executor_kind = executor
+        self.workers = workers or os.cpu_count() or 1
+        self._executor: Optional[Executor] = None
+        self._memo: "OrderedDict[HashKey, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(
+        cls,
+        algorithm: str = MANIFEST_HASH_ALGORITHM,
+        executor: str = HASH_EXECUTOR,
+        workers: Optional[int] = HASH_WORKERS
+    ) -> "HashingService":
+        """Instância compartilhada no processo para a combinação de opções"""
+        key = (algorithm, executor, workers)
+        with cls._shared_lock:
+            if key not in cls._shared:
+                cls._shared[key] = cls(algorithm, executor, workers)
+            return cls._shared[key]
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.executor_kind == "process":
+                    self._executor = ProcessPoolExecutor(self.workers)
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        self.workers, thread_name_prefix="hash"
+                    )
+            return self._executor
+
+    def _key(self, path: Path, stat: os.stat_result) -> HashKey:
+        return str(path), stat.st_ino, stat.st_size, stat.st_mtime_ns, self.algorithm
+
+    def _memo_get(self, key: HashKey) -> Optional[str]:
+        with self._lock:
+            digest = self._memo.get(key)
+            if digest is not None:
+                self._memo.move_to_end(key)
+            return digest
+
+    def _memo_put(self, key: HashKey, digest: str) -> None:
+        with self._lock:
+            self._memo[key] = digest
+            self._memo.move_to_end(key)
+            while len(self._memo) > HASH_MEMO_SIZE:
+                self._memo.popitem(last=False)
+
+    def _submit(self, path: Path) -> "Future[str]":
+        """Agenda o hash de um arquivo no pool"""
+        if self.executor_kind == "process":
+            return self._get_executor().submit(_digest_worker, str(path), self.algorithm)
+        return self._get_executor().submit(file_digest, path, self.algorithm)
+
+    def _compute(self, path: Path) -> str:
+        if self.executor_kind == "process":
+            return self._submit(path).result()
+        return file_digest(path, self.algorithm)
+
+    def hash_file(self, path: Path, stat: Optional[os.stat_result] = None) -> str:
+        """Hash de um arquivo, calculado na thread atual ou no pool de processos"""
+        key = self._key(path, stat or path.stat())
+        digest = self._memo_get(key)
+        if digest is None:
+            digest = self._compute(path)
+            self._memo_put(key, digest)
+        return digest
+
+    def hash_files(
+        self, files: Iterable[Tuple[Path, Optional[os.stat_result]]]
+    ) -> Dict[Path, str]:
+        """Hash de vários arquivos em paralelo"""
+        results: Dict[Path, str] = {}
+        pending: List[Tuple[Path, HashKey]] = []
+        for path, stat in files:
+            key = self._key(path, stat or path.stat())
+            digest = self._memo_get(key)
+            if digest is None:
+                pending.append((path, key))
+            else:
+                results[path] = digest
+
+        if len(pending) == 1:
+            path, key = pending[0]
+            results[path] = self._compute(path)
+            self._memo_put(key, results[path])
+        elif pending:
+            futures = [self._submit(path) for path, _ in pending]
+            for (path, key), future in zip(pending, futures, strict=True):
+                results[path] = future.result()
+                self._memo_put(key, results[path])
+
+        return results
+
+    async def hash_file_async(self, path: Path, stat: Optional[os.stat_result] = None) -> str:
+        """Versão assíncrona de hash_file, sem bloquear o loop"""
+        key = self._key(path, stat or path.stat())
+        digest = self._memo_get(key)
+        if digest is None:
+            digest = await asyncio.wrap_future(self._submit(path))
+            self._memo_put(key, digest)
+        return digest
+
+    def shutdown(self) -> None:
+        """Encerra o pool"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
@@ -1,30 +1,186 @@
+"""
+Regras de ignore com a semântica do .gitignore
+"""
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional
-import fnmatch
+from typing import Iterable, List, Optional, Pattern, Tuple
+import os
+import re
+
 from src.core.constants import DEFAULT_IGNORE_PATTERNS
 
 
+@dataclass(frozen=True)
+class _RuleGroup:
+    """Regras consecutivas de mesma polaridade compiladas em um só regex"""
+    negated: bool
+    any_regex: Pattern[str]
+    file_regex: Optional[Pattern[str]]
+
+
+def _translate_glob(glob: str) -> str:
+    """Converte um trecho de glob (sem '**') em regex, sem cruzar '/'"""
+    result = []
+    i = 0
+    while i < len(glob):
+        char = glob[i]
+        if char == "*":
+            result.append("[^/]*")
+        elif char == "?":
+            result.append("[^/]")
+        elif char == "[":
+            end = glob.find("]", i + 2 if glob[i + 1:i + 2] in ("!", "^") else i + 1)
+            if end == -1:
+                result.append(re.escape(char))
+            else:
+                body = glob[i + 1:end]
+                if body[:1] in ("!", "^"):
+                    body = "^" + body[1:]
+                result.append("[" + body.replace("\\", "\\\\") + "]")
+                i = end
+        elif char == "\\" and i + 1 < len(glob):
+            i += 1
+            result.append(re.escape(glob[i]))
+        else:
+            result.append(re.escape(char))
+        i += 1
+    return "".join(result)
+
+
+def translate_pattern(pattern: str) -> Optional[Tuple[str, bool, bool]]:
+    """
+    Converte uma linha no estilo .gitignore em regex
+
+    Returns:
+        Tupla (regex, negado, apenas diretórios) ou None para linhas vazias
+        e comentários
+    """
+    pattern = pattern.rstrip("\n\r")
+    if not pattern.strip() or pattern.startswith("#"):
+        return None
+    if not pattern.endswith("\\ "):
+        pattern = pattern.rstrip()
+
+    negated = pattern.startswith("!")
+    if negated:
+        pattern = pattern[1:]
+    elif pattern.startswith(("\\!", "\\#")):
+        pattern = pattern[1:]
+
+    dir_only = pattern.endswith("/")
+    pattern = pattern.rstrip("/")
+    if not pattern:
+        return None
+
+    # Com '/' no início ou no meio o padrão é relativo à raiz
+    anchored = "/" in pattern
+    pattern = pattern.lstrip("/")
+
+    parts = pattern.split("/")
+    regex = ""
+    for index, part in enumerate(parts):
+        last = index == len(parts) - 1
+        if part == "**":
+            if last:
+                regex += ".*"
+            else:
+                regex += "(?:[^/]+/)*"
+            continue
+        regex += _translate_glob(part)
+        if not last:
+            regex += "/"
+
+    if not anchored:
+        regex = "(?:.*/)?" + regex
+    return regex, negated, dir_only
+
+
 class IgnoreRules:
-    """Gerencia regras de ignorar arquivos"""
+    """
+    Conjunto ordenado de regras de ignore
+
+    Segue a semântica do .gitignore: a última regra que casa decide,
+    '!' reinclui, '/' final vale só para diretórios, '/' no início ou no
+    meio ancora na raiz e '**' cruza diretórios. Caminhos são relativos à
+    raiz e usam '/'.
+    """
 
-    def __init__(self, patterns: Optional[List[str]] = None) -> None:
-        self.patterns = patterns or DEFAULT_IGNORE_PATTERNS
+    def __init__(self, patterns: Optional[Iterable[str]] = None) -> None:
+        self.patterns: List[str] = list(
+            DEFAULT_IGNORE_PATTERNS if patterns is None else patterns
+        )
         self._compile_patterns()
 
+    @classmethod
+    def for_source(
+        cls, source_path: Path, *pattern_lists: Optional[Iterable[str]]
+    ) -> "IgnoreRules":
+        """
+        Combina listas de padrões e o .deployignore da origem, nessa ordem
+
+        Padrões posteriores têm precedência, então o .deployignore pode
+        reincluir com '!' algo ignorado pela configuração.
+        """
+        patterns: List[str] = []
+        for pattern_list in pattern_lists:
+            patterns.extend(pattern_list or [])
+
+        ignore_file = Path(source_path) / ".deployignore"
+        if ignore_file.exists():
+            with open(ignore_file, "r", encoding="utf-8") as f:
+                patterns.extend(f.read().splitlines())
+
+        return cls(patterns)
+
     def _compile_patterns(self) -> None:
-        """Compila os padrões de ignore"""
-        # Mantém os padrões originais para referência
-        self._original_patterns = self.patterns
-        
-        # Converte padrões para lowercase para comparação case-insensitive
-        self._compiled_patterns = [pattern.lower() for pattern in self.patterns]
-
-    def should_ignore(self, path: Path) -> bool:
-        """Verifica se um arquivo deve ser ignorado"""
-        path_str = str(path).lower()
-        
-        for pattern in self._compiled_patterns:
-            if fnmatch.fnmatch(path_str, pattern):
-                return True
-                
+        """Compila os padrões agrupando regras consecutivas de mesma polaridade"""
+        flags = re.IGNORECASE if os.name == "nt" else 0
+        self._groups: List[_RuleGroup] = []
+
+        rules = [rule for rule in map(translate_pattern, self.patterns) if rule]
+        start = 0
+        while start < len(rules):
+            negated = rules[start][1]
+            end = start
+            while end < len(rules) and rules[end][1] == negated:
+                end += 1
+
+            group = rules[start:end]
+            file_rules = [regex for regex, _, dir_only in group if not dir_only]
+            self._groups.append(_RuleGroup(
+                negated=negated,
+                any_regex=re.compile(
+                    "^(?:" + "|".join(regex for regex, _, _ in group) + ")$", flags
+                ),
+                file_regex=re.compile(
+                    "^(?:" + "|".join(file_rules) + ")$", flags
+                ) if file_rules else None
+            ))
+            start = end
+
+    def match(self, rel_path: str, is_dir: bool = False) -> bool:
+        """
+        Verifica apenas o próprio caminho, sem considerar os diretórios pais
+
+        Usado na varredura, onde diretórios ignorados já foram podados.
+        """
+        for group in reversed(self._groups):
+            regex = group.any_regex if is_dir else group.file_regex
+            if regex and regex.match(rel_path):
+                return not group.negated
         return False
+
+    def is_ignored(self, rel_path: str, is_dir: bool = False) -> bool:
+        """Verifica o caminho e seus diretórios pais"""
+        parts = rel_path.strip("/").split("/")
+        for depth in range(1, len(parts)):
+            if self.match("/".join(parts[:depth]), True):
+                return True
+        return self.match("/".join(parts), is_dir)
+
+    def should_ignore(self, path: Path, root: Optional[Path] = None) -> bool:
+        """Verifica se um arquivo deve ser ignorado"""
+        is_dir = path.is_dir()
+        if root is not None:
+            path = path.relative_to(root)
+        return self.is_ignored(path.as_posix(), is_dir)
@@ -0,0 +1,231 @@
+"""
+Manifesto de deploy incremental
+"""
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import json
+import os
+
+from src.core.constants import MANIFEST_DIR
+from src.core.hashing import HashingService
+from src.core.stat_index import StatIndex
+from src.utils.logger import CustomLogger
+
+
+@dataclass
+class ManifestEntry:
+    """Estado de um arquivo no momento em que foi enviado"""
+    size: int
+    mtime_ns: int
+    hash: str
+
+
+class DeployManifest:
+    """Registra os arquivos já enviados para um host"""
+
+    VERSION = 1
+
+    def __init__(
+        self,
+        host_name: str,
+        source_path: Path,
+        dest_path: Path,
+        manifest_dir: Optional[Path] = None,
+        index: Optional[StatIndex] = None,
+        hasher: Optional[HashingService] = None
+    ) -> None:
+        self.logger = CustomLogger.get_logger(__name__)
+        self.path = (manifest_dir or MANIFEST_DIR) / f"{host_name}.json"
+        self.source_path = str(Path(source_path).resolve())
+        self.dest_path = str(dest_path)
+        self.index = index
+        self.hasher = hasher or HashingService.shared()
+        self.entries: Dict[str, ManifestEntry] = {}
+        self._hashes: Dict[str, str] = {}
+        self._loaded = False
+        self._dirty = False
+
+    @staticmethod
+    def key(rel_path: Path) -> str:
+        """Normaliza o caminho relativo usado como chave"""
+        return Path(rel_path).as_posix()
+
+    def load(self) -> None:
+        """Carrega o manifesto do disco (apenas uma vez)"""
+        if self._loaded:
+            return
+        self._loaded = True
+
+        if not self.path.exists():
+            return
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable manifest {self.path}: {e}")
+            return
+
+        # Manifesto de outra origem/destino não vale para este deploy
+        if (
+            data.get("version") != self.VERSION
+            or data.get("algorithm", "sha256") != self.hasher.algorithm
+            or data.get("source_path") != self.source_path
+            or data.get("dest_path") != self.dest_path
+        ):
+            self.logger.info(f"Manifest {self.path} does not match target, starting fresh")
+            return
+
+        self.entries = {
+            rel: ManifestEntry(**entry) for rel, entry in data.get("files", {}).items()
+        }
+
+    def save(self) -> None:
+        """Grava o manifesto de forma atômica"""
+        if not self._dirty:
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "version": self.VERSION,
+            "algorithm": self.hasher.algorithm,
+            "source_path": self.source_path,
+            "dest_path": self.dest_path,
+            "files": {rel: asdict(entry) for rel, entry in self.entries.items()},
+        }
+        tmp_path = self.path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+    def digest(
+        self, file: Path, rel_path: Path, stat: Optional[os.stat_result] = None
+    ) -> str:
+        """Hash do conteúdo, reaproveitando o índice de stat quando disponível"""
+        stat = stat or file.stat()
+        if self.index is None:
+            return self.hasher.hash_file(file, stat)
+        return self.index.digest(
+            file,
+            self.key(rel_path),
+            lambda path: self.hasher.hash_file(path, stat),
+            stat,
+            self.hasher.algorithm
+        )
+
+    def prefetch_digests(self, files: List[Tuple[Path, os.stat_result]], root: Path) -> None:
+        """Calcula em paralelo os hashes que ainda não estão no índice"""
+        missing = [
+            (file, stat) for file, stat in files
+            if self.index is None
+            or self.index.lookup(
+                self.key(file.relative_to(root)), stat, self.hasher.algorithm
+            ) is None
+        ]
+        if len(missing) > 1:
+            self.hasher.hash_files(missing)
+
+    def is_unchanged(
+        self, file: Path, rel_path: Path, stat: Optional[os.stat_result] = None
+    ) -> bool:
+        """
+        Verifica se o arquivo é igual ao registrado no último deploy
+
+        Tamanho e mtime iguais bastam; se apenas o mtime mudou, o conteúdo
+        é comparado pelo hash antes de considerar o arquivo alterado.
+        """
+        entry = self.entries.get(self.key(rel_path))
+        if entry is None:
+            return False
+
+        stat = stat or file.stat()
+        if stat.st_size != entry.size:
+            return False
+        if stat.st_mtime_ns == entry.mtime_ns:
+            return True
+
+        digest = self.digest(file, rel_path, stat)
+        self._hashes[self.key(rel_path)] = digest
+        if digest != entry.hash:
+            return False
+
+        # Conteúdo igual: atualiza o mtime para evitar um novo hash
+        entry.mtime_ns = stat.st_mtime_ns
+        self._dirty = True
+        return True
+
+    def partition(
+        self, files: List[Path], root: Path
+    ) -> Tuple[List[Path], int, int]:
+        """
+        Separa arquivos alterados dos que podem ser pulados
+
+        Returns:
+            Tupla (arquivos alterados, quantidade pulada, bytes pulados)
+        """
+        changed, skipped_files, skipped_bytes = self.partition_scanned(
+            [(file, file.stat()) for file in files], root
+        )
+        return [file for file, _ in changed], skipped_files, skipped_bytes
+
+    def partition_scanned(
+        self, files: List[Tuple[Path, os.stat_result]], root: Path
+    ) -> Tuple[List[Tuple[Path, os.stat_result]], int, int]:
+        """Igual a partition, reaproveitando o stat feito pela varredura"""
+        self.load()
+        changed: List[Tuple[Path, os.stat_result]] = []
+        skipped_files = 0
+        skipped_bytes = 0
+
+        # Mesmo tamanho com mtime diferente exige hash: calcula todos de uma vez
+        suspects = []
+        for file, stat in files:
+            entry = self.entries.get(self.key(file.relative_to(root)))
+            if entry and entry.size == stat.st_size and entry.mtime_ns != stat.st_mtime_ns:
+                suspects.append((file, stat))
+        self.prefetch_digests(suspects, root)
+
+        for file, stat in files:
+            if self.is_unchanged(file, file.relative_to(root), stat):
+                skipped_files += 1
+                skipped_bytes += stat.st_size
+            else:
+                changed.append((file, stat))
+
+        return changed, skipped_files, skipped_bytes
+
+    def record(self, file: Path, rel_path: Path, digest: Optional[str] = None) -> None:
+        """Registra um arquivo enviado com sucesso"""
+        key = self.key(rel_path)
+        stat = file.stat()
+        digest = digest or self._hashes.pop(key, None) or self.digest(file, rel_path, stat)
+        self.entries[key] = ManifestEntry(
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+            hash=digest
+        )
+        self._dirty = True
+
+    def _keys_under(self, key: str) -> List[str]:
+        prefix = key.rstrip("/") + "/"
+        return [rel for rel in self.entries if rel == key or rel.startswith(prefix)]
+
+    def rename(self, old_rel: Path, new_rel: Path) -> None:
+        """Acompanha a renomeação de um arquivo ou diretório no destino"""
+        self.load()
+        old, new = self.key(old_rel), self.key(new_rel)
+        # Entradas sobrescritas pela renomeação deixam de existir
+        for rel in self._keys_under(new):
+            del self.entries[rel]
+        for rel in self._keys_under(old):
+            self.entries[new + rel[len(old):]] = self.entries.pop(rel)
+        self._dirty = True
+
+    def remove(self, rel_path: Path) -> None:
+        """Esquece um arquivo ou diretório removido do destino"""
+        self.load()
+        for rel in self._keys_under(self.key(rel_path)):
+            del self.entries[rel]
+        self._dirty = True
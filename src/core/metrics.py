@@ -0,0 +1,318 @@
+"""
+Métricas estruturadas de deploy (JSON lines e textfile do Prometheus)
+"""
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import (
+    Any, AsyncIterable, AsyncIterator, ClassVar, Dict, Iterator, List, Optional, Tuple, TypeVar
+)
+import json
+import math
+import os
+import time
+
+from src.utils.logger import CustomLogger
+from src.core.profiling import record_span
+from src.core.progress import TransferStats
+from src.core.constants import (
+    METRICS_DIR,
+    METRICS_ENABLED,
+    METRICS_FILE_FORMAT,
+    METRICS_PREFIX
+)
+
+T = TypeVar("T")
+
+# Quantis de latência por arquivo publicados no relatório
+LATENCY_QUANTILES = (0.5, 0.9, 0.99)
+
+# Contadores do watcher gravados no relatório de cada lote
+WATCH_METRICS = (
+    "queue_depth", "pending", "overflows", "storms", "drop_syncs", "failure_syncs"
+)
+
+# Causa de sincronização completa -> contador do watcher
+WATCH_FULL_SYNC_COUNTERS = (
+    ("overflow", "overflows"),
+    ("storm", "storms"),
+    ("drop", "drop_syncs"),
+    ("failure", "failure_syncs"),
+)
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Percentil por posição mais próxima; values precisa estar ordenado"""
+    if not values:
+        return 0.0
+    rank = math.ceil(fraction * len(values))
+    return values[max(0, min(len(values), rank) - 1)]
+
+
+class DeployMetrics:
+    """
+    Números de uma execução de deploy de um host
+
+    Fases (scan, diff, connect, mkdir, transfer, record, operations) somam
+    o tempo gasto em cada etapa. Na varredura em streaming as etapas correm
+    em paralelo, então a soma das fases pode passar da duração total.
+    """
+
+    def __init__(self, host: str, protocol: str, mode: str = "deploy") -> None:
+        self.host = host
+        self.protocol = protocol
+        self.mode = mode
+        self.timestamp = time.time()
+        self.started = time.monotonic()
+        self.duration = 0.0
+        self.phases: Dict[str, float] = {}
+        self.latencies: List[float] = []
+        self.files_sent = 0
+        self.files_skipped = 0
+        self.files_failed = 0
+        self.bytes_transferred = 0
+        self.bytes_sent = 0
+        self.bytes_skipped = 0
+        self.retries = 0
+        self.lag: Optional[float] = None
+        self.watch: Optional[Dict[str, int]] = None
+        self.success = False
+        self.error = ""
+        self._last_stats: Optional[TransferStats] = None
+
+    def add_phase(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Soma à fase o tempo do bloco"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.add_phase(name, elapsed)
+            record_span(name, "phase", started, elapsed, host=self.host)
+
+    async def timed(self, name: str, items: AsyncIterable[T]) -> AsyncIterator[T]:
+        """Repassa items somando à fase apenas o tempo gasto esperando cada um"""
+        iterator = items.__aiter__()
+        while True:
+            started = time.perf_counter()
+            try:
+                item = await iterator.__anext__()
+            except StopAsyncIteration:
+                self.add_phase(name, time.perf_counter() - started)
+                return
+            elapsed = time.perf_counter() - started
+            self.add_phase(name, elapsed)
+            record_span(name, "phase", started, elapsed, host=self.host)
+            yield item
+
+    def record_file(self, seconds: float) -> None:
+        """Latência de envio de um arquivo"""
+        self.latencies.append(seconds)
+
+    def add_transfer(self, stats: TransferStats) -> None:
+        """Soma os contadores de uma transferência do ProgressManager"""
+        if stats is self._last_stats or not stats.start_time:
+            return
+        self._last_stats = stats
+        self.add_phase("transfer", stats.elapsed)
+        self.files_sent += stats.files_processed
+        self.files_skipped += stats.files_skipped
+        self.bytes_transferred += stats.bytes_transferred
+        self.bytes_sent += stats.bytes_sent
+        self.bytes_skipped += stats.bytes_skipped
+
+    def finish(self, success: bool, error: str = "") -> None:
+        self.duration = time.monotonic() - self.started
+        self.success = success
+        self.error = error
+
+    def latency_quantiles(self) -> Dict[str, float]:
+        latencies = sorted(self.latencies)
+        quantiles = {f"p{int(q * 100)}": percentile(latencies, q) for q in LATENCY_QUANTILES}
+        quantiles["max"] = latencies[-1] if latencies else 0.0
+        return quantiles
+
+    def to_record(self) -> Dict[str, Any]:
+        """Registro serializável em JSON"""
+        duration = self.duration or time.monotonic() - self.started
+        transfer = self.phases.get("transfer", 0.0)
+        record: Dict[str, Any] = {
+            "timestamp": datetime.fromtimestamp(self.timestamp, timezone.utc).isoformat(),
+            "host": self.host,
+            "protocol": self.protocol,
+            "mode": self.mode,
+            "success": self.success,
+            "error": self.error,
+            "duration": round(duration, 6),
+            "retries": self.retries,
+            "phases": {name: round(seconds, 6) for name, seconds in self.phases.items()},
+            "files": {
+                "sent": self.files_sent,
+                "skipped": self.files_skipped,
+                "failed": self.files_failed,
+            },
+            "bytes": {
+                "transferred": self.bytes_transferred,
+                "sent": self.bytes_sent,
+                "skipped": self.bytes_skipped,
+            },
+            "files_per_second": round(self.files_sent / transfer, 3) if transfer else 0.0,
+            "bytes_per_second": round(self.bytes_sent / transfer, 3) if transfer else 0.0,
+            "latency": {
+                name: round(seconds, 6) for name, seconds in self.latency_quantiles().items()
+            },
+        }
+        if self.lag is not None:
+            record["lag"] = round(self.lag, 6)
+        if self.watch is not None:
+            record["watch"] = dict(self.watch)
+        return record
+
+
+class MetricsExporter:
+    """
+    Grava os relatórios de deploy
+
+    Cada execução vira uma linha no arquivo JSON lines do mês. Com
+    prometheus_textfile configurado, o arquivo do textfile collector do
+    node_exporter é reescrito (de forma atômica) a cada relatório com a
+    última execução e os totais acumulados de cada host, o que no modo
+    watch permite acompanhar atraso e vazão ao longo do tempo.
+
+    Há uma instância por destino, compartilhada entre hosts e watchers.
+    """
+
+    _instances: ClassVar[Dict[Tuple[Path, Optional[Path]], "MetricsExporter"]] = {}
+
+    def __init__(self, directory: Path, prometheus_textfile: Optional[Path] = None) -> None:
+        self.logger = CustomLogger.get_logger(__name__)
+        self.directory = directory
+        self.prometheus_textfile = prometheus_textfile
+        self._last: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._totals: Dict[Tuple[str, str], Dict[str, float]] = {}
+
+    @classmethod
+    def for_config(cls, config: Dict[str, Any]) -> Optional["MetricsExporter"]:
+        """
+        Exportador da seção metrics da configuração, ou None se desativado
+
+        Desativado por padrão; informar path ou prometheus_textfile ativa
+        sem precisar de enabled.
+        """
+        configured = bool(config.get("path") or config.get("prometheus_textfile"))
+        if not config.get("enabled", METRICS_ENABLED or configured):
+            return None
+        directory = Path(config.get("path") or METRICS_DIR)
+        textfile = config.get("prometheus_textfile")
+        key = (directory, Path(textfile) if textfile else None)
+        if key not in cls._instances:
+            cls._instances[key] = cls(*key)
+        return cls._instances[key]
+
+    @property
+    def path(self) -> Path:
+        """Arquivo JSON lines do mês corrente"""
+        return self.directory / datetime.now().strftime(METRICS_FILE_FORMAT)
+
+    def export(self, metrics: DeployMetrics) -> None:
+        """Grava o relatório; falhas de escrita não interrompem o deploy"""
+        record = metrics.to_record()
+        self._accumulate(record)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            if self.prometheus_textfile:
+                self.write_textfile(self.prometheus_textfile)
+        except OSError as e:
+            self.logger.warning(f"Failed to write deploy metrics: {e}")
+
+    def _accumulate(self, record: Dict[str, Any]) -> None:
+        key = (record["host"], record["mode"])
+        self._last[key] = record
+        totals = self._totals.setdefault(key, {})
+        increments = {
+            "runs": 1,
+            "failures": 0 if record["success"] else 1,
+            "retries": record["retries"],
+            "files_sent": record["files"]["sent"],
+            "files_skipped": record["files"]["skipped"],
+            "files_failed": record["files"]["failed"],
+            "bytes_sent": record["bytes"]["sent"],
+            "bytes_skipped": record["bytes"]["skipped"],
+        }
+        for name, value in increments.items():
+            totals[name] = totals.get(name, 0) + value
+
+    def render_textfile(self) -> str:
+        """Conteúdo no formato de exposição de texto do Prometheus"""
+        lines: List[str] = []
+
+        def family(name: str, kind: str, help_text: str, samples: List[Tuple[str, float]]) -> None:
+            metric = f"{METRICS_PREFIX}_{name}"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+            lines.extend(f"{metric}{{{labels}}} {value:g}" for labels, value in samples)
+
+        def labels(key: Tuple[str, str], **extra: str) -> str:
+            pairs = {"host": key[0], "mode": key[1], **extra}
+            return ",".join(f'{name}="{_escape(value)}"' for name, value in pairs.items())
+
+        totals = sorted(self._totals.items())
+        last = sorted(self._last.items())
+        for name, help_text in [
+            ("runs", "Deploy runs"),
+            ("failures", "Failed deploy runs"),
+            ("retries", "Deploy retries"),
+            ("files_sent", "Files sent"),
+            ("files_skipped", "Unchanged files skipped"),
+            ("files_failed", "Files that failed to send"),
+            ("bytes_sent", "Bytes sent over the wire"),
+            ("bytes_skipped", "Bytes of unchanged files skipped"),
+        ]:
+            family(f"{name}_total", "counter", help_text,
+                   [(labels(key), values[name]) for key, values in totals])
+
+        family("last_success", "gauge", "Whether the last run succeeded",
+               [(labels(key), float(record["success"])) for key, record in last])
+        family("last_timestamp_seconds", "gauge", "Start of the last run (unix time)",
+               [(labels(key), datetime.fromisoformat(record["timestamp"]).timestamp())
+                for key, record in last])
+        family("last_duration_seconds", "gauge", "Duration of the last run",
+               [(labels(key), record["duration"]) for key, record in last])
+        family("last_phase_seconds", "gauge", "Time spent in each phase of the last run",
+               [(labels(key, phase=phase), seconds)
+                for key, record in last for phase, seconds in sorted(record["phases"].items())])
+        family("last_file_latency_seconds", "gauge", "Per-file send latency of the last run",
+               [(labels(key, quantile=name), seconds)
+                for key, record in last for name, seconds in record["latency"].items()])
+        family("last_bytes_per_second", "gauge", "Transfer throughput of the last run",
+               [(labels(key), record["bytes_per_second"]) for key, record in last])
+        family("last_files_per_second", "gauge", "Files sent per second in the last run",
+               [(labels(key), record["files_per_second"]) for key, record in last])
+        family("watch_lag_seconds", "gauge", "Time from the first change to its deploy",
+               [(labels(key), record["lag"]) for key, record in last if "lag" in record])
+        watch = [(key, record["watch"]) for key, record in last if "watch" in record]
+        family("watch_queue_depth", "gauge", "Changes waiting to be deployed, including the bridge",
+               [(labels(key), stats["queue_depth"]) for key, stats in watch])
+        family("watch_pending_changes", "gauge", "Changes pending in the next watch batch",
+               [(labels(key), stats["pending"]) for key, stats in watch])
+        family("watch_full_syncs_total", "counter", "Watch batches turned into a full sync",
+               [(labels(key, cause=cause), stats[field])
+                for key, stats in watch for cause, field in WATCH_FULL_SYNC_COUNTERS])
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: Path) -> None:
+        """Reescreve o arquivo do textfile collector sem expor escrita parcial"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        temp.write_text(self.render_textfile(), encoding="utf-8")
+        os.replace(temp, path)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
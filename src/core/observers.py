@@ -0,0 +1,109 @@
+"""
+Seleção do backend de monitoramento de arquivos
+"""
+from pathlib import Path
+from typing import Optional, Tuple
+import re
+import sys
+
+from watchdog.events import FileSystemEventHandler  # type: ignore
+from watchdog.observers import Observer  # type: ignore
+from watchdog.observers.api import BaseObserver  # type: ignore
+from watchdog.observers.polling import PollingObserver  # type: ignore
+
+from src.utils.logger import CustomLogger
+from src.i18n import I18n
+from src.core.constants import WATCH_INTERVAL, WATCH_OBSERVER
+
+# Sistemas de arquivos em que eventos nativos não refletem alterações remotas
+NETWORK_FILESYSTEMS = {
+    "nfs", "nfs4", "cifs", "smb", "smb2", "smb3", "smbfs", "ncpfs", "afs",
+    "9p", "davfs", "fuse.sshfs", "fuse.rclone", "fuse.s3fs", "vboxsf", "prl_fs",
+}
+
+logger = CustomLogger.get_logger(__name__)
+
+
+def filesystem_type(path: Path) -> Optional[str]:
+    """Tipo do sistema de arquivos que contém path, via /proc/mounts (Linux)"""
+    if not sys.platform.startswith("linux"):
+        return None
+
+    target = str(Path(path).resolve())
+    best: Tuple[int, Optional[str]] = (-1, None)
+    try:
+        with open("/proc/mounts", "r", encoding="utf-8") as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) < 3:
+                    continue
+                # Espaços no ponto de montagem vêm como \040
+                mount_point = re.sub(
+                    r"\\([0-7]{3})", lambda m: chr(int(m.group(1), 8)), fields[1]
+                )
+                if (
+                    target == mount_point
+                    or target.startswith(mount_point.rstrip("/") + "/")
+                ) and len(mount_point) > best[0]:
+                    best = (len(mount_point), fields[2])
+    except OSError:
+        return None
+    return best[1]
+
+
+def choose_backend(path: Path, mode: str = WATCH_OBSERVER) -> Tuple[str, str]:
+    """
+    Decide entre o observer nativo e o polling
+
+    Returns:
+        Tupla (backend, motivo), com backend "native" ou "polling"
+    """
+    if mode == "polling":
+        return "polling", "config"
+    if mode == "native":
+        return "native", "config"
+
+    fs_type = filesystem_type(path)
+    if fs_type in NETWORK_FILESYSTEMS:
+        return "polling", fs_type
+    return "native", fs_type or "auto"
+
+
+def start_observer(
+    handler: FileSystemEventHandler,
+    path: Path,
+    recursive: bool = True,
+    mode: str = WATCH_OBSERVER,
+    polling_interval: float = WATCH_INTERVAL
+) -> BaseObserver:
+    """
+    Cria, agenda e inicia o observer adequado para path
+
+    No modo auto o observer nativo (inotify, FSEvents, kqueue ou
+    ReadDirectoryChangesW) é usado exceto em sistemas de arquivos de rede;
+    se ele não puder ser iniciado, por exemplo pelo limite de watches do
+    inotify, o polling assume.
+    """
+    i18n = I18n()
+    backend, reason = choose_backend(path, mode)
+
+    if backend == "native":
+        observer = Observer()
+        try:
+            observer.schedule(handler, str(path), recursive=recursive)
+            observer.start()
+            logger.info(
+                i18n.get("watch.backend").format(path, type(observer).__name__, reason)
+            )
+            return observer
+        except OSError as e:
+            if mode == "native":
+                raise
+            logger.warning(f"Native file watcher unavailable ({e}), falling back to polling")
+            reason = "fallback"
+
+    observer = PollingObserver(timeout=polling_interval)
+    observer.schedule(handler, str(path), recursive=recursive)
+    observer.start()
+    logger.info(i18n.get("watch.backend").format(path, type(observer).__name__, reason))
+    return observer
@@ -0,0 +1,222 @@
+"""
+Perfil (cProfile) e trace de fases (Chrome trace-event) de execuções de deploy
+"""
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, ContextManager, Dict, Iterator, List, Optional
+import argparse
+import asyncio
+import cProfile
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+from src.utils.logger import CustomLogger
+from src.i18n import I18n
+from src.core.constants import (
+    PROFILE_DIR,
+    PROFILE_FILE_FORMAT,
+    TRACE_MAX_EVENTS,
+    TRACE_MEMORY_TOP
+)
+
+
+class Tracer:
+    """
+    Coleta spans no formato trace-event do Chrome (chrome://tracing, Perfetto)
+
+    Cada tarefa asyncio vira uma linha (tid) própria, então os workers de
+    transferência aparecem lado a lado. Acima de max_events os spans são
+    descartados e contados, para que um watch longo não esgote a memória.
+    """
+
+    def __init__(self, max_events: int = TRACE_MAX_EVENTS) -> None:
+        self.origin = time.perf_counter()
+        self.max_events = max_events
+        self.events: List[Dict[str, Any]] = []
+        self.dropped = 0
+        self.metadata: Dict[str, Any] = {}
+        self._tids: Dict[int, int] = {}
+
+    def _tid(self) -> int:
+        """Linha do trace: a tarefa asyncio atual ou, fora do loop, a thread"""
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        key = id(task) if task else threading.get_ident()
+        tid = self._tids.get(key)
+        if tid is None:
+            tid = self._tids[key] = len(self._tids) + 1
+            name = task.get_name() if task else threading.current_thread().name
+            self.events.append({
+                "name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid,
+                "args": {"name": name}
+            })
+        return tid
+
+    def record(
+        self, name: str, category: str, started: float, duration: float, **args: Any
+    ) -> None:
+        """Span já encerrado; started vem de time.perf_counter()"""
+        if len(self.events) >= self.max_events:
+            self.dropped += 1
+            return
+        self.events.append({
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": round((started - self.origin) * 1e6, 3),
+            "dur": round(duration * 1e6, 3),
+            "pid": os.getpid(),
+            "tid": self._tid(),
+            "args": args,
+        })
+
+    def write(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({
+                "traceEvents": self.events,
+                "displayTimeUnit": "ms",
+                "otherData": {**self.metadata, "dropped_events": self.dropped},
+            }, file)
+
+
+_tracer: Optional[Tracer] = None
+
+
+def record_span(name: str, category: str, started: float, duration: float, **args: Any) -> None:
+    """Registra um span se houver trace ativo; sem trace não custa nada além do teste"""
+    if _tracer is not None:
+        _tracer.record(name, category, started, duration, **args)
+
+
+@contextmanager
+def span(name: str, category: str = "deploy", **args: Any) -> Iterator[None]:
+    """Span em torno de um bloco"""
+    if _tracer is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _tracer.record(name, category, started, time.perf_counter() - started, **args)
+
+
+def output_path(value: Optional[str], suffix: str) -> Optional[Path]:
+    """
+    Arquivo de saída de --profile/--trace
+
+    None desliga a opção; a opção sem valor (string vazia) grava em
+    logs/profiles com data e hora no nome.
+    """
+    if value is None:
+        return None
+    if value:
+        return Path(value)
+    return PROFILE_DIR / (datetime.now().strftime(PROFILE_FILE_FORMAT) + suffix)
+
+
+def add_arguments(parser: argparse.ArgumentParser, i18n: I18n) -> None:
+    """Opções de diagnóstico comuns aos pontos de entrada"""
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="",
+        metavar="FILE",
+        help=i18n.get("cli.profile_help")
+    )
+    parser.add_argument(
+        "--trace",
+        nargs="?",
+        const="",
+        metavar="FILE",
+        help=i18n.get("cli.trace_help")
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help=i18n.get("cli.trace_memory_help")
+    )
+
+
+def diagnostics_from_args(args: argparse.Namespace) -> ContextManager[None]:
+    """diagnostics() configurado pelas opções de add_arguments"""
+    # --trace-memory sozinho implica --trace no local padrão
+    trace = "" if args.trace is None and args.trace_memory else args.trace
+    return diagnostics(
+        output_path(args.profile, ".prof"),
+        output_path(trace, ".trace.json"),
+        args.trace_memory
+    )
+
+
+def _memory_snapshot(top: int) -> Dict[str, Any]:
+    """Pico de memória e locais que mais alocaram, via tracemalloc"""
+    current, peak = tracemalloc.get_traced_memory()
+    statistics = tracemalloc.take_snapshot().statistics("lineno")[:top]
+    return {
+        "current_bytes": current,
+        "peak_bytes": peak,
+        "top_allocations": [
+            {"location": str(stat.traceback), "bytes": stat.size, "count": stat.count}
+            for stat in statistics
+        ],
+    }
+
+
+@contextmanager
+def diagnostics(
+    profile: Optional[Path] = None,
+    trace: Optional[Path] = None,
+    memory: bool = False
+) -> Iterator[None]:
+    """
+    Envolve uma execução com cProfile e/ou trace de fases
+
+    Os arquivos são gravados ao sair, inclusive quando a execução termina
+    com erro, sys.exit ou Ctrl+C, que é justamente quando o trace interessa.
+
+    Args:
+        profile: Arquivo .prof (pstats, snakeviz) ou None
+        trace: Arquivo .json de trace-event ou None
+        memory: Inclui no trace o pico de memória medido com tracemalloc
+    """
+    global _tracer
+    logger = CustomLogger.get_logger(__name__)
+    i18n = I18n()
+
+    profiler = cProfile.Profile() if profile else None
+    if trace:
+        _tracer = Tracer()
+        if memory:
+            tracemalloc.start()
+    if profiler:
+        profiler.enable()
+
+    try:
+        yield
+    finally:
+        if profiler and profile:
+            profiler.disable()
+            profile.parent.mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(str(profile))
+            logger.info(i18n.get("diagnostics.profile_saved").format(profile))
+
+        tracer, _tracer = _tracer, None
+        if tracer and trace:
+            if tracemalloc.is_tracing():
+                tracer.metadata["memory"] = _memory_snapshot(TRACE_MEMORY_TOP)
+                tracemalloc.stop()
+                logger.info(
+                    i18n.get("diagnostics.memory_peak").format(
+                        tracer.metadata["memory"]["peak_bytes"] / 1024 / 1024
+                    )
+                )
+            tracer.write(trace)
+            logger.info(i18n.get("diagnostics.trace_saved").format(trace))
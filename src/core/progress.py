@@ -1,15 +1,21 @@
 """
 Gerenciador de progresso para operações de deploy
 """
-from typing import Optional, Dict, Any
+from typing import Optional, TextIO
+import asyncio
+import math
 import time
 import sys
 from dataclasses import dataclass
-from datetime import datetime
-from threading import Lock
 
 from src.utils.logger import CustomLogger
 from src.i18n import I18n
+from src.core.profiling import span
+from src.core.constants import (
+    PROGRESS_LOG_INTERVAL,
+    PROGRESS_RENDER_INTERVAL,
+    PROGRESS_SPEED_WINDOW
+)
 
 
 @dataclass
@@ -17,63 +23,167 @@ class TransferStats:
     """Estatísticas de transferência"""
     bytes_total: int = 0
     bytes_transferred: int = 0
+    bytes_sent: int = 0
     start_time: float = 0.0
     current_file: str = ""
     files_total: int = 0
     files_processed: int = 0
+    files_skipped: int = 0
+    bytes_skipped: int = 0
+    scanning: bool = False
+    rate: float = 0.0  # Velocidade suavizada (EWMA), em bytes/segundo
 
     @property
     def progress(self) -> float:
         """Retorna o progresso em porcentagem"""
         return (self.bytes_transferred / self.bytes_total * 100) if self.bytes_total > 0 else 0
 
+    @property
+    def elapsed(self) -> float:
+        """Segundos desde o início da transferência"""
+        return time.monotonic() - self.start_time
+
     @property
     def speed(self) -> float:
-        """Retorna a velocidade em bytes/segundo"""
-        elapsed = time.time() - self.start_time
+        """Retorna a velocidade média em bytes/segundo"""
+        elapsed = self.elapsed
         return self.bytes_transferred / elapsed if elapsed > 0 else 0
 
     @property
     def eta(self) -> float:
         """Retorna o tempo estimado restante em segundos"""
-        if self.speed == 0:
+        speed = self.rate or self.speed
+        if speed == 0:
             return 0
-        return (self.bytes_total - self.bytes_transferred) / self.speed
+        return max(0, self.bytes_total - self.bytes_transferred) / speed
 
 
 class ProgressManager:
-    """Gerenciador de progresso para operações de deploy"""
+    """
+    Gerenciador de progresso para operações de deploy
+
+    O caminho quente (update_progress, a cada bloco enviado) só soma
+    contadores. A tela é desenhada por uma tarefa separada em intervalos
+    fixos, que também calcula a velocidade suavizada; sem terminal a barra
+    vira uma linha de log periódica. Todas as chamadas acontecem na thread
+    do loop de eventos.
+    """
 
-    def __init__(self):
+    def __init__(self, stream: Optional[TextIO] = None) -> None:
         self.logger = CustomLogger.get_logger(__name__)
         self.i18n = I18n()
         self.stats = TransferStats()
-        self._lock = Lock()
-        self._last_update = 0
-        self._update_interval = 0.1  # segundos
-
-    def start_transfer(self, total_bytes: int, total_files: int) -> None:
-        """Inicia uma nova transferência"""
-        with self._lock:
-            self.stats = TransferStats(
-                bytes_total=total_bytes,
-                files_total=total_files,
-                start_time=time.time()
-            )
-        self._print_progress()
+        self.stream = stream or sys.stdout
+        self.interactive = self.stream.isatty()
+        self.render_interval = PROGRESS_RENDER_INTERVAL
+        self.log_interval = PROGRESS_LOG_INTERVAL
+        self._renderer: Optional[asyncio.Task] = None
+        self._last_sample = (0.0, 0)
+        self._last_frame = ""
+        self._last_logged = (0, 0)
+        self._line_width = 0
+
+    def start_transfer(
+        self, total_bytes: int, total_files: int, scanning: bool = False
+    ) -> None:
+        """
+        Inicia uma nova transferência
+
+        Com scanning=True os totais crescem via add_total enquanto a
+        varredura da origem ainda está em andamento.
+        """
+        self.stats = TransferStats(
+            bytes_total=total_bytes,
+            files_total=total_files,
+            start_time=time.monotonic(),
+            scanning=scanning
+        )
+        self._last_sample = (self.stats.start_time, 0)
+        self._last_frame = ""
+        self._last_logged = (0, 0)
+        self._start_renderer()
+
+    def add_total(self, total_bytes: int, total_files: int) -> None:
+        """Soma ao total os arquivos encontrados pela varredura"""
+        self.stats.bytes_total += total_bytes
+        self.stats.files_total += total_files
+
+    def finish_scan(self) -> None:
+        """Marca o total como definitivo"""
+        self.stats.scanning = False
 
-    def update_progress(self, bytes_transferred: int, current_file: str) -> None:
-        """Atualiza o progresso da transferência"""
-        with self._lock:
-            self.stats.bytes_transferred += bytes_transferred
+    def register_skipped(self, files: int, size: int) -> None:
+        """Registra arquivos pulados por não terem mudado"""
+        self.stats.files_skipped += files
+        self.stats.bytes_skipped += size
+
+    def update_progress(
+        self,
+        bytes_transferred: int,
+        current_file: str,
+        bytes_sent: Optional[int] = None
+    ) -> None:
+        """
+        Soma bytes à transferência
+
+        Args:
+            bytes_transferred: Bytes lógicos sincronizados
+            current_file: Arquivo em transferência
+            bytes_sent: Bytes efetivamente enviados, se diferentes (delta)
+        """
+        stats = self.stats
+        stats.bytes_transferred += bytes_transferred
+        stats.bytes_sent += bytes_transferred if bytes_sent is None else bytes_sent
+        stats.current_file = current_file
+
+    def file_completed(self, current_file: str = "") -> None:
+        """Conta um arquivo concluído"""
+        self.stats.files_processed += 1
+        if current_file:
             self.stats.current_file = current_file
-            self.stats.files_processed += 1
 
-        # Limita atualizações de tela
-        current_time = time.time()
-        if current_time - self._last_update >= self._update_interval:
-            self._print_progress()
-            self._last_update = current_time
+    def _start_renderer(self) -> None:
+        """Inicia a tarefa de desenho, se houver um loop em execução"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._renderer is None or self._renderer.done():
+            self._renderer = loop.create_task(self._render_loop())
+
+    def _stop_renderer(self) -> None:
+        if self._renderer is not None:
+            self._renderer.cancel()
+            self._renderer = None
+
+    async def _render_loop(self) -> None:
+        """Desenha a barra (terminal) ou registra linhas de log (sem terminal)"""
+        interval = self.render_interval if self.interactive else self.log_interval
+        while True:
+            await asyncio.sleep(interval)
+            with span("render", "progress"):
+                self.sample()
+                if self.interactive:
+                    self._print_progress()
+                else:
+                    self._log_progress()
+
+    def sample(self, now: Optional[float] = None) -> None:
+        """Atualiza a velocidade suavizada com os bytes desde a última amostra"""
+        now = time.monotonic() if now is None else now
+        last_time, last_bytes = self._last_sample
+        elapsed = now - last_time
+        if elapsed <= 0:
+            return
+
+        instant = (self.stats.bytes_transferred - last_bytes) / elapsed
+        # Peso proporcional ao intervalo: amostras irregulares pesam o justo
+        alpha = 1 - math.exp(-elapsed / PROGRESS_SPEED_WINDOW)
+        if self.stats.rate == 0:
+            self.stats.rate = instant
+        else:
+            self.stats.rate += alpha * (instant - self.stats.rate)
+        self._last_sample = (now, self.stats.bytes_transferred)
 
     def _format_size(self, size: float) -> str:
         """Formata tamanho em bytes para formato legível"""
@@ -93,46 +203,91 @@ class ProgressManager:
         hours = minutes / 60
         return f"{hours:.0f}h {minutes % 60:.0f}m"
 
+    def _files_counter(self) -> str:
+        return (
+            f"{self.stats.files_processed}/{self.stats.files_total}"
+            f"{'+' if self.stats.scanning else ''} files"
+        )
+
     def _print_progress(self) -> None:
         """Imprime barra de progresso no console"""
         width = 50
-        progress = int(width * self.stats.progress / 100)
-        
+        progress = int(width * min(self.stats.progress, 100) / 100)
+
         # Formata a barra de progresso
         bar = f"[{'=' * progress}{' ' * (width - progress)}]"
-        
+
         # Formata estatísticas
         stats = (
             f"{self.stats.progress:.1f}% "
-            f"| {self._format_size(self.stats.speed)}/s "
+            f"| {self._format_size(self.stats.rate)}/s "
             f"| ETA: {self._format_time(self.stats.eta)} "
-            f"| {self.stats.files_processed}/{self.stats.files_total} files"
+            f"| {self._files_counter()}"
         )
 
-        # Limpa linha anterior e imprime progresso
-        sys.stdout.write("\r" + " " * 80 + "\r")  # Limpa linha
-        sys.stdout.write(f"{bar} {stats}")
-        sys.stdout.flush()
+        frame = f"{bar} {stats}"
+        if frame == self._last_frame:
+            return
+        self._last_frame = frame
 
-        # Log para arquivo
-        if self.stats.progress % 10 == 0:  # Log a cada 10%
-            self.logger.info(
-                f"Progress: {self.stats.progress:.1f}% "
-                f"| Speed: {self._format_size(self.stats.speed)}/s "
-                f"| File: {self.stats.current_file}"
-            )
+        # Sobrescreve a linha anterior, apagando sobras de um quadro mais longo
+        self.stream.write("\r" + frame.ljust(self._line_width))
+        self.stream.flush()
+        self._line_width = len(frame)
+
+    def _log_progress(self) -> None:
+        """Linha de progresso para logs quando stdout não é um terminal"""
+        counters = (self.stats.bytes_transferred, self.stats.files_processed)
+        if counters == self._last_logged:
+            return
+        self._last_logged = counters
+        self.logger.info(
+            f"Progress: {self.stats.progress:.1f}% "
+            f"| {self._files_counter()} "
+            f"| Speed: {self._format_size(self.stats.rate)}/s "
+            f"| ETA: {self._format_time(self.stats.eta)}"
+        )
+
+    def abort(self) -> None:
+        """
+        Encerra uma transferência interrompida, sem o resumo de conclusão
+
+        Para a tarefa de desenho e termina a linha da barra, para que uma
+        falha (e a nova tentativa) não deixe um renderizador antigo ativo.
+        """
+        self._stop_renderer()
+        if self.interactive and self._line_width:
+            self.stream.write("\n")
+            self.stream.flush()
+            self._line_width = 0
 
     def complete(self) -> None:
         """Finaliza a transferência"""
-        self._print_progress()
-        sys.stdout.write("\n")
-        sys.stdout.flush()
-        
+        self._stop_renderer()
+        if self.interactive:
+            self.sample()
+            self._print_progress()
+            self.stream.write("\n")
+            self.stream.flush()
+            self._line_width = 0
+
         # Log final
-        elapsed = time.time() - self.stats.start_time
         self.logger.info(
-            f"Transfer completed: {self._format_size(self.stats.bytes_total)} "
-            f"in {self._format_time(elapsed)} "
+            f"Transfer completed: {self._format_size(self.stats.bytes_transferred)} "
+            f"in {self._format_time(self.stats.elapsed)} "
             f"({self._format_size(self.stats.speed)}/s)"
         )
-        
\ No newline at end of file
+        if self.stats.bytes_sent != self.stats.bytes_transferred:
+            self.logger.info(
+                self.i18n.get("deploy.summary.sent").format(
+                    self._format_size(self.stats.bytes_sent),
+                    self._format_size(self.stats.bytes_transferred)
+                )
+            )
+        if self.stats.files_skipped:
+            self.logger.info(
+                self.i18n.get("deploy.summary.skipped").format(
+                    self.stats.files_skipped,
+                    self._format_size(self.stats.bytes_skipped)
+                )
+            )
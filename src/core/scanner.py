@@ -0,0 +1,85 @@
+"""
+Varredura incremental da árvore de origem
+"""
+from pathlib import Path
+from typing import AsyncIterator, List, Optional, Tuple
+import asyncio
+import os
+
+from src.core.constants import SCAN_BATCH_SIZE
+from src.core.ignore_rules import IgnoreRules
+from src.utils.logger import CustomLogger
+
+ScannedFile = Tuple[Path, os.stat_result]
+
+logger = CustomLogger.get_logger(__name__)
+
+
+def scan_directory(
+    path: Path, prefix: str = "", ignore: Optional[IgnoreRules] = None
+) -> Tuple[List[ScannedFile], List[Path]]:
+    """
+    Lista um único diretório
+
+    Args:
+        path: Diretório a listar
+        prefix: Caminho relativo do diretório na raiz, com '/' final
+        ignore: Regras aplicadas às entradas; diretórios ignorados são podados
+
+    Returns:
+        Tupla (arquivos com stat, subdiretórios)
+    """
+    files: List[ScannedFile] = []
+    directories: List[Path] = []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if ignore and ignore.match(prefix + entry.name, True):
+                        continue
+                    directories.append(Path(entry.path))
+                elif entry.is_file():
+                    if ignore and ignore.match(prefix + entry.name):
+                        continue
+                    files.append((Path(entry.path), entry.stat()))
+            except OSError:
+                # Removido durante a varredura
+                continue
+    files.sort(key=lambda item: item[0].name)
+    directories.sort()
+    return files, directories
+
+
+async def walk_files(
+    root: Path,
+    ignore: Optional[IgnoreRules] = None,
+    batch_size: int = SCAN_BATCH_SIZE,
+    start: Optional[Path] = None
+) -> AsyncIterator[List[ScannedFile]]:
+    """
+    Percorre a árvore entregando lotes de arquivos assim que são listados
+
+    Cada diretório é lido em uma thread, então o loop continua livre para os
+    envios enquanto a varredura avança. Diretórios ignorados não são
+    percorridos e links simbólicos para diretórios não são seguidos. Com
+    start, só a subárvore start é percorrida, mas as regras continuam
+    relativas a root.
+    """
+    pending = [start or root]
+    while pending:
+        directory = pending.pop()
+        prefix = "" if directory == root else directory.relative_to(root).as_posix() + "/"
+        try:
+            files, directories = await asyncio.to_thread(
+                scan_directory, directory, prefix, ignore
+            )
+        except OSError as e:
+            if directory == (start or root):
+                raise
+            logger.warning(f"Skipping unreadable directory {directory}: {e}")
+            continue
+
+        # Pilha invertida mantém a ordem alfabética na descida
+        pending.extend(reversed(directories))
+        for offset in range(0, len(files), batch_size):
+            yield files[offset:offset + batch_size]
@@ -0,0 +1,135 @@
+"""
+Índice persistente de stat e hash dos arquivos de origem
+"""
+from pathlib import Path
+from typing import Callable, ClassVar, Dict, Optional, Tuple
+import hashlib
+import os
+import sqlite3
+import threading
+
+from src.core.constants import MANIFEST_HASH_ALGORITHM, STAT_INDEX_DIR
+from src.utils.logger import CustomLogger
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    inode INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    algorithm TEXT NOT NULL,
+    hash TEXT NOT NULL
+)
+"""
+
+
+class StatIndex:
+    """
+    Cache em SQLite do hash de conteúdo por assinatura de stat
+
+    Há um índice por diretório de origem, compartilhado por todos os hosts
+    que publicam a mesma origem. Enquanto inode, tamanho e mtime_ns de um
+    arquivo não mudam, o hash registrado é reaproveitado sem ler o arquivo.
+    """
+
+    _instances: ClassVar[Dict[Tuple[str, str], "StatIndex"]] = {}
+    _instances_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def __init__(self, source_path: Path, index_dir: Optional[Path] = None) -> None:
+        self.logger = CustomLogger.get_logger(__name__)
+        self.source_path = str(Path(source_path).resolve())
+        name = hashlib.sha1(
+            self.source_path.encode("utf-8"), usedforsecurity=False
+        ).hexdigest()[:16]
+        self.path = (index_dir or STAT_INDEX_DIR) / f"{name}.sqlite"
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    @classmethod
+    def for_source(
+        cls, source_path: Path, index_dir: Optional[Path] = None
+    ) -> "StatIndex":
+        """Retorna a instância compartilhada do índice de uma origem"""
+        # Resolvido na chamada, não na definição, para que testes o redirecionem
+        index_dir = index_dir or STAT_INDEX_DIR
+        key = (str(index_dir), str(Path(source_path).resolve()))
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(source_path, index_dir)
+            return cls._instances[key]
+
+    @staticmethod
+    def signature(stat: os.stat_result) -> Tuple[int, int, int]:
+        """Assinatura usada para decidir se o conteúdo precisa ser relido"""
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def _connect(self) -> sqlite3.Connection:
+        """Abre o banco sob demanda; chamado com o lock adquirido"""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def lookup(
+        self, rel_path: str, stat: os.stat_result, algorithm: str = MANIFEST_HASH_ALGORITHM
+    ) -> Optional[str]:
+        """Hash registrado se a assinatura do arquivo não mudou"""
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT inode, size, mtime_ns, algorithm, hash FROM files WHERE path = ?",
+                (rel_path,)
+            ).fetchone()
+        if row and tuple(row[:3]) == self.signature(stat) and row[3] == algorithm:
+            return row[4]
+        return None
+
+    def store(
+        self,
+        rel_path: str,
+        stat: os.stat_result,
+        digest: str,
+        algorithm: str = MANIFEST_HASH_ALGORITHM
+    ) -> None:
+        """Registra o hash do arquivo para a assinatura atual"""
+        with self._lock:
+            self._connect().execute(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)",
+                (rel_path, *self.signature(stat), algorithm, digest)
+            )
+            self._pending += 1
+
+    def digest(
+        self,
+        file: Path,
+        rel_path: str,
+        compute: Callable[[Path], str],
+        stat: Optional[os.stat_result] = None,
+        algorithm: str = MANIFEST_HASH_ALGORITHM
+    ) -> str:
+        """Hash do arquivo, lido do índice ou calculado com compute e registrado"""
+        stat = stat or file.stat()
+        digest = self.lookup(rel_path, stat, algorithm)
+        if digest is None:
+            digest = compute(file)
+            self.store(rel_path, stat, digest, algorithm)
+        return digest
+
+    def flush(self) -> None:
+        """Grava as alterações pendentes"""
+        with self._lock:
+            if self._conn is not None and self._pending:
+                self._conn.commit()
+                self._pending = 0
+
+    def close(self) -> None:
+        """Grava e fecha o banco"""
+        self.flush()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
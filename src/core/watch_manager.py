@@ -4,12 +4,13 @@ from typing import Dict, Any, Optional, Union, Awaitable, Callable, TYPE_CHECKIN
 import asyncio
 from watchdog.events import FileSystemEventHandler, FileModifiedEvent, DirModifiedEvent
 from watchdog.observers.api import BaseObserver as Observer
-from watchdog.observers.polling import PollingObserverVFS
 
 from src.utils.logger import CustomLogger
+from src.core.event_bridge import EventBridge
+from src.core.observers import start_observer
 from src.core.constants import (
     WATCH_RECURSIVE,
-    WATCH_OBSERVER_CLASS,
+    WATCH_OBSERVER,
     WATCH_PATTERNS,
     WATCH_DELAY,
     WATCH_INTERVAL
@@ -20,10 +21,44 @@ if TYPE_CHECKING:
 
 
 class AsyncWatchEventHandler(FileSystemEventHandler):
+    """
+    Encaminha modificações de arquivos para uma corrotina no loop
+
+    Os eventos chegam na thread do observer, onde não há loop; bind() liga
+    o handler ao loop e uma única tarefa consome os lotes da ponte, chamando
+    on_change uma vez por caminho em cada lote.
+    """
+
     def __init__(self, on_change: Callable[[Path], Awaitable[None]]) -> None:
         super().__init__()
         self.on_change = on_change
         self.logger = CustomLogger.get_logger(__name__)
+        self._bridge: Optional[EventBridge[Path]] = None
+        self._consumer: Optional[asyncio.Task] = None
+        self.coalesced = 0
+
+    def bind(self) -> None:
+        """Liga o handler ao loop em execução; chamar antes de iniciar o observer"""
+        if self._consumer is not None:
+            return
+        self._bridge = EventBridge(asyncio.get_running_loop())
+        self._consumer = asyncio.create_task(self._consume())
+
+    def unbind(self) -> None:
+        """Encerra a tarefa consumidora"""
+        if self._consumer is not None:
+            self._consumer.cancel()
+            self._consumer = None
+        self._bridge = None
+
+    async def _consume(self) -> None:
+        assert self._bridge is not None
+        while True:
+            batch = await self._bridge.get()
+            paths = list(dict.fromkeys(batch))
+            self.coalesced += len(batch) - len(paths)
+            for path in paths:
+                await self._handle_change(path)
 
     async def _handle_change(self, path: Path) -> None:
         try:
@@ -35,7 +70,8 @@ class AsyncWatchEventHandler(FileSystemEventHandler):
         if not isinstance(event, (DirModifiedEvent, FileModifiedEvent)) or event.is_directory:
             return
 
-        asyncio.create_task(self._handle_change(Path(event.src_path)))
+        if self._bridge is not None:
+            self._bridge.put(Path(event.src_path))
 
 
 class WatchManager:
@@ -51,22 +87,22 @@ class WatchManager:
             return
 
         try:
-            observer_class = globals().get(WATCH_OBSERVER_CLASS, PollingObserverVFS)
-            self.observer = Observer(emitter_class=observer_class)
+            watch_config = self.config.get("watch", {})
             watch_path = Path(self.config.get("source_path", "."))
-            
-            self.observer.schedule(
-                self.handler, 
-                str(watch_path), 
-                recursive=WATCH_RECURSIVE
+            self.handler.bind()
+            self.observer = start_observer(
+                self.handler,
+                watch_path,
+                recursive=WATCH_RECURSIVE,
+                mode=watch_config.get("observer", WATCH_OBSERVER),
+                polling_interval=watch_config.get("interval", WATCH_INTERVAL)
             )
-            
-            self.observer.start()
             await asyncio.sleep(WATCH_DELAY)  # Aguarda inicialização
             self.logger.info(f"Started watching directory: {watch_path}")
             
         except Exception as e:
             self.logger.error(f"Failed to start watching: {e}")
+            self.handler.unbind()
             self.observer = None
             raise
 
@@ -78,6 +114,7 @@ class WatchManager:
             self.observer.stop()
             self.observer.join(timeout=WATCH_INTERVAL)
             self.observer = None
+            self.handler.unbind()
             self.logger.info("Stopped watching")
         except Exception as e:
             self.logger.error(f"Failed to stop watching: {e}")
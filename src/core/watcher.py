@@ -3,14 +3,52 @@ Sistema de monitoramento de arquivos
 """
 import asyncio
 from pathlib import Path
-from typing import Set, Dict, Any, Optional
+from typing import Dict, Optional, Tuple
 import time
-from watchdog.observers import Observer  # type: ignore
-from watchdog.events import FileSystemEventHandler, FileSystemEvent  # type: ignore
+from watchdog.observers.api import BaseObserver  # type: ignore
+from watchdog.events import (  # type: ignore
+    EVENT_TYPE_CLOSED,
+    EVENT_TYPE_CREATED,
+    EVENT_TYPE_DELETED,
+    EVENT_TYPE_MODIFIED,
+    EVENT_TYPE_MOVED,
+    FileSystemEventHandler,
+    FileSystemEvent
+)
 
 from src.utils.logger import CustomLogger
 from src.i18n import I18n
 from src.deployers.base_deployer import BaseDeployer
+from src.deployers.connection_pool import ConnectionPool
+from src.core.changes import ChangeBatch, ChangeKind, ChangeSet, FullSyncCause
+from src.core.editor_files import is_scratch_file, is_transient, save_artifact_target
+from src.core.event_bridge import EventBridge
+from src.core.metrics import WATCH_METRICS, DeployMetrics
+from src.core.observers import start_observer
+from src.core.profiling import span
+from src.core.constants import (
+    WATCH_CATCH_UP,
+    WATCH_EDITOR_FILTER,
+    WATCH_INTERVAL,
+    WATCH_MAX_LATENCY,
+    WATCH_MAX_PENDING,
+    WATCH_OBSERVER,
+    WATCH_QUIET_PERIOD,
+    WATCH_STORM_RATE,
+    WATCH_STORM_SETTLE,
+    WATCH_SYNC_DELETES
+)
+
+# Eventos de escrita; aberturas e leituras não alteram o arquivo
+_EVENT_KINDS = {
+    EVENT_TYPE_CREATED: ChangeKind.CREATED,
+    EVENT_TYPE_MODIFIED: ChangeKind.MODIFIED,
+    EVENT_TYPE_CLOSED: ChangeKind.MODIFIED,
+    EVENT_TYPE_DELETED: ChangeKind.DELETED,
+}
+
+# (caminho, tipo, destino da renomeação, é diretório)
+WatchEvent = Tuple[Path, ChangeKind, Optional[Path], bool]
 
 
 class DeployEventHandler(FileSystemEventHandler):
@@ -19,22 +57,57 @@ class DeployEventHandler(FileSystemEventHandler):
     def __init__(self, watcher: "FileWatcher"):
         self.watcher = watcher
         self.logger = CustomLogger.get_logger(__name__)
-        self._cooldown = 1.0  # segundos
-        self._last_event: Dict[str, float] = {}
+        self.transient = 0
 
     def on_any_event(self, event: FileSystemEvent) -> None:
         """Processa qualquer evento do sistema de arquivos"""
-        if event.is_directory:
+        if event.event_type == EVENT_TYPE_MOVED:
+            self._moved(Path(event.src_path), Path(event.dest_path), event.is_directory)
+        elif event.is_directory:
+            # Diretórios são criados junto com os arquivos enviados
+            if event.event_type == EVENT_TYPE_DELETED:
+                self._queue(Path(event.src_path), ChangeKind.DELETED, is_dir=True)
+        elif event.event_type in _EVENT_KINDS:
+            self._queue(Path(event.src_path), _EVENT_KINDS[event.event_type])
+
+    def _moved(self, src: Path, dest: Path, is_dir: bool) -> None:
+        """Renomeação; entrar ou sair dos ignorados vira criação ou remoção"""
+        src_ignored, dest_ignored = self._skip(src), self._skip(dest)
+        if src_ignored and dest_ignored:
             return
+        if dest_ignored:
+            self.watcher.queue_change(src, ChangeKind.DELETED, is_dir=is_dir)
+        elif src_ignored:
+            # Os arquivos de um diretório chegam em eventos próprios
+            if not is_dir:
+                self.watcher.queue_change(dest, ChangeKind.CREATED)
+        else:
+            self.watcher.queue_change(src, ChangeKind.MOVED, dest=dest, is_dir=is_dir)
 
-        # Evita eventos duplicados usando cooldown
-        current_time = time.time()
-        if event.src_path in self._last_event:
-            if current_time - self._last_event[event.src_path] < self._cooldown:
+    def _skip(self, path: Path) -> bool:
+        """Caminhos que não chegam ao deployer: ignorados ou temporários de editor"""
+        if self.watcher.editor_filter and is_transient(path):
+            self.transient += 1
+            return True
+        return self.watcher.deployer.should_ignore(path)
+
+    def _queue(self, path: Path, kind: ChangeKind, is_dir: bool = False) -> None:
+        if not is_dir and self.watcher.editor_filter:
+            is_artifact, target = save_artifact_target(path)
+            if is_artifact or is_scratch_file(path):
+                self.transient += 1
+                # Temporário ou backup removido: o salvamento do alvo terminou
+                if (
+                    kind == ChangeKind.DELETED
+                    and target is not None
+                    and target.is_file()
+                    and not self.watcher.deployer.should_ignore(target)
+                ):
+                    self.watcher.queue_change(target, ChangeKind.MODIFIED)
                 return
 
-        self._last_event[event.src_path] = current_time
-        self.watcher.queue_change(Path(event.src_path))
+        if not self.watcher.deployer.should_ignore(path):
+            self.watcher.queue_change(path, kind, is_dir=is_dir)
 
 
 class FileWatcher:
@@ -44,27 +117,147 @@ class FileWatcher:
         self.logger = CustomLogger.get_logger(__name__)
         self.i18n = I18n()
         self.deployer = deployer
-        self.observer = Observer()
+        self.observer: Optional[BaseObserver] = None
         self.handler = DeployEventHandler(self)
-        self._pending_changes: Set[Path] = set()
+        watch_config = deployer.config.get("watch", {})
+        self._pending_changes = ChangeSet(watch_config.get("max_pending", WATCH_MAX_PENDING))
         self._running = False
         self._process_lock = asyncio.Lock()
+        self._bridge: Optional[EventBridge[WatchEvent]] = None
+        self._consumer: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._path: Optional[Path] = None
+        self._batch_started = 0.0
+        self._last_event = 0.0
+        self._window_started = 0.0
+        self._window_events = 0
+        self.connection_pool = ConnectionPool()
+
+        self.quiet_period = watch_config.get("quiet_period", WATCH_QUIET_PERIOD)
+        self.max_latency = watch_config.get("max_latency", WATCH_MAX_LATENCY)
+        self.sync_deletes = watch_config.get("sync_deletes", WATCH_SYNC_DELETES)
+        self.storm_rate = watch_config.get("storm_rate", WATCH_STORM_RATE)
+        self.storm_settle = watch_config.get("storm_settle", WATCH_STORM_SETTLE)
+        self.editor_filter = watch_config.get("editor_filter", WATCH_EDITOR_FILTER)
+
+    def queue_change(
+        self,
+        path: Path,
+        kind: ChangeKind = ChangeKind.MODIFIED,
+        dest: Optional[Path] = None,
+        is_dir: bool = False
+    ) -> None:
+        """Adiciona uma alteração à fila; chamado pela thread do observer"""
+        if self._bridge is not None:
+            self._bridge.put((path, kind, dest, is_dir))
+
+    async def _consume_events(self) -> None:
+        """Única tarefa que aplica os eventos da ponte ao lote pendente"""
+        assert self._bridge is not None
+        while True:
+            for event in await self._bridge.get():
+                self._record_change(*event)
+
+    def _on_events_dropped(self, count: int) -> None:
+        """Eventos perdidos exigem uma varredura para reconciliar o destino"""
+        self._touch()
+        self._pending_changes.require_full_sync(FullSyncCause.DROP)
+        self._wakeup.set()
+
+    def _touch(self) -> None:
+        """Marca a chegada de um evento para o debounce"""
+        now = time.monotonic()
+        if not self._pending_changes:
+            self._batch_started = now
+        self._last_event = now
+
+        if now - self._window_started >= 1.0:
+            self._window_started = now
+            self._window_events = 0
+        self._window_events += 1
+        if self._window_events > self.storm_rate and not self._pending_changes.full_sync:
+            # git checkout, npm install, builds: repetir cada evento sai caro
+            self.logger.warning(self.i18n.get("watch.storm").format(self._window_events))
+            self._pending_changes.require_full_sync(FullSyncCause.STORM)
+
+    @property
+    def storms(self) -> int:
+        """Tempestades de eventos que viraram sincronização completa"""
+        return self._pending_changes.full_syncs[FullSyncCause.STORM]
+
+    @property
+    def queue_depth(self) -> int:
+        """Alterações aguardando envio, incluindo eventos ainda na ponte"""
+        bridge_depth = self._bridge.qsize() if self._bridge else 0
+        return len(self._pending_changes) + bridge_depth
+
+    def stats(self) -> Dict[str, int]:
+        """Contadores de pressão do watcher"""
+        bridge = self._bridge
+        return {
+            "received": bridge.received if bridge else 0,
+            "batches": bridge.batches if bridge else 0,
+            "dropped": bridge.dropped if bridge else 0,
+            "coalesced": self._pending_changes.coalesced,
+            "pending": len(self._pending_changes),
+            "queue_depth": self.queue_depth,
+            "overflows": self._pending_changes.overflows,
+            "storms": self.storms,
+            "drop_syncs": self._pending_changes.full_syncs[FullSyncCause.DROP],
+            "failure_syncs": self._pending_changes.full_syncs[FullSyncCause.FAILURE],
+            "transient": self.handler.transient,
+        }
 
-    def queue_change(self, path: Path) -> None:
-        """Adiciona arquivo à fila de mudanças"""
-        self._pending_changes.add(path)
+    def _record_change(
+        self,
+        path: Path,
+        kind: ChangeKind,
+        dest: Optional[Path] = None,
+        is_dir: bool = False
+    ) -> None:
+        """Registra a alteração no loop e acorda o debounce"""
+        self._touch()
+        overflows = self._pending_changes.overflows
+        if kind == ChangeKind.MOVED and dest is not None:
+            self._pending_changes.move(path, dest, is_dir)
+        elif is_dir:
+            self._pending_changes.remove_dir(path)
+        else:
+            self._pending_changes.add(path, kind)
+        if self._pending_changes.overflows != overflows:
+            self.logger.warning(
+                f"Watch backlog reached {self._pending_changes.max_paths} changes "
+                f"({self.queue_depth} queued), switching to a full sync"
+            )
+        self._wakeup.set()
 
     async def start(self, path: Path) -> None:
         """Inicia monitoramento"""
         try:
             self.logger.info(self.i18n.get("watch.started").format(path))
-            self.observer.schedule(self.handler, str(path), recursive=True)
-            self.observer.start()
+            self._path = path
+            self._bridge = EventBridge(
+                asyncio.get_running_loop(), on_drop=self._on_events_dropped
+            )
+            self._consumer = asyncio.create_task(self._consume_events())
+            self.connection_pool.register(self.deployer)
+            watch_config = self.deployer.config.get("watch", {})
+            self.observer = start_observer(
+                self.handler,
+                path,
+                recursive=True,
+                mode=watch_config.get("observer", WATCH_OBSERVER),
+                polling_interval=watch_config.get("interval", WATCH_INTERVAL)
+            )
             self._running = True
+            await self._catch_up(path)
 
             while self._running:
-                await self._process_changes()
-                await asyncio.sleep(1)
+                await self._wakeup.wait()
+                await self._wait_for_quiet()
+                self._wakeup.clear()
+                if self._running:
+                    await self._process_changes()
 
         except Exception as e:
             self.logger.error(self.i18n.get("watch.error").format(path, e))
@@ -75,30 +268,142 @@ class FileWatcher:
     async def stop(self) -> None:
         """Para monitoramento"""
         self._running = False
-        self.observer.stop()
-        self.observer.join()
+        self._wakeup.set()
+        if self.observer:
+            self.observer.stop()
+            self.observer.join()
+            self.observer = None
+        if self._consumer:
+            self._consumer.cancel()
+            self._consumer = None
+        await self.connection_pool.close()
+        stats = self.stats()
+        self.logger.info(
+            self.i18n.get("watch.stats").format(
+                stats["received"], stats["coalesced"], stats["dropped"],
+                stats["overflows"], stats["storms"], stats["drop_syncs"]
+            )
+        )
         self.logger.info(self.i18n.get("watch.stopped").format(self.deployer.source_path))
 
+    async def _wait_for_quiet(self) -> None:
+        """
+        Espera o lote assentar
+
+        O lote sai quando nenhum evento chega durante quiet_period ou, sob
+        alterações contínuas, quando o primeiro evento completa max_latency.
+        Um lote que virou sincronização completa espera storm_settle sem
+        eventos, sem limite de latência: sincronizar no meio da tempestade
+        só repetiria a varredura.
+        """
+        while self._running and self._pending_changes:
+            if self._pending_changes.full_sync:
+                deadline = self._last_event + self.storm_settle
+            else:
+                deadline = min(
+                    self._last_event + self.quiet_period,
+                    self._batch_started + self.max_latency
+                )
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            await asyncio.sleep(remaining)
+
+    async def _catch_up(self, path: Path) -> None:
+        """
+        Sincroniza o que mudou enquanto o watch estava parado
+
+        Com o manifesto e o índice de stat a varredura só relê arquivos cuja
+        assinatura mudou. Eventos que chegam durante a sincronização ficam na
+        fila normal.
+        """
+        watch_config = self.deployer.config.get("watch", {})
+        if not self.deployer.incremental or not watch_config.get("catch_up", WATCH_CATCH_UP):
+            return
+
+        self.logger.info(self.i18n.get("watch.catch_up"))
+        async with self._process_lock:
+            self.deployer.begin_metrics("catch_up")
+            try:
+                await self.deployer.deploy_directory(path)
+                self.deployer.export_metrics(True)
+            except Exception as e:
+                self.logger.error(self.i18n.get("watch.error.monitor").format(str(e)))
+                self.deployer.export_metrics(False, str(e))
+
     async def _process_changes(self) -> None:
-        """Processa arquivos modificados"""
+        """
+        Envia o lote pendente
+
+        Se o envio falha, o lote drenado não se perde: o próximo vira uma
+        sincronização completa, disparada pelo próximo evento.
+        """
         if not self._pending_changes:
             return
 
         async with self._process_lock:
+            metrics = self.deployer.begin_metrics("watch")
+            batch_started = self._batch_started
             try:
-                files = list(self._pending_changes)
-                self._pending_changes.clear()
-
-                if files:
-                    self.logger.info(
-                        self.i18n.get("watch.changes_detected").format(
-                            len(files),
-                            self.deployer.host_name
-                        )
-                    )
-                    await self.deployer.deploy_files(files)
-
+                batch = self._pending_changes.drain()
+                with span("watch batch", host=self.deployer.host_name, changes=len(batch)):
+                    await self._deploy_batch(batch)
+                self._export_batch(metrics, batch_started)
             except Exception as e:
                 self.logger.error(
                     self.i18n.get("watch.error.monitor").format(str(e))
                 )
+                self._pending_changes.require_full_sync(FullSyncCause.FAILURE)
+                self._export_batch(metrics, batch_started, str(e))
+
+    async def _deploy_batch(self, batch: ChangeBatch) -> None:
+        """Aplica as operações e envia os arquivos de um lote drenado"""
+        if batch.full_sync and self._path is not None:
+            # Acima do limite uma varredura incremental sai mais barata
+            self.logger.warning(
+                self.i18n.get("watch.full_sync").format(self.deployer.host_name)
+            )
+            await self.deployer.deploy_directory(self._path)
+            if self.sync_deletes:
+                await self.deployer.prune_deleted()
+            return
+
+        files = batch.uploads()
+        operations = batch.operations
+        deletions = batch.deletions()
+        if not self.sync_deletes:
+            operations = [op for op in operations if op.kind == ChangeKind.MOVED]
+            deletions = []
+
+        if operations or deletions:
+            self.logger.info(
+                self.i18n.get("watch.operations").format(
+                    len(operations) + len(deletions),
+                    self.deployer.host_name
+                )
+            )
+            resend = await self.deployer.apply_changes(operations, deletions)
+            files = list(dict.fromkeys([*files, *resend]))
+
+        if files:
+            self.logger.info(
+                self.i18n.get("watch.changes_detected").format(
+                    len(files),
+                    self.deployer.host_name
+                )
+            )
+            await self.deployer.deploy_files(files)
+
+    def _export_batch(
+        self, metrics: DeployMetrics, batch_started: float, error: str = ""
+    ) -> None:
+        """
+        Grava o relatório do lote
+
+        lag vai do primeiro evento ao fim do envio; a fila e os contadores
+        de sincronização completa saem junto para permitir alertas.
+        """
+        metrics.lag = time.monotonic() - batch_started
+        stats = self.stats()
+        metrics.watch = {name: stats[name] for name in WATCH_METRICS}
+        self.deployer.export_metrics(not error, error)
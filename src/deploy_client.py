@@ -16,7 +16,6 @@ from src.core.deploy_manager import DeployManager
 from src.core.watch_manager import WatchManager
 from src.utils.logger import CustomLogger
 from src.utils.config import ConfigManager
-from src.deployers.local_deployer import LocalDeployer
 from src.utils.log_manager import LogManager
 
 
@@ -26,18 +25,21 @@ class DeployClient:
 
     def __init__(self) -> None:
         self.logger = CustomLogger.get_logger(__name__)
-        self._deploy_manager = None
+        self._deploy_manager: Optional[DeployManager] = None
         self._config_manager = ConfigManager()
         self._watch_manager = None
 
     async def setup(self, config: Dict[str, Any]) -> None:
         """Configura o cliente de deploy"""
         try:
+            if config.get("watch", {}).get("enabled"):
+                # run() faz o deploy de todos os hosts; o watch é por host
+                raise ValueError("Watch mode needs a single host: use --host NAME --watch")
             retention_days = config.get("logs", {}).get("retention_days", 5)
             log_manager = LogManager(retention_days)
             log_manager.initialize()
             self._config_manager = ConfigManager(config)
-            self._deploy_manager = LocalDeployer("local", config)
+            self._deploy_manager = DeployManager(config)
             self.logger.info("Deploy client setup completed")
         except Exception as e:
             self.logger.error(f"Failed to setup client: {e}")
@@ -55,8 +57,8 @@ class DeployClient:
             raise RuntimeError("Client not setup. Call setup() first.")
         await self._watch_manager.stop()
 
-    async def run(self) -> None:
-        """Executa o cliente"""
+    async def run(self) -> bool:
+        """Executa o cliente; retorna False se o deploy de algum host falhou"""
         if not self._deploy_manager:
             raise RuntimeError("Client not setup. Call setup() first.")
             
@@ -67,10 +69,12 @@ class DeployClient:
                 while True:
                     await asyncio.sleep(1)
             else:
-                await self._deploy_manager.deploy_all()
+                results = await self._deploy_manager.deploy_all()
+                return all(result.success for result in results)
         except KeyboardInterrupt:
             if self._watch_manager:
                 await self.stop_watching()
+            return True
         except Exception as e:
             self.logger.error(f"Error running client: {e}")
             raise
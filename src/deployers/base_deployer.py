@@ -1,14 +1,36 @@
 """
 Classe base para implementações de deployers
 """
+from __future__ import annotations
 from abc import ABC, abstractmethod
-from pathlib import Path
-from typing import Dict, List, Optional, Set
-import fnmatch
+from contextlib import asynccontextmanager
+from pathlib import Path, PurePosixPath
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple, TYPE_CHECKING
+import asyncio
+import sqlite3
+import time
 import yaml
 
 from src.utils.logger import CustomLogger
 from src.i18n import I18n
+from src.core.constants import (
+    DEPLOY_INCREMENTAL,
+    HASH_EXECUTOR,
+    HASH_WORKERS,
+    MANIFEST_HASH_ALGORITHM,
+    SCAN_QUEUE_SIZE
+)
+from src.core.changes import ChangeKind, Operation
+from src.core.hashing import HashingService
+from src.core.ignore_rules import IgnoreRules
+from src.core.manifest import DeployManifest
+from src.core.metrics import DeployMetrics, MetricsExporter
+from src.core.profiling import record_span, span
+from src.core.scanner import ScannedFile, walk_files
+from src.core.stat_index import StatIndex
+
+if TYPE_CHECKING:
+    from src.deployers.connection_pool import ConnectionPool
 
 
 class BaseDeployer(ABC):
@@ -16,49 +38,451 @@ class BaseDeployer(ABC):
 
     def __init__(self, host_name: str, config: Dict) -> None:
         self.host_name = host_name
+        self.config = config
         self.source_path = Path(config["source_path"])
         self.dest_path = Path(config["dest_path"])
-        self.ignore_patterns: Set[str] = self._load_ignore_patterns()
         self.logger = CustomLogger.get_logger(__name__)
         self.i18n = I18n()
+        self.ignore_patterns: List[str] = self._load_ignore_patterns()
+        self.ignore_rules = self._load_ignore_rules()
+        self.incremental = config.get("incremental", DEPLOY_INCREMENTAL)
+        self.stat_index = StatIndex.for_source(self.source_path)
+        self.hasher = HashingService.shared(
+            config.get("hash_algorithm", MANIFEST_HASH_ALGORITHM),
+            config.get("hash_executor", HASH_EXECUTOR),
+            config.get("hash_workers", HASH_WORKERS)
+        )
+        self.manifest = DeployManifest(
+            host_name,
+            self.source_path,
+            self.dest_path,
+            index=self.stat_index,
+            hasher=self.hasher
+        )
+        self.known_remote_dirs: Set[str] = set()
+        self._remote_dir_lock = asyncio.Lock()
+        self.connection_pool: Optional[ConnectionPool] = None
+        # SSHDeployer -> ssh quando a configuração não traz o protocolo
+        protocol = config.get("protocol") or type(self).__name__.replace("Deployer", "").lower()
+        self.metrics = DeployMetrics(host_name, protocol)
+        self.retries = 0  # Tentativas anteriores deste deploy, informadas pelo DeployManager
+        self.metrics_exporter = MetricsExporter.for_config(config.get("metrics", {}))
 
-    def _load_ignore_patterns(self) -> Set[str]:
-        """Carrega padrões de ignore do .deployignore"""
-        ignore_file = self.source_path / ".deployignore"
-        patterns = {
+    def _load_ignore_patterns(self) -> List[str]:
+        """Padrões de ignore em ordem de precedência crescente"""
+        return [
             "*.pyc", "__pycache__", "*.pyo", "*.pyd",  # Python
             ".git", ".gitignore", ".gitattributes",    # Git
             ".env", ".venv", "venv", "env",            # Virtualenv
             ".idea", ".vscode", "*.swp", "*.swo",      # IDEs
             "*.log", "logs", "*.tmp", "*.temp",        # Logs e temporários
-            ".deployignore", "*.bak", "~*"             # Deploy específicos
-        }
+            ".deployignore", "*.bak", "~*",            # Deploy específicos
+            *self.config.get("global_ignore_patterns", []),
+            *self.config.get("ignore_patterns", []),
+        ]
 
-        if ignore_file.exists():
-            try:
-                with open(ignore_file, 'r', encoding='utf-8') as f:
-                    custom_patterns = {
-                        line.strip() for line in f
-                        if line.strip() and not line.startswith('#')
-                    }
-                    patterns.update(custom_patterns)
-            except Exception as e:
-                self.logger.warning(f"Error loading .deployignore: {e}")
+    def _load_ignore_rules(self) -> IgnoreRules:
+        """Compila os padrões da configuração e do .deployignore"""
+        try:
+            return IgnoreRules.for_source(self.source_path, self.ignore_patterns)
+        except OSError as e:
+            self.logger.warning(f"Error loading .deployignore: {e}")
+            return IgnoreRules(self.ignore_patterns)
 
-        return patterns
+    def source_relative(self, path: Path) -> Path:
+        """
+        Caminho relativo à origem
+
+        Raises:
+            ValueError: Se path não está dentro da origem
+        """
+        try:
+            return path.relative_to(self.source_path)
+        except ValueError:
+            # Eventos do watchdog chegam com caminho absoluto
+            return path.resolve().relative_to(self.source_path.resolve())
 
     def should_ignore(self, path: Path) -> bool:
         """Verifica se um arquivo deve ser ignorado"""
-        rel_path = str(path.relative_to(self.source_path))
-        
-        for pattern in self.ignore_patterns:
-            if fnmatch.fnmatch(rel_path, pattern):
-                self.logger.debug(
-                    self.i18n.get("deploy.file_ignored").format(rel_path, pattern)
-                )
-                return True
+        try:
+            rel_path = self.source_relative(path)
+        except ValueError:
+            return False
+
+        if self.ignore_rules.is_ignored(rel_path.as_posix(), path.is_dir()):
+            self.logger.debug(self.i18n.get("deploy.file_ignored").format(rel_path))
+            return True
         return False
 
+    async def select_changed_files(
+        self, files: List[Path], root: Path
+    ) -> Tuple[List[Path], int, int]:
+        """
+        Filtra os arquivos que mudaram desde o último deploy
+
+        Returns:
+            Tupla (arquivos a enviar, quantidade pulada, bytes pulados)
+        """
+        if not self.incremental:
+            return files, 0, 0
+        with self.metrics.phase("diff"):
+            return await asyncio.to_thread(self.manifest.partition, files, root)
+
+    async def select_scanned_files(
+        self, files: List[ScannedFile], root: Path
+    ) -> Tuple[List[ScannedFile], int, int]:
+        """Igual a select_changed_files para um lote vindo da varredura"""
+        if not self.incremental:
+            return files, 0, 0
+        with self.metrics.phase("diff"):
+            return await asyncio.to_thread(self.manifest.partition_scanned, files, root)
+
+    async def collect_files(self, root: Path, start: Optional[Path] = None) -> List[Path]:
+        """
+        Lista todos os arquivos de root, para envios que precisam do lote inteiro
+
+        Com start, lista só essa subárvore, com as regras de ignore ainda
+        avaliadas a partir de root.
+        """
+        files = walk_files(root, self.ignore_rules, start=start)
+        return [file async for batch in self.metrics.timed("scan", files) for file, _ in batch]
+
+    async def mark_deployed(self, file: Path, root: Path) -> None:
+        """Registra no manifesto um arquivo enviado com sucesso"""
+        await self.complete_file(file)
+        with self.metrics.phase("record"):
+            await asyncio.to_thread(self.manifest.record, file, file.relative_to(root))
+
+    def save_manifest(self) -> None:
+        """Persiste o manifesto do deploy"""
+        try:
+            self.manifest.save()
+        except OSError as e:
+            self.logger.warning(f"Failed to save deploy manifest: {e}")
+        try:
+            self.stat_index.flush()
+        except sqlite3.Error as e:
+            self.logger.warning(f"Failed to save stat index: {e}")
+
+    def plan_remote_dirs(self, files: Iterable[Path], root: Path) -> List[Path]:
+        """
+        Calcula os diretórios de destino necessários para os arquivos
+
+        Returns:
+            Diretórios ainda não conhecidos, ordenados com os pais primeiro
+        """
+        dest_root = Path(self.dest_path)
+        needed: Set[Path] = set()
+        for file in files:
+            parent = (dest_root / file.relative_to(root)).parent
+            while parent != dest_root and parent not in needed:
+                needed.add(parent)
+                parent = parent.parent
+
+        pending = [d for d in needed if PurePosixPath(d).as_posix() not in self.known_remote_dirs]
+        return sorted(pending, key=lambda d: (len(d.parts), str(d)))
+
+    async def prepare_remote_dirs(
+        self, files: Iterable[Path], root: Path, workers: int = 1
+    ) -> None:
+        """Cria de uma vez, pais primeiro, os diretórios de destino do deploy"""
+        plan = self.plan_remote_dirs(files, root)
+        if not plan:
+            return
+
+        await self.ensure_remote_dir_cached(Path(self.dest_path))
+
+        # Diretórios do mesmo nível não dependem entre si
+        levels: Dict[int, List[Path]] = {}
+        for directory in plan:
+            levels.setdefault(len(directory.parts), []).append(directory)
+
+        with self.metrics.phase("mkdir"):
+            for level in sorted(levels):
+                directories = levels[level]
+                for start in range(0, len(directories), max(1, workers)):
+                    batch = directories[start:start + max(1, workers)]
+                    await asyncio.gather(*(self.make_remote_dir(d) for d in batch))
+                    self.known_remote_dirs.update(PurePosixPath(d).as_posix() for d in batch)
+
+        self.logger.debug(f"Prepared {len(plan)} remote directories")
+
+    async def ensure_remote_dir_cached(self, path: Path) -> None:
+        """
+        Garante o diretório remoto consultando o cache da conexão
+
+        Abaixo de um diretório conhecido, apenas os níveis que faltam são
+        criados, um por vez; sem nenhum ancestral conhecido a árvore é
+        garantida de uma vez com ensure_remote_dir.
+        """
+        if PurePosixPath(path).as_posix() in self.known_remote_dirs:
+            return
+
+        async with self._remote_dir_lock:
+            with self.metrics.phase("mkdir"):
+                missing: List[Path] = []
+                current = path
+                while PurePosixPath(current).as_posix() not in self.known_remote_dirs:
+                    if current == current.parent:
+                        await self.ensure_remote_dir(path)
+                        missing = [path, *path.parents]
+                        break
+                    missing.append(current)
+                    current = current.parent
+                else:
+                    for directory in reversed(missing):
+                        await self.make_remote_dir(directory)
+                        self.known_remote_dirs.add(PurePosixPath(directory).as_posix())
+
+                self.known_remote_dirs.update(PurePosixPath(d).as_posix() for d in missing)
+
+    async def make_remote_dir(self, path: Path) -> None:
+        """Cria um único nível de diretório, aceitando que ele já exista"""
+        await self.ensure_remote_dir(path)
+
+    async def send_file(self, file: Path, root: Path) -> None:
+        """Envia um arquivo e o registra no manifesto, medindo a latência do envio"""
+        dest = Path(self.dest_path) / file.relative_to(root)
+        started = time.perf_counter()
+        await self.sync_file(file, dest)
+        elapsed = time.perf_counter() - started
+        self.metrics.record_file(elapsed)
+        record_span(
+            file.relative_to(root).as_posix(), "file", started, elapsed, host=self.host_name
+        )
+        await self.mark_deployed(file, root)
+
+    async def _transfer_worker(
+        self,
+        queue: asyncio.Queue[Optional[Path]],
+        root: Path,
+        failures: Dict[Path, Exception]
+    ) -> None:
+        """Envia arquivos da fila até receber None"""
+        while True:
+            file = await queue.get()
+            if file is None:
+                return
+
+            try:
+                await self.send_file(file, root)
+            except Exception as e:
+                failures[file] = e
+                self.metrics.files_failed += 1
+                # O diretório pode ter sido removido no destino
+                dest = Path(self.dest_path) / file.relative_to(root)
+                self.known_remote_dirs.discard(PurePosixPath(dest.parent).as_posix())
+
+    def _raise_failures(self, failures: Dict[Path, Exception], total: int) -> None:
+        """Registra os arquivos que falharam e resume em um RuntimeError"""
+        if not failures:
+            return
+
+        for file, error in failures.items():
+            self.logger.error(
+                self.i18n.get("deploy.error.transfer").format(f"{file}: {error}")
+            )
+        raise RuntimeError(
+            self.i18n.get("deploy.error.files_failed").format(len(failures), total)
+        )
+
+    async def transfer_files(self, files: List[Path], root: Path, workers: int = 1) -> None:
+        """
+        Envia arquivos usando um pool de workers concorrentes
+
+        Falhas de arquivos individuais são registradas sem interromper os
+        demais envios; ao final um RuntimeError resume o que falhou.
+        """
+        workers = max(1, min(workers, len(files)))
+        queue: asyncio.Queue[Optional[Path]] = asyncio.Queue()
+        for file in [*files, *[None] * workers]:
+            queue.put_nowait(file)
+        failures: Dict[Path, Exception] = {}
+
+        await asyncio.gather(
+            *(self._transfer_worker(queue, root, failures) for _ in range(workers))
+        )
+        self._raise_failures(failures, len(files))
+
+    async def stream_directory(self, root: Path, workers: int = 1) -> None:
+        """
+        Envia os arquivos de root enquanto a varredura ainda acontece
+
+        A varredura alimenta uma fila limitada consumida pelos workers, então
+        o primeiro envio começa assim que o primeiro arquivo é encontrado e a
+        lista completa nunca fica em memória. O total do progresso cresce
+        junto com a varredura.
+        """
+        workers = max(1, workers)
+        queue: asyncio.Queue[Optional[Path]] = asyncio.Queue(SCAN_QUEUE_SIZE)
+        failures: Dict[Path, Exception] = {}
+        queued = 0
+
+        await self.begin_scan()
+        await self.ensure_remote_dir_cached(Path(self.dest_path))
+
+        async def produce() -> None:
+            nonlocal queued
+            try:
+                async for batch in self.metrics.timed("scan", walk_files(root, self.ignore_rules)):
+                    changed, skipped_files, skipped_bytes = await self.select_scanned_files(
+                        batch, root
+                    )
+                    await self.extend_transfer(
+                        len(changed),
+                        sum(stat.st_size for _, stat in changed),
+                        skipped_files,
+                        skipped_bytes
+                    )
+                    for file, _ in changed:
+                        await queue.put(file)
+                        queued += 1
+            finally:
+                await self.finish_scan()
+                for _ in range(workers):
+                    await queue.put(None)
+
+        results = await asyncio.gather(
+            produce(),
+            *(self._transfer_worker(queue, root, failures) for _ in range(workers)),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        self._raise_failures(failures, queued)
+
+    def forget_remote_dirs(self, path: Path) -> None:
+        """Remove do cache o diretório remoto e tudo abaixo dele"""
+        prefix = PurePosixPath(path).as_posix()
+        self.known_remote_dirs = {
+            d for d in self.known_remote_dirs
+            if d != prefix and not d.startswith(prefix.rstrip("/") + "/")
+        }
+
+    async def move_path(self, src: Path, dest: Path) -> None:
+        """Renomeia no destino um arquivo ou diretório renomeado na origem"""
+        old_rel, new_rel = self.source_relative(src), self.source_relative(dest)
+        remote_src = Path(self.dest_path) / old_rel
+        remote_dest = Path(self.dest_path) / new_rel
+
+        try:
+            await self.rename_remote(remote_src, remote_dest)
+        except Exception:
+            # O diretório de destino pode ainda não existir no destino
+            await self.ensure_remote_dir_cached(remote_dest.parent)
+            await self.rename_remote(remote_src, remote_dest)
+        self.forget_remote_dirs(remote_src)
+        self.forget_remote_dirs(remote_dest)
+        self.manifest.rename(old_rel, new_rel)
+        self.logger.debug(f"Renamed {remote_src} -> {remote_dest}")
+
+    async def delete_path(self, path: Path, is_dir: bool = False) -> None:
+        """Remove do destino um arquivo ou diretório removido na origem"""
+        rel_path = self.source_relative(path)
+        remote = Path(self.dest_path) / rel_path
+
+        if is_dir:
+            await self.remove_remote_dir(remote)
+            self.forget_remote_dirs(remote)
+        else:
+            await self.remove_remote_file(remote)
+        self.manifest.remove(rel_path)
+        self.logger.debug(f"Removed {remote}")
+
+    async def apply_changes(
+        self, operations: List[Operation], deletions: List[Path]
+    ) -> List[Path]:
+        """
+        Aplica renomeações e remoções vindas do modo watch
+
+        Returns:
+            Arquivos que precisam ser enviados porque a renomeação remota falhou
+        """
+        async with self.connection():
+            return await self.run_operations(operations, deletions)
+
+    async def run_operations(
+        self, operations: List[Operation], deletions: List[Path]
+    ) -> List[Path]:
+        """
+        Executa as operações em ordem, seguidas das remoções de arquivos
+
+        Uma renomeação que falha, por exemplo porque a origem nunca chegou
+        ao destino, é substituída pelo envio do arquivo ou diretório novo.
+        """
+        resend: List[Path] = []
+        started = time.perf_counter()
+        try:
+            for op in operations:
+                try:
+                    if op.kind == ChangeKind.MOVED and op.dest is not None:
+                        await self.move_path(op.path, op.dest)
+                    else:
+                        await self.delete_path(op.path, op.is_dir)
+                except Exception as e:
+                    self.logger.warning(f"Remote {op.kind.value} of {op.path} failed: {e}")
+                    if op.dest is None or self.should_ignore(op.dest):
+                        continue
+                    if op.dest.is_dir():
+                        # Regras relativas à origem, como na varredura normal
+                        resend.extend(await self.collect_files(self.source_path, op.dest))
+                    else:
+                        resend.append(op.dest)
+
+            for path in deletions:
+                try:
+                    await self.delete_path(path)
+                except Exception as e:
+                    self.logger.warning(f"Remote delete of {path} failed: {e}")
+        finally:
+            self.metrics.add_phase("operations", time.perf_counter() - started)
+            self.save_manifest()
+        return resend
+
+    async def prune_deleted(self) -> int:
+        """
+        Remove do destino os arquivos do manifesto que sumiram da origem
+
+        Complementa uma sincronização completa, que só envia arquivos, para
+        reconciliar remoções cujos eventos foram descartados.
+
+        Returns:
+            Quantidade de arquivos removidos
+        """
+        self.manifest.load()
+        keys = list(self.manifest.entries)
+        missing = await asyncio.to_thread(
+            lambda: [rel for rel in keys if not (self.source_path / rel).exists()]
+        )
+        if missing:
+            await self.apply_changes([], [self.source_path / rel for rel in missing])
+        return len(missing)
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[None]:
+        """
+        Conexão usada por um deploy
+
+        Com um pool registrado (modo watch) a conexão persistente é reutilizada;
+        caso contrário ela é aberta e fechada em torno do deploy.
+        """
+        if self.connection_pool:
+            async with self.connection_pool.acquire(self):
+                yield
+            return
+
+        with self.metrics.phase("connect"):
+            await self.connect()
+        try:
+            yield
+        finally:
+            await self.disconnect()
+
+    async def is_connected(self) -> bool:
+        """Verifica se a conexão com o destino continua utilizável"""
+        return True
+
     @abstractmethod
     async def connect(self) -> None:
         """Estabelece conexão com o destino"""
@@ -84,6 +508,26 @@ class BaseDeployer(ABC):
         """Garante existência de diretório no destino"""
         pass
 
+    @abstractmethod
+    async def sync_file(self, source: Path, dest: Path) -> None:
+        """Envia um arquivo para o destino"""
+        pass
+
+    @abstractmethod
+    async def rename_remote(self, source: Path, dest: Path) -> None:
+        """Renomeia um arquivo ou diretório no destino, substituindo dest"""
+        pass
+
+    @abstractmethod
+    async def remove_remote_file(self, path: Path) -> None:
+        """Remove um arquivo do destino; ausente não é erro"""
+        pass
+
+    @abstractmethod
+    async def remove_remote_dir(self, path: Path) -> None:
+        """Remove um diretório e seu conteúdo do destino; ausente não é erro"""
+        pass
+
     async def validate_paths(self) -> None:
         """Valida caminhos de origem e destino"""
         if not self.source_path.exists():
@@ -95,20 +539,37 @@ class BaseDeployer(ABC):
         """Prepara ambiente para deploy"""
         self.logger.info(self.i18n.get("deploy.progress.setup"))
         await self.validate_paths()
-        await self.connect()
+        with self.metrics.phase("connect"):
+            await self.connect()
 
     async def deploy(self) -> None:
         """Executa processo de deploy completo"""
         try:
             self.logger.info(self.i18n.get("deploy.progress.start"))
-            await self.prepare_deploy()
-            await self.deploy_directory(self.source_path)
+            with span("deploy", host=self.host_name):
+                await self.prepare_deploy()
+                await self.deploy_directory(self.source_path)
             self.logger.info(self.i18n.get("deploy.progress.complete"))
+            self.export_metrics(True)
         except Exception as e:
             self.logger.error(self.i18n.get("deploy.progress.error").format(str(e)))
+            self.export_metrics(False, str(e))
             raise
         finally:
             await self.disconnect()
 
+    def begin_metrics(self, mode: str = "deploy") -> DeployMetrics:
+        """Inicia o relatório de uma nova execução (um lote do watch, por exemplo)"""
+        self.metrics = DeployMetrics(self.host_name, self.metrics.protocol, mode)
+        return self.metrics
+
+    def export_metrics(self, success: bool, error: str = "") -> None:
+        """Fecha o relatório da execução atual e o grava, se as métricas estão ativas"""
+        self.metrics.add_transfer(self.progress.stats)
+        self.metrics.retries = self.retries
+        self.metrics.finish(success, error)
+        if self.metrics_exporter:
+            self.metrics_exporter.export(self.metrics)
+
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}(host={self.host_name})"
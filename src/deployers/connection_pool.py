@@ -0,0 +1,148 @@
+"""
+Pool de conexões persistentes para o modo watch
+"""
+from __future__ import annotations
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, Optional, TYPE_CHECKING
+import asyncio
+import time
+
+from src.utils.logger import CustomLogger
+from src.core.constants import CONNECTION_IDLE_TIMEOUT, CONNECTION_KEEPALIVE_INTERVAL
+
+if TYPE_CHECKING:
+    from src.deployers.base_deployer import BaseDeployer
+
+
+@dataclass
+class PooledConnection:
+    """Estado da conexão persistente de um host"""
+    deployer: BaseDeployer
+    keepalive_interval: float
+    idle_timeout: float
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    connected: bool = False
+    last_used: float = 0.0
+    last_checked: float = 0.0
+    failed: bool = False
+    task: Optional[asyncio.Task] = None
+
+
+class ConnectionPool:
+    """
+    Mantém uma conexão viva por host entre os lotes do modo watch
+
+    A conexão é aberta no primeiro uso, verificada por keepalive (NOOP no FTP,
+    keepalive do asyncssh no SSH), fechada após o tempo ocioso e reaberta de
+    forma transparente quando cai.
+    """
+
+    def __init__(self) -> None:
+        self.logger = CustomLogger.get_logger(__name__)
+        self._connections: Dict[str, PooledConnection] = {}
+
+    def register(self, deployer: BaseDeployer) -> None:
+        """Passa a gerenciar a conexão do deployer"""
+        if deployer.host_name in self._connections:
+            return
+
+        self._connections[deployer.host_name] = PooledConnection(
+            deployer=deployer,
+            keepalive_interval=deployer.config.get(
+                "keepalive_interval", CONNECTION_KEEPALIVE_INTERVAL
+            ),
+            idle_timeout=deployer.config.get("idle_timeout", CONNECTION_IDLE_TIMEOUT),
+        )
+        deployer.connection_pool = self
+
+    @asynccontextmanager
+    async def acquire(self, deployer: BaseDeployer) -> AsyncIterator[None]:
+        """Fornece a conexão do host, reconectando se necessário"""
+        entry = self._connections[deployer.host_name]
+        async with entry.lock:
+            with deployer.metrics.phase("connect"):
+                await self._ensure_connected(entry)
+            try:
+                yield
+            except BaseException:
+                # Pode ter sido a conexão: verifica antes do próximo uso
+                entry.failed = True
+                raise
+            else:
+                entry.last_checked = time.monotonic()
+            finally:
+                entry.last_used = time.monotonic()
+
+    async def close(self) -> None:
+        """Encerra todas as conexões do pool"""
+        for entry in self._connections.values():
+            if entry.task:
+                entry.task.cancel()
+                entry.task = None
+            async with entry.lock:
+                if entry.connected:
+                    await self._drop(entry)
+            entry.deployer.connection_pool = None
+        self._connections.clear()
+
+    async def _ensure_connected(self, entry: PooledConnection) -> None:
+        """
+        Conecta ou verifica a conexão antes do uso
+
+        A verificação acontece após keepalive_interval sem uso bem-sucedido
+        ou quando o uso anterior terminou em erro.
+        """
+        now = time.monotonic()
+        stale = now - entry.last_checked >= entry.keepalive_interval
+        if entry.connected and (entry.failed or stale):
+            if not await entry.deployer.is_connected():
+                self.logger.warning(
+                    f"Connection to {entry.deployer.host_name} lost, reconnecting"
+                )
+                await self._drop(entry)
+            entry.last_checked = now
+        entry.failed = False
+
+        if not entry.connected:
+            await entry.deployer.connect()
+            entry.connected = True
+            entry.last_used = entry.last_checked = time.monotonic()
+            if entry.task is None or entry.task.done():
+                entry.task = asyncio.create_task(self._keepalive_loop(entry))
+
+    async def _keepalive_loop(self, entry: PooledConnection) -> None:
+        """Mantém a conexão viva e a fecha quando ociosa"""
+        while entry.connected:
+            await asyncio.sleep(entry.keepalive_interval)
+            if entry.lock.locked():
+                # Conexão em uso pelo deploy; o tráfego já a mantém viva
+                continue
+
+            async with entry.lock:
+                if not entry.connected:
+                    break
+
+                now = time.monotonic()
+                if now - entry.last_used >= entry.idle_timeout:
+                    self.logger.debug(f"Closing idle connection to {entry.deployer.host_name}")
+                    await self._drop(entry)
+                    break
+
+                if await entry.deployer.is_connected():
+                    entry.last_checked = now
+                else:
+                    # Reabre no próximo uso
+                    self.logger.warning(
+                        f"Keepalive to {entry.deployer.host_name} failed, dropping connection"
+                    )
+                    await self._drop(entry)
+                    break
+
+    async def _drop(self, entry: PooledConnection) -> None:
+        """Descarta a conexão atual ignorando erros de encerramento"""
+        entry.connected = False
+        try:
+            await entry.deployer.disconnect()
+        except Exception as e:
+            self.logger.debug(f"Error closing connection to {entry.deployer.host_name}: {e}")
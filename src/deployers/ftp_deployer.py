@@ -1,5 +1,6 @@
 from typing import Dict, List, Optional
-from pathlib import Path
+from pathlib import Path, PurePosixPath
+import aiofiles  # type: ignore
 import aioftp  # type: ignore
 from src.deployers.base_deployer import BaseDeployer
 from src.deployers.sync_mixin import SyncMixin
@@ -21,14 +22,17 @@ class FTPDeployer(BaseDeployer, SyncMixin, ProgressMixin):
 
     async def connect(self) -> None:
         """Estabelece conexão FTP"""
+        if self.client:
+            return
+
         try:
-            self.client = await aioftp.Client.context(
-                self.host,
-                user=self.user,
-                password=self.password,
-                port=self.port,
-                timeout=CONNECTION_TIMEOUT
+            client = aioftp.Client(
+                connection_timeout=CONNECTION_TIMEOUT,
+                socket_timeout=TRANSFER_TIMEOUT
             )
+            await client.connect(self.host, self.port)
+            await client.login(self.user, self.password)
+            self.client = client
             self.logger.info(f"Connected to {self.host} via FTP")
         except Exception as e:
             self.logger.error(f"FTP connection failed: {e}")
@@ -37,10 +41,27 @@ class FTPDeployer(BaseDeployer, SyncMixin, ProgressMixin):
     async def disconnect(self) -> None:
         """Encerra conexão FTP"""
         if self.client:
-            await self.client.quit()
-            self.client = None
+            client, self.client = self.client, None
+            self.known_remote_dirs.clear()
+            try:
+                await client.quit()
+            finally:
+                client.close()
             self.logger.debug("FTP connection closed")
 
+    async def is_connected(self) -> bool:
+        """Verifica a conexão FTP com um NOOP"""
+        if not self.client:
+            return False
+        try:
+            await self.client.command("NOOP", "200")
+        except aioftp.StatusCodeError:
+            # Qualquer resposta prova que o canal de controle está vivo
+            return True
+        except Exception:
+            return False
+        return True
+
     async def ensure_remote_dir(self, path: Path) -> None:
         """Garante existência de diretório remoto"""
         if not self.client:
@@ -52,38 +73,86 @@ class FTPDeployer(BaseDeployer, SyncMixin, ProgressMixin):
             self.logger.error(f"Failed to create remote directory {path}: {e}")
             raise
 
+    async def make_remote_dir(self, path: Path) -> None:
+        """Cria um nível de diretório com um único MKD"""
+        if not self.client:
+            raise RuntimeError("FTP connection not established")
+        try:
+            await self.client.command(f"MKD {PurePosixPath(path)}", "257")
+        except aioftp.StatusCodeError:
+            # 550 também é devolvido quando o diretório já existe
+            if not await self.client.is_dir(str(path)):
+                raise
+
+    async def rename_remote(self, source: Path, dest: Path) -> None:
+        """Renomeia com RNFR/RNTO"""
+        if not self.client:
+            raise RuntimeError("FTP connection not established")
+        source_path, dest_path = str(PurePosixPath(source)), str(PurePosixPath(dest))
+        try:
+            await self.client.rename(source_path, dest_path)
+        except aioftp.StatusCodeError:
+            # Alguns servidores recusam RNTO sobre um arquivo existente
+            if not (
+                await self.client.exists(source_path)
+                and await self.client.is_file(dest_path)
+            ):
+                raise
+            await self.client.remove_file(dest_path)
+            await self.client.rename(source_path, dest_path)
+
+    async def remove_remote_file(self, path: Path) -> None:
+        """Remove um arquivo remoto com DELE"""
+        if not self.client:
+            raise RuntimeError("FTP connection not established")
+        try:
+            await self.client.remove_file(str(PurePosixPath(path)))
+        except aioftp.StatusCodeError:
+            if await self.client.exists(str(PurePosixPath(path))):
+                raise
+
+    async def remove_remote_dir(self, path: Path) -> None:
+        """Remove um diretório remoto e seu conteúdo"""
+        if not self.client:
+            raise RuntimeError("FTP connection not established")
+        if await self.client.exists(str(PurePosixPath(path))):
+            await self.client.remove(str(PurePosixPath(path)))
+
     async def deploy_directory(self, path: Path) -> None:
         """Deploy de diretório via FTP"""
-        try:
-            await self.connect()
+        async with self.connection():
             if self.client:
-                # Lista todos os arquivos antes de iniciar
-                files = [f for f in path.rglob("*") if f.is_file()]
-                await self.prepare_transfer(files)
-                
-                for file in files:
-                    dest = Path(self.dest_path) / file.relative_to(path)
-                    await self.sync_file(file, dest)
+                try:
+                    await self.stream_directory(path)
+                except BaseException:
+                    await self.abort_transfer()
+                    raise
+                finally:
+                    self.save_manifest()
                 
                 await self.complete_transfer()
-        finally:
-            await self.disconnect()
 
     async def deploy_files(self, files: List[Path]) -> None:
         """Deploy de arquivos específicos via FTP"""
-        try:
-            await self.connect()
+        async with self.connection():
             if self.client:
-                await self.prepare_transfer(files)
+                files = [f for f in files if f.is_file() and not self.should_ignore(f)]
+                files, skipped_files, skipped_bytes = await self.select_changed_files(
+                    files, self.source_path
+                )
+                await self.prepare_transfer(files, skipped_files, skipped_bytes)
                 
-                for file in files:
-                    if file.is_file():
-                        dest = Path(self.dest_path) / file.relative_to(self.source_path)
-                        await self.sync_file(file, dest)
+                try:
+                    await self.prepare_remote_dirs(files, self.source_path)
+                    for file in files:
+                        await self.send_file(file, self.source_path)
+                except BaseException:
+                    await self.abort_transfer()
+                    raise
+                finally:
+                    self.save_manifest()
                 
                 await self.complete_transfer()
-        finally:
-            await self.disconnect()
 
     async def sync_file(self, source: Path, dest: Path) -> None:
         """Sincroniza um arquivo via FTP com progresso"""
@@ -91,21 +160,13 @@ class FTPDeployer(BaseDeployer, SyncMixin, ProgressMixin):
             raise RuntimeError("FTP connection not established")
         
         try:
-            await self.ensure_remote_dir(dest.parent)
+            await self.ensure_remote_dir_cached(dest.parent)
             
-            # Implementa transferência com progresso
-            total_size = source.stat().st_size
-            bytes_transferred = 0
-            
-            async with source.open('rb') as local_file:
-                stream = await self.client.upload_stream(str(dest))
-                
-                while chunk := await local_file.read(8192):
-                    await stream.write(chunk)
-                    bytes_transferred += len(chunk)
-                    await self.update_progress(source, len(chunk))
-                
-                await stream.finish()
+            async with aiofiles.open(source, 'rb') as local_file:
+                async with self.client.upload_stream(str(PurePosixPath(dest))) as stream:
+                    while chunk := await local_file.read(8192):
+                        await stream.write(chunk)
+                        await self.update_progress(source, len(chunk))
             
             self.logger.debug(f"Synced {source} -> {dest}")
         except Exception as e:
@@ -1,14 +1,91 @@
 """
 Implementação do deployer local
 """
-from typing import Dict, List
+from typing import Dict, List, Tuple
+import asyncio
+import errno
+import os
 import shutil
+import sys
 from pathlib import Path
-import aiofiles  # type: ignore
 
 from src.deployers.base_deployer import BaseDeployer
 from src.deployers.sync_mixin import SyncMixin
 from src.deployers.progress_mixin import ProgressMixin
+from src.core.constants import LOCAL_COPY_BUFFER_SIZE, LOCAL_COPY_RANGE_SIZE
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore
+
+FICLONE = 0x40049409  # ioctl de clonagem (reflink) no Linux
+
+# Erros que indicam que o método de cópia não é suportado neste caso
+_UNSUPPORTED_ERRNOS = {
+    errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSUP, errno.EBADF
+}
+
+
+def _clone_file(src_fd: int, dst_fd: int) -> bool:
+    """Tenta clonar o arquivo (reflink), sem copiar dados"""
+    if fcntl is None or not sys.platform.startswith("linux"):
+        return False
+    try:
+        fcntl.ioctl(dst_fd, FICLONE, src_fd)
+        return True
+    except OSError:
+        return False
+
+
+def _initial_copy_method() -> str:
+    """Método de cópia mais rápido disponível na plataforma"""
+    if hasattr(os, "copy_file_range"):
+        return "copy_file_range"
+    if sys.platform.startswith("linux"):
+        return "sendfile"
+    return "buffer"
+
+
+def _copy_range(
+    src_fd: int, dst_fd: int, offset: int, count: int, method: str
+) -> Tuple[int, str]:
+    """
+    Copia até count bytes a partir de offset
+
+    Returns:
+        Tupla (bytes copiados, método usado), caindo para o próximo método
+        quando o atual não é suportado pelos sistemas de arquivos envolvidos
+    """
+    if method == "copy_file_range":
+        try:
+            return os.copy_file_range(src_fd, dst_fd, count, offset, offset), method
+        except OSError as e:
+            if e.errno not in _UNSUPPORTED_ERRNOS:
+                raise
+            method = "sendfile"
+
+    if method == "sendfile":
+        try:
+            os.lseek(dst_fd, offset, os.SEEK_SET)
+            return os.sendfile(dst_fd, src_fd, offset, count), method
+        except OSError as e:
+            if e.errno not in _UNSUPPORTED_ERRNOS:
+                raise
+            method = "buffer"
+
+    os.lseek(src_fd, offset, os.SEEK_SET)
+    os.lseek(dst_fd, offset, os.SEEK_SET)
+    copied = 0
+    while copied < count:
+        chunk = os.read(src_fd, min(LOCAL_COPY_BUFFER_SIZE, count - copied))
+        if not chunk:
+            break
+        view = memoryview(chunk)
+        while view:
+            view = view[os.write(dst_fd, view):]
+        copied += len(chunk)
+    return copied, "buffer"
 
 
 class LocalDeployer(BaseDeployer, SyncMixin, ProgressMixin):
@@ -35,44 +112,63 @@ class LocalDeployer(BaseDeployer, SyncMixin, ProgressMixin):
             self.logger.error(f"Failed to create directory {path}: {e}")
             raise
 
+    async def make_remote_dir(self, path: Path) -> None:
+        """Cria um nível de diretório local"""
+        path.mkdir(exist_ok=True)
+
+    async def rename_remote(self, source: Path, dest: Path) -> None:
+        """Renomeia localmente, substituindo dest"""
+        os.replace(source, dest)
+
+    async def remove_remote_file(self, path: Path) -> None:
+        """Remove um arquivo local"""
+        path.unlink(missing_ok=True)
+
+    async def remove_remote_dir(self, path: Path) -> None:
+        """Remove um diretório local e seu conteúdo"""
+        try:
+            await asyncio.to_thread(shutil.rmtree, path)
+        except FileNotFoundError:
+            pass
+
     async def deploy_directory(self, path: Path) -> None:
         """Deploy de diretório local"""
-        # Lista todos os arquivos antes de iniciar
-        files = [f for f in path.rglob("*") if f.is_file()]
-        await self.prepare_transfer(files)
-        
-        for file in files:
-            dest = Path(self.dest_path) / file.relative_to(path)
-            await self.sync_file(file, dest)
+        try:
+            await self.stream_directory(path)
+        except BaseException:
+            await self.abort_transfer()
+            raise
+        finally:
+            self.save_manifest()
         
         await self.complete_transfer()
 
     async def deploy_files(self, files: List[Path]) -> None:
         """Deploy de arquivos específicos local"""
-        await self.prepare_transfer(files)
+        files = [f for f in files if f.is_file() and not self.should_ignore(f)]
+        files, skipped_files, skipped_bytes = await self.select_changed_files(
+            files, self.source_path
+        )
+        await self.prepare_transfer(files, skipped_files, skipped_bytes)
         
-        for file in files:
-            if file.is_file():
-                dest = Path(self.dest_path) / file.relative_to(self.source_path)
-                await self.sync_file(file, dest)
+        try:
+            await self.prepare_remote_dirs(files, self.source_path)
+            for file in files:
+                await self.send_file(file, self.source_path)
+        except BaseException:
+            await self.abort_transfer()
+            raise
+        finally:
+            self.save_manifest()
         
         await self.complete_transfer()
 
     async def sync_file(self, source: Path, dest: Path) -> None:
         """Sincroniza um arquivo localmente com progresso"""
         try:
-            await self.ensure_remote_dir(dest.parent)
+            await self.ensure_remote_dir_cached(dest.parent)
             
-            # Implementa cópia com progresso
-            total_size = source.stat().st_size
-            bytes_transferred = 0
-            
-            async with aiofiles.open(source, 'rb') as src_file:
-                async with aiofiles.open(dest, 'wb') as dst_file:
-                    while chunk := await src_file.read(8192):
-                        await dst_file.write(chunk)
-                        bytes_transferred += len(chunk)
-                        await self.update_progress(source, len(chunk))
+            await self.copy_file(source, dest)
             
             # Preserva metadados
             shutil.copystat(source, dest)
@@ -82,6 +178,44 @@ class LocalDeployer(BaseDeployer, SyncMixin, ProgressMixin):
             self.logger.error(f"Failed to sync file {source}: {e}")
             raise
 
+    async def copy_file(self, source: Path, dest: Path) -> None:
+        """
+        Copia o arquivo pelo caminho mais rápido disponível
+
+        Tenta reflink (FICLONE), depois copy_file_range/sendfile no kernel e,
+        por último, cópia com buffer grande. O progresso é atualizado a cada
+        faixa copiada.
+        """
+        binary = getattr(os, "O_BINARY", 0)
+        src_fd = os.open(source, os.O_RDONLY | binary)
+        try:
+            dst_fd = os.open(dest, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | binary, 0o644)
+            try:
+                size = os.fstat(src_fd).st_size
+                if size and await asyncio.to_thread(_clone_file, src_fd, dst_fd):
+                    await self.update_progress(source, size)
+                    return
+
+                method = _initial_copy_method()
+                offset = 0
+                while offset < size:
+                    copied, method = await asyncio.to_thread(
+                        _copy_range,
+                        src_fd,
+                        dst_fd,
+                        offset,
+                        min(LOCAL_COPY_RANGE_SIZE, size - offset),
+                        method
+                    )
+                    if not copied:
+                        break
+                    offset += copied
+                    await self.update_progress(source, copied)
+            finally:
+                os.close(dst_fd)
+        finally:
+            os.close(src_fd)
+
     def file_exists(self, path: Path) -> bool:
         """Verifica se arquivo existe"""
         return path.exists()
@@ -2,7 +2,7 @@
 Mixin para gerenciamento de progresso
 """
 from pathlib import Path
-from typing import Protocol, List
+from typing import Protocol, List, Optional
 from src.core.progress import ProgressManager
 
 
@@ -20,15 +20,66 @@ class ProgressMixin(Protocol):
                 total_size += file.stat().st_size
         return total_size
 
-    async def prepare_transfer(self, files: List[Path]) -> None:
+    async def prepare_transfer(
+        self,
+        files: List[Path],
+        skipped_files: int = 0,
+        skipped_bytes: int = 0
+    ) -> None:
         """Prepara transferência calculando tamanho total"""
         total_size = await self.calculate_transfer_size(files)
         self.progress.start_transfer(total_size, len(files))
+        if skipped_files:
+            self.progress.register_skipped(skipped_files, skipped_bytes)
 
-    async def update_progress(self, file: Path, bytes_transferred: int) -> None:
+    async def begin_scan(self) -> None:
+        """Inicia uma transferência cujo total cresce durante a varredura"""
+        self.progress.start_transfer(0, 0, scanning=True)
+
+    async def extend_transfer(
+        self,
+        files: int,
+        size: int,
+        skipped_files: int = 0,
+        skipped_bytes: int = 0
+    ) -> None:
+        """Soma ao progresso um lote encontrado pela varredura"""
+        self.progress.add_total(size, files)
+        if skipped_files:
+            self.progress.register_skipped(skipped_files, skipped_bytes)
+
+    async def finish_scan(self) -> None:
+        """Encerra a varredura, fixando o total da transferência"""
+        self.progress.finish_scan()
+
+    async def update_progress(
+        self,
+        file: Path,
+        bytes_transferred: int,
+        bytes_sent: Optional[int] = None
+    ) -> None:
         """Atualiza progresso da transferência"""
-        self.progress.update_progress(bytes_transferred, str(file))
+        self.progress.update_progress(bytes_transferred, str(file), bytes_sent)
+
+    async def revert_progress(self, file: Path, bytes_transferred: int) -> None:
+        """
+        Desconta bytes lógicos de uma tentativa que será refeita
+
+        Os bytes já enviados continuam contados em bytes_sent: foram de fato
+        transmitidos.
+        """
+        if bytes_transferred:
+            self.progress.update_progress(-bytes_transferred, str(file), 0)
+
+    async def complete_file(self, file: Path) -> None:
+        """Conta um arquivo enviado por completo"""
+        self.progress.file_completed(str(file))
+
+    async def abort_transfer(self) -> None:
+        """Encerra a exibição de uma transferência interrompida por erro"""
+        self.progress.abort()
 
     async def complete_transfer(self) -> None:
         """Finaliza transferência"""
+        self.metrics.add_transfer(self.progress.stats)
         self.progress.complete() 
\ No newline at end of file
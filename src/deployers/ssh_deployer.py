@@ -1,14 +1,45 @@
 """
 Implementação do deployer SSH/SFTP
 """
-from typing import List, Optional
-from pathlib import Path
+from typing import AsyncIterator, List, Optional
+from contextlib import asynccontextmanager
+from pathlib import Path, PurePosixPath
+import asyncio
+import shlex
+import tarfile
+import zlib
+import aiofiles  # type: ignore
 import asyncssh  # type: ignore
 
 from src.deployers.base_deployer import BaseDeployer
 from src.deployers.sync_mixin import SyncMixin
 from src.deployers.progress_mixin import ProgressMixin
-from src.core.constants import CONNECTION_TIMEOUT
+from src.core.changes import Operation
+from src.core.delta import (
+    OP_COPY,
+    OP_END,
+    REMOTE_SCRIPT,
+    DeltaNotWorthwhile,
+    block_size_for,
+    compute_delta,
+    encode_copy,
+    encode_data_header,
+    parse_signatures
+)
+from src.core.hashing import HashingService
+from src.core.constants import (
+    CONNECTION_KEEPALIVE_INTERVAL,
+    CONNECTION_TIMEOUT,
+    DELTA_CHUNK_SIZE,
+    DELTA_MAX_LITERAL_RATIO,
+    DELTA_MIN_FILE_SIZE,
+    DELTA_TRANSFER,
+    SSH_MAX_CONCURRENT_TRANSFERS,
+    SSH_TRANSFER_MODE,
+    TAR_AUTO_MAX_AVG_SIZE,
+    TAR_AUTO_MIN_FILES,
+    TAR_CHUNK_SIZE
+)
 
 
 class SSHDeployer(BaseDeployer, SyncMixin, ProgressMixin):
@@ -22,27 +53,39 @@ class SSHDeployer(BaseDeployer, SyncMixin, ProgressMixin):
         self.password = config.get("password")
         self.key_path = config.get("key_path")
         self.port = config.get("port", 22)
+        self.max_concurrent_transfers = config.get(
+            "max_concurrent_transfers", SSH_MAX_CONCURRENT_TRANSFERS
+        )
+        self.transfer_mode = config.get("transfer_mode", SSH_TRANSFER_MODE)
+        self.tar_compression = config.get("tar_compression")
+        self.delta_transfer = config.get("delta_transfer", DELTA_TRANSFER)
+        self.delta_min_size = config.get("delta_min_size", DELTA_MIN_FILE_SIZE)
+        self._delta_unavailable = False
         self.conn: Optional[asyncssh.SSHClientConnection] = None
+        self.sftp: Optional[asyncssh.SFTPClient] = None
 
     async def connect(self) -> None:
         """Estabelece conexão SSH"""
+        if self.conn:
+            return
+
+        options = {
+            "username": self.user,
+            "port": self.port,
+            "connect_timeout": CONNECTION_TIMEOUT,
+            "keepalive_interval": self.config.get(
+                "keepalive_interval", CONNECTION_KEEPALIVE_INTERVAL
+            )
+        }
+        if self.key_path:
+            options["client_keys"] = [self.key_path]
+        else:
+            options["password"] = self.password
+        if "known_hosts" in self.config:
+            options["known_hosts"] = self.config["known_hosts"]
+
         try:
-            if self.key_path:
-                self.conn = await asyncssh.connect(
-                    self.host,
-                    username=self.user,
-                    client_keys=[self.key_path],
-                    port=self.port,
-                    timeout=CONNECTION_TIMEOUT
-                )
-            else:
-                self.conn = await asyncssh.connect(
-                    self.host,
-                    username=self.user,
-                    password=self.password,
-                    port=self.port,
-                    timeout=CONNECTION_TIMEOUT
-                )
+            self.conn = await asyncssh.connect(self.host, **options)
             self.logger.info(f"Connected to {self.host} via SSH")
         except Exception as e:
             self.logger.error(f"SSH connection failed: {e}")
@@ -51,50 +94,317 @@ class SSHDeployer(BaseDeployer, SyncMixin, ProgressMixin):
     async def disconnect(self) -> None:
         """Encerra conexão SSH"""
         if self.conn:
-            self.conn.close()
-            await self.conn.wait_closed()
+            conn, self.conn = self.conn, None
+            self.known_remote_dirs.clear()
+            conn.close()
+            await conn.wait_closed()
             self.logger.info(f"Disconnected from {self.host}")
 
-    async def ensure_remote_dir(self, path: Path) -> None:
-        """Garante que o diretório remoto existe"""
+    async def is_connected(self) -> bool:
+        """Verifica se a conexão SSH continua aberta"""
+        return self.conn is not None and not self.conn.is_closed()
+
+    @asynccontextmanager
+    async def sftp_session(self) -> AsyncIterator[asyncssh.SFTPClient]:
+        """
+        Fornece a sessão SFTP do deploy atual
+
+        Reaproveita a sessão aberta pelo deploy; fora dele abre uma sessão
+        temporária que é fechada ao final do bloco.
+        """
+        if self.sftp:
+            yield self.sftp
+            return
+
         if not self.conn:
             raise RuntimeError("SSH connection not established")
-        await self.conn.run(f'mkdir -p "{path}"')
+
+        async with self.conn.start_sftp_client() as sftp:
+            self.sftp = sftp
+            try:
+                yield sftp
+            finally:
+                self.sftp = None
+
+    async def ensure_remote_dir(self, path: Path) -> None:
+        """Garante que o diretório remoto existe"""
+        async with self.sftp_session() as sftp:
+            await sftp.makedirs(str(path), exist_ok=True)
+
+    async def make_remote_dir(self, path: Path) -> None:
+        """Cria um nível de diretório com um único MKDIR SFTP"""
+        async with self.sftp_session() as sftp:
+            try:
+                await sftp.mkdir(str(path))
+            except (asyncssh.SFTPFailure, asyncssh.SFTPFileAlreadyExists):
+                if not await sftp.isdir(str(path)):
+                    raise
+
+    async def rename_remote(self, source: Path, dest: Path) -> None:
+        """Renomeia com POSIX-RENAME, que substitui dest em uma única requisição"""
+        async with self.sftp_session() as sftp:
+            try:
+                await sftp.posix_rename(str(source), str(dest))
+            except asyncssh.SFTPOpUnsupported:
+                # RENAME do SFTPv3 falha se dest existir
+                if await sftp.isfile(str(dest)):
+                    await sftp.remove(str(dest))
+                await sftp.rename(str(source), str(dest))
+
+    async def remove_remote_file(self, path: Path) -> None:
+        """Remove um arquivo remoto"""
+        async with self.sftp_session() as sftp:
+            try:
+                await sftp.remove(str(path))
+            except asyncssh.SFTPNoSuchFile:
+                pass
+
+    async def remove_remote_dir(self, path: Path) -> None:
+        """Remove um diretório remoto e seu conteúdo"""
+        async with self.sftp_session() as sftp:
+            try:
+                await sftp.rmtree(str(path))
+            except asyncssh.SFTPNoSuchFile:
+                pass
+
+    async def apply_changes(
+        self, operations: List[Operation], deletions: List[Path]
+    ) -> List[Path]:
+        """Aplica renomeações e remoções em uma única sessão SFTP"""
+        async with self.connection():
+            async with self.sftp_session():
+                return await self.run_operations(operations, deletions)
 
     async def deploy_directory(self, path: Path) -> None:
         """Deploy de diretório via SSH"""
-        try:
-            await self.connect()
+        async with self.connection():
             if self.conn:
-                # Lista todos os arquivos antes de iniciar
-                files = [f for f in path.rglob("*") if f.is_file()]
-                await self.prepare_transfer(files)
-                
-                async with self.conn.start_sftp_client() as sftp:
-                    for file in files:
-                        dest = Path(self.dest_path) / file.relative_to(path)
-                        await self.sync_file(file, dest)
+                if self.transfer_mode != "sftp":
+                    # O modo tar decide e monta o stream a partir do lote inteiro
+                    await self.deploy_file_list(await self.collect_files(path), path)
+                    return
+
+                try:
+                    async with self.sftp_session():
+                        await self.stream_directory(path, self.max_concurrent_transfers)
+                except BaseException:
+                    await self.abort_transfer()
+                    raise
+                finally:
+                    self.save_manifest()
                 
                 await self.complete_transfer()
-        finally:
-            await self.disconnect()
 
     async def deploy_files(self, files: List[Path]) -> None:
         """Deploy de arquivos específicos via SSH"""
-        try:
-            await self.connect()
+        async with self.connection():
             if self.conn:
-                await self.prepare_transfer(files)
-                
-                async with self.conn.start_sftp_client() as sftp:
-                    for file in files:
-                        if file.is_file():
-                            dest = Path(self.dest_path) / file.relative_to(self.source_path)
-                            await self.sync_file(file, dest)
-                
-                await self.complete_transfer()
+                files = [f for f in files if f.is_file() and not self.should_ignore(f)]
+                await self.deploy_file_list(files, self.source_path)
+
+    async def deploy_file_list(self, files: List[Path], root: Path) -> None:
+        """Envia uma lista já conhecida de arquivos"""
+        files, skipped_files, skipped_bytes = await self.select_changed_files(files, root)
+        await self.prepare_transfer(files, skipped_files, skipped_bytes)
+        
+        try:
+            await self.upload_files(files, root)
+        except BaseException:
+            await self.abort_transfer()
+            raise
         finally:
-            await self.disconnect()
+            self.save_manifest()
+        
+        await self.complete_transfer()
+
+    async def upload_files(self, files: List[Path], root: Path) -> None:
+        """Envia os arquivos por SFTP ou, no modo bulk, como stream tar"""
+        if self.use_tar_stream(files):
+            await self.tar_upload(files, root)
+            return
+
+        async with self.sftp_session():
+            await self.prepare_remote_dirs(files, root, self.max_concurrent_transfers)
+            await self.transfer_files(files, root, self.max_concurrent_transfers)
+
+    def use_tar_stream(self, files: List[Path]) -> bool:
+        """Decide se o lote deve ser enviado como stream tar"""
+        if self.transfer_mode == "tar":
+            return bool(files)
+        if self.transfer_mode != "auto" or len(files) < TAR_AUTO_MIN_FILES:
+            return False
+
+        # Compensa quando o lote é dominado por arquivos pequenos
+        total_size = sum(f.stat().st_size for f in files)
+        return total_size / len(files) <= TAR_AUTO_MAX_AVG_SIZE
+
+    async def tar_upload(self, files: List[Path], root: Path) -> None:
+        """
+        Envia os arquivos como um único tar extraído remotamente
+
+        O arquivo tar é gerado sob demanda a partir da lista, sem passar pelo
+        disco, e enviado pela entrada de um 'tar -x' executado em dest_path.
+        """
+        if not self.conn:
+            raise RuntimeError("SSH connection not established")
+
+        dest = shlex.quote(PurePosixPath(self.dest_path).as_posix())
+        gzip = self.tar_compression == "gzip"
+        command = f"mkdir -p {dest} && tar -x{'z' if gzip else ''}f - -C {dest}"
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if gzip else None
+
+        async with self.conn.create_process(command, encoding=None) as process:
+
+            async def send(data: bytes) -> None:
+                if compressor:
+                    data = compressor.compress(data)
+                if data:
+                    process.stdin.write(data)
+                    await process.stdin.drain()
+
+            for file in files:
+                await self._send_tar_member(file, root, send)
+
+            # Dois blocos zerados encerram o arquivo tar
+            await send(b"\0" * (2 * tarfile.BLOCKSIZE))
+            if compressor:
+                process.stdin.write(compressor.flush())
+            process.stdin.write_eof()
+
+            result = await process.wait()
+            if result.exit_status != 0:
+                stderr = (result.stderr or b"").decode(errors="replace").strip()
+                raise RuntimeError(
+                    self.i18n.get("deploy.error.transfer").format(f"remote tar: {stderr}")
+                )
+
+        for file in files:
+            await self.mark_deployed(file, root)
+        self.logger.debug(f"Streamed {len(files)} files as tar to {self.dest_path}")
+
+    async def _send_tar_member(self, file: Path, root: Path, send) -> None:
+        """Escreve cabeçalho e conteúdo de um arquivo no stream tar"""
+        stat = file.stat()
+        info = tarfile.TarInfo(file.relative_to(root).as_posix())
+        info.size = stat.st_size
+        info.mtime = int(stat.st_mtime)
+        info.mode = stat.st_mode & 0o7777
+        await send(info.tobuf(format=tarfile.PAX_FORMAT, encoding="utf-8"))
+
+        # O tamanho do cabeçalho vale mesmo que o arquivo mude durante o envio
+        remaining = info.size
+        async with aiofiles.open(file, "rb") as f:
+            while remaining > 0:
+                chunk = await f.read(min(TAR_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send(chunk)
+                await self.update_progress(file, len(chunk))
+
+        padding = remaining + (-info.size % tarfile.BLOCKSIZE)
+        if padding:
+            await send(b"\0" * padding)
+
+    def _wants_delta(self, source: Path) -> bool:
+        """Verifica se vale tentar o delta: arquivo grande já enviado antes"""
+        if not self.delta_transfer or self._delta_unavailable:
+            return False
+        if source.stat().st_size < self.delta_min_size:
+            return False
+        try:
+            rel_path = source.relative_to(self.source_path)
+        except ValueError:
+            return False
+        return self.manifest.key(rel_path) in self.manifest.entries
+
+    async def delta_sync(self, source: Path, dest: Path) -> bool:
+        """
+        Atualiza o arquivo remoto enviando apenas os blocos alterados
+
+        As assinaturas dos blocos remotos são calculadas no destino, o delta
+        é calculado localmente e o script remoto reconstrói o arquivo com
+        uma troca atômica, conferindo o sha256 do resultado.
+
+        Returns:
+            False se o delta não se aplica e o arquivo deve ir inteiro
+        """
+        if not self.conn:
+            raise RuntimeError("SSH connection not established")
+
+        size = source.stat().st_size
+        block_size = block_size_for(size)
+        script = shlex.quote(REMOTE_SCRIPT)
+        remote = shlex.quote(PurePosixPath(dest).as_posix())
+
+        result = await self.conn.run(f"python3 -c {script} sig {remote} {block_size}")
+        if result.exit_status == 127:
+            self.logger.warning("python3 not found on remote host, delta transfer disabled")
+            self._delta_unavailable = True
+            return False
+        if result.exit_status != 0:
+            return False
+
+        try:
+            ops, literal_bytes = await asyncio.to_thread(
+                compute_delta,
+                source,
+                parse_signatures(result.stdout),
+                block_size,
+                DELTA_MAX_LITERAL_RATIO
+            )
+        except DeltaNotWorthwhile:
+            self.logger.debug(f"Delta not worthwhile for {source}, sending whole file")
+            return False
+        # O script remoto confere o resultado com sha256
+        expected = await HashingService.shared("sha256").hash_file_async(source)
+
+        # Bytes lógicos já creditados ao progresso, desfeitos se o patch falhar
+        credited = 0
+        try:
+            async with self.conn.create_process(
+                f"python3 -c {script} patch {remote} {block_size}", encoding=None
+            ) as process:
+                async with aiofiles.open(source, "rb") as f:
+                    for op in ops:
+                        if op.kind == OP_COPY:
+                            header = encode_copy(op)
+                            process.stdin.write(header)
+                            # As operações seguem a ordem do arquivo local, que não
+                            # passa de size mesmo se o último bloco for curto
+                            covered = min(op.length * block_size, size - credited)
+                            credited += covered
+                            await self.update_progress(source, covered, len(header))
+                            continue
+
+                        await f.seek(op.start)
+                        remaining = op.length
+                        while remaining > 0:
+                            chunk = await f.read(min(DELTA_CHUNK_SIZE, remaining))
+                            if not chunk:
+                                break
+                            remaining -= len(chunk)
+                            process.stdin.write(encode_data_header(len(chunk)) + chunk)
+                            await process.stdin.drain()
+                            credited += len(chunk)
+                            await self.update_progress(source, len(chunk), len(chunk) + 5)
+
+                process.stdin.write(OP_END)
+                process.stdin.write_eof()
+                result = await process.wait()
+        except BaseException:
+            await self.revert_progress(source, credited)
+            raise
+
+        digest = (result.stdout or b"").decode(errors="replace").strip()
+        if result.exit_status != 0 or digest != expected:
+            self.logger.warning(f"Delta transfer of {source} failed, sending whole file")
+            # O envio completo volta a contar o arquivo inteiro
+            await self.revert_progress(source, credited)
+            return False
+
+        self.logger.debug(f"Delta synced {source}: {literal_bytes} of {size} bytes literal")
+        return True
 
     async def sync_file(self, source: Path, dest: Path) -> None:
         """Sincroniza um arquivo via SSH com progresso"""
@@ -102,15 +412,21 @@ class SSHDeployer(BaseDeployer, SyncMixin, ProgressMixin):
             raise RuntimeError("SSH connection not established")
         
         try:
-            await self.ensure_remote_dir(dest.parent)
-            
-            # Implementa transferência com progresso
-            async with self.conn.start_sftp_client() as sftp:
-                # Cria callback para progresso
-                async def progress_callback(bytes_transferred: int, _: int) -> None:
-                    await self.update_progress(source, bytes_transferred)
+            async with self.sftp_session() as sftp:
+                await self.ensure_remote_dir_cached(dest.parent)
+
+                if self._wants_delta(source) and await self.delta_sync(source, dest):
+                    self.logger.debug(f"Synced {source} -> {dest}")
+                    return
+
+                # O asyncssh informa o total acumulado; o progresso recebe o delta
+                sent = 0
+
+                def progress_callback(_src: bytes, _dst: bytes, copied: int, _total: int) -> None:
+                    nonlocal sent
+                    self.progress.update_progress(copied - sent, str(source))
+                    sent = copied
                 
-                # Inicia transferência com callback
                 await sftp.put(
                     str(source),
                     str(dest),
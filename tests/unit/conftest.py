@@ -0,0 +1,27 @@
+import os
+import tempfile
+
+# Antes de importar src: loggers de módulo já abrem o arquivo de log na importação
+os.environ.setdefault("NOKTECH_DEPLOY_LOGS_DIR", tempfile.mkdtemp(prefix="noktech-tests-"))
+
+import pytest  # noqa: E402
+
+from src.core import manifest, metrics, profiling, stat_index  # noqa: E402
+from src.core.metrics import MetricsExporter  # noqa: E402
+from src.core.stat_index import StatIndex  # noqa: E402
+from src.utils import logger  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def isolated_runtime_dirs(tmp_path_factory, monkeypatch):
+    """Redireciona logs, manifestos, índice, métricas e perfis para fora do checkout"""
+    logs_dir = tmp_path_factory.mktemp("logs")
+    monkeypatch.setattr(logger, "LOGS_DIR", logs_dir)
+    monkeypatch.setattr(manifest, "MANIFEST_DIR", logs_dir / "manifests")
+    monkeypatch.setattr(stat_index, "STAT_INDEX_DIR", logs_dir / "index")
+    monkeypatch.setattr(metrics, "METRICS_DIR", logs_dir / "metrics")
+    monkeypatch.setattr(profiling, "PROFILE_DIR", logs_dir / "profiles")
+    # Instâncias compartilhadas guardam o diretório em que foram criadas
+    monkeypatch.setattr(StatIndex, "_instances", {})
+    monkeypatch.setattr(MetricsExporter, "_instances", {})
+    return logs_dir
@@ -0,0 +1,43 @@
+import pytest
+
+from benchmarks.runner import BenchmarkResult, compare
+from benchmarks.servers import StandInServer
+from benchmarks.trees import generate
+
+
+class TestBenchmarks:
+    def test_trees_are_deterministic_and_reused(self, tmp_path):
+        first = generate("webapp", tmp_path / "a", scale=0.002)
+        second = generate("webapp", tmp_path / "b", scale=0.002)
+        files_a = sorted(p.relative_to(tmp_path / "a") for p in (tmp_path / "a").rglob("*"))
+        files_b = sorted(p.relative_to(tmp_path / "b") for p in (tmp_path / "b").rglob("*"))
+        assert files_a == files_b
+        assert (first.files, first.bytes) == (second.files, second.bytes)
+
+        # O marcador fica fora da árvore e permite reaproveitá-la
+        assert not any(p.name.endswith(".tree.json") for p in (tmp_path / "a").rglob("*"))
+        mtime = max(p.stat().st_mtime_ns for p in (tmp_path / "a").rglob("*"))
+        generate("webapp", tmp_path / "a", scale=0.002)
+        assert max(p.stat().st_mtime_ns for p in (tmp_path / "a").rglob("*")) == mtime
+
+    def test_compare_flags_throughput_and_round_trip_regressions(self):
+        baseline = {
+            "tiny/sftp": {
+                "files_per_second": 300.0, "mb_per_second": 0.3, "round_trips_per_file": 3.0
+            }
+        }
+        steady = BenchmarkResult("tiny", "sftp", 1000, 1_000_000, 3.2, 3000, 9000)
+        chatty = BenchmarkResult("tiny", "sftp", 1000, 1_000_000, 3.2, 4000, 9000)
+        slow = BenchmarkResult("tiny", "sftp", 1000, 1_000_000, 10.0, 3000, 9000)
+
+        assert compare([steady], baseline, tolerance=0.25) == []
+        assert "round_trips_per_file" in compare([chatty], baseline, tolerance=0.25)[0]
+        assert any("files_per_second" in r for r in compare([slow], baseline, tolerance=0.25))
+
+    def test_stand_in_servers_must_implement_start_and_close(self):
+        class Incomplete(StandInServer):
+            async def start(self):
+                pass
+
+        with pytest.raises(TypeError):
+            Incomplete()
@@ -0,0 +1,188 @@
+import asyncio
+import time
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+from src.core.changes import ChangeBatch, ChangeKind, ChangeSet, FullSyncCause, Operation
+from src.core.watcher import FileWatcher
+
+
+class TestChangeSet:
+    def test_events_collapse_to_net_change(self):
+        changes = ChangeSet()
+        changes.add(Path("a"), ChangeKind.CREATED)
+        changes.add(Path("a"), ChangeKind.MODIFIED)
+        changes.add(Path("b"), ChangeKind.CREATED)
+        changes.add(Path("b"), ChangeKind.DELETED)
+        changes.add(Path("c"), ChangeKind.DELETED)
+        changes.add(Path("c"), ChangeKind.CREATED)
+        changes.add(Path("d"), ChangeKind.MODIFIED)
+        changes.add(Path("d"), ChangeKind.DELETED)
+
+        assert changes.drain().changes == {
+            Path("a"): ChangeKind.CREATED,
+            Path("c"): ChangeKind.MODIFIED,
+            Path("d"): ChangeKind.DELETED,
+        }
+        assert not changes
+
+    def test_uploads_skip_deletions(self):
+        batch = ChangeBatch(changes={Path("a"): ChangeKind.MODIFIED, Path("b"): ChangeKind.DELETED})
+        assert batch.uploads() == [Path("a")]
+        assert batch.deletions() == [Path("b")]
+
+    def test_directory_move_absorbs_child_moves(self):
+        changes = ChangeSet()
+        changes.add(Path("media/new.mp4"), ChangeKind.CREATED)
+        changes.add(Path("media/old.mp4"), ChangeKind.MODIFIED)
+        changes.move(Path("media"), Path("videos"), is_dir=True)
+        changes.move(Path("media/old.mp4"), Path("videos/old.mp4"))
+        changes.move(Path("media/new.mp4"), Path("videos/new.mp4"))
+
+        batch = changes.drain()
+        assert batch.operations == [
+            Operation(ChangeKind.MOVED, Path("media"), True, Path("videos"))
+        ]
+        assert batch.changes == {
+            Path("videos/new.mp4"): ChangeKind.CREATED,
+            Path("videos/old.mp4"): ChangeKind.MODIFIED,
+        }
+
+    def test_file_moves_chain_and_cancel(self):
+        changes = ChangeSet()
+        changes.move(Path("a"), Path("b"))
+        changes.move(Path("b"), Path("c"))
+        changes.move(Path("tmp"), Path("x"))
+        changes.add(Path("x"), ChangeKind.DELETED)
+        changes.add(Path("new"), ChangeKind.CREATED)
+        changes.move(Path("new"), Path("final"))
+
+        batch = changes.drain()
+        assert batch.operations == [Operation(ChangeKind.MOVED, Path("a"), False, Path("c"))]
+        assert batch.changes == {
+            Path("tmp"): ChangeKind.DELETED,
+            Path("final"): ChangeKind.CREATED,
+        }
+
+    def test_removed_directory_drops_pending_children(self):
+        changes = ChangeSet()
+        changes.add(Path("d/a"), ChangeKind.DELETED)
+        changes.add(Path("d/b"), ChangeKind.MODIFIED)
+        changes.remove_dir(Path("d"))
+
+        batch = changes.drain()
+        assert batch.operations == [Operation(ChangeKind.DELETED, Path("d"), True)]
+        assert batch.changes == {}
+
+
+class TestDebounce:
+    def _watcher(self, quiet_period, max_latency):
+        deployer = MagicMock()
+        deployer.config = {"watch": {"quiet_period": quiet_period, "max_latency": max_latency}}
+        deployer.deploy_files = AsyncMock()
+        return FileWatcher(deployer)
+
+    def test_event_storm_switches_to_full_sync_after_settling(self):
+        async def scenario():
+            watcher = self._watcher(0.01, 0.02)
+            watcher.storm_rate = 10
+            watcher.storm_settle = 0.1
+            watcher._running = True
+            for index in range(20):
+                watcher._record_change(Path(f"f{index}"), ChangeKind.CREATED)
+            assert watcher._pending_changes.full_sync
+            assert watcher.storms == 1
+            assert watcher.stats()["overflows"] == 0
+
+            started = time.monotonic()
+            await watcher._wait_for_quiet()
+            # Sem max_latency: espera storm_settle desde o último evento
+            assert time.monotonic() - started >= 0.09
+
+        asyncio.run(scenario())
+
+    def test_flushes_once_after_quiet_period(self):
+        async def scenario():
+            watcher = self._watcher(0.05, 5.0)
+            watcher._running = True
+            for _ in range(3):
+                watcher._record_change(Path("a"), ChangeKind.MODIFIED)
+                await asyncio.sleep(0.02)
+            await watcher._wait_for_quiet()
+            assert time.monotonic() - watcher._last_event >= 0.05
+            await watcher._process_changes()
+            watcher.deployer.deploy_files.assert_awaited_once_with([Path("a")])
+            report = watcher.deployer.begin_metrics.return_value
+            assert report.watch["queue_depth"] == 0 and report.watch["overflows"] == 0
+
+        asyncio.run(scenario())
+
+    def test_failed_batch_becomes_a_full_sync(self):
+        async def scenario():
+            watcher = self._watcher(0.01, 5.0)
+            watcher.deployer.deploy_files.side_effect = ConnectionResetError("gone")
+            watcher._record_change(Path("a"), ChangeKind.MODIFIED)
+            await watcher._process_changes()
+
+            assert watcher._pending_changes.full_sync
+            assert watcher.stats()["failure_syncs"] == 1
+
+        asyncio.run(scenario())
+
+    def test_max_latency_bounds_continuous_churn(self):
+        async def scenario():
+            watcher = self._watcher(0.05, 0.1)
+            watcher._running = True
+            watcher._record_change(Path("a"), ChangeKind.MODIFIED)
+
+            async def churn():
+                while True:
+                    watcher._record_change(Path("a"), ChangeKind.MODIFIED)
+                    await asyncio.sleep(0.01)
+
+            task = asyncio.create_task(churn())
+            started = time.monotonic()
+            await asyncio.wait_for(watcher._wait_for_quiet(), 1.0)
+            task.cancel()
+            assert time.monotonic() - started < 0.5
+
+        asyncio.run(scenario())
+
+
+class TestBoundedChangeSet:
+    def test_overflow_switches_to_full_sync(self):
+        changes = ChangeSet(max_paths=3)
+        for index in range(3):
+            changes.add(Path(f"f{index}"), ChangeKind.MODIFIED)
+        assert not changes.full_sync
+
+        changes.add(Path("f3"), ChangeKind.MODIFIED)
+        changes.move(Path("a"), Path("b"))
+        assert changes.full_sync and len(changes) == 0
+        assert changes.overflows == 1
+
+        batch = changes.drain()
+        assert batch.full_sync and batch.uploads() == []
+        assert not changes
+
+        changes.add(Path("f0"), ChangeKind.MODIFIED)
+        assert changes.drain().changes == {Path("f0"): ChangeKind.MODIFIED}
+
+    def test_full_syncs_are_counted_per_cause(self):
+        changes = ChangeSet(max_paths=1)
+        changes.add(Path("a"), ChangeKind.MODIFIED)
+        changes.add(Path("b"), ChangeKind.MODIFIED)
+        # Já pendente: outra causa não conta de novo
+        changes.require_full_sync(FullSyncCause.DROP)
+        changes.drain()
+
+        changes.require_full_sync(FullSyncCause.DROP)
+        changes.drain()
+        changes.require_full_sync(FullSyncCause.STORM)
+        assert changes.full_syncs == {
+            FullSyncCause.OVERFLOW: 1,
+            FullSyncCause.STORM: 1,
+            FullSyncCause.DROP: 1,
+            FullSyncCause.FAILURE: 0,
+        }
+        assert changes.overflows == 1
@@ -0,0 +1,47 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.deployers.connection_pool import ConnectionPool
+
+
+def _deployer():
+    deployer = MagicMock()
+    deployer.host_name = "web"
+    deployer.config = {"keepalive_interval": 60, "idle_timeout": 600}
+    deployer.connect = AsyncMock()
+    deployer.disconnect = AsyncMock()
+    deployer.is_connected = AsyncMock(return_value=True)
+    return deployer
+
+
+class TestConnectionPool:
+    @pytest.mark.asyncio
+    async def test_connection_is_checked_after_a_failed_use(self):
+        deployer = _deployer()
+        pool = ConnectionPool()
+        pool.register(deployer)
+        try:
+            async with pool.acquire(deployer):
+                pass
+            async with pool.acquire(deployer):
+                pass
+            # Dentro do keepalive_interval e sem erro: nada a verificar
+            deployer.is_connected.assert_not_awaited()
+
+            with pytest.raises(ConnectionResetError):
+                async with pool.acquire(deployer):
+                    raise ConnectionResetError()
+
+            deployer.is_connected.return_value = False
+            async with pool.acquire(deployer):
+                pass
+            deployer.is_connected.assert_awaited_once()
+            assert deployer.connect.await_count == 2
+            deployer.disconnect.assert_awaited_once()
+
+            async with pool.acquire(deployer):
+                pass
+            deployer.is_connected.assert_awaited_once()
+        finally:
+            await pool.close()
@@ -0,0 +1,146 @@
+import hashlib
+import os
+import subprocess  # noqa: S404
+import sys
+import time
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from benchmarks.servers import SFTPStandIn
+from src.deployers.ssh_deployer import SSHDeployer
+
+from src.core.delta import (
+    OP_COPY,
+    OP_END,
+    REMOTE_SCRIPT,
+    DeltaNotWorthwhile,
+    compute_delta,
+    encode_copy,
+    encode_data_header,
+    parse_signatures,
+)
+
+BLOCK_SIZE = 4096
+
+
+def _remote(mode, path, stdin=b""):
+    """Executa o script remoto localmente"""
+    return subprocess.run(  # noqa: S603
+        [sys.executable, "-c", REMOTE_SCRIPT, mode, str(path), str(BLOCK_SIZE)],
+        input=stdin,
+        capture_output=True,
+        check=True,
+    ).stdout
+
+
+def _encode(ops, source):
+    data = source.read_bytes()
+    stream = b""
+    for op in ops:
+        if op.kind == OP_COPY:
+            stream += encode_copy(op)
+        else:
+            stream += encode_data_header(op.length) + data[op.start:op.start + op.length]
+    return stream + OP_END
+
+
+class TestDeltaTransfer:
+    def test_insertion_reuses_remote_blocks(self, tmp_path):
+        """Inserção no meio do arquivo envia apenas a região alterada"""
+        original = os.urandom(BLOCK_SIZE * 64)
+        remote = tmp_path / "remote.bin"
+        remote.write_bytes(original)
+        local = tmp_path / "local.bin"
+        local.write_bytes(original[:10000] + b"inserted bytes" + original[10000:])
+
+        signatures = parse_signatures(_remote("sig", remote).decode())
+        ops, literal = compute_delta(local, signatures, BLOCK_SIZE)
+
+        assert literal < BLOCK_SIZE * 2
+        digest = _remote("patch", remote, _encode(ops, local)).decode()
+        assert remote.read_bytes() == local.read_bytes()
+        assert digest == hashlib.sha256(local.read_bytes()).hexdigest()
+
+    def test_unrelated_file_is_not_worthwhile(self, tmp_path):
+        """Arquivo totalmente diferente cai para o envio completo"""
+        remote = tmp_path / "remote.bin"
+        remote.write_bytes(os.urandom(BLOCK_SIZE * 16))
+        local = tmp_path / "local.bin"
+        local.write_bytes(os.urandom(BLOCK_SIZE * 16))
+
+        signatures = parse_signatures(_remote("sig", remote).decode())
+        with pytest.raises(DeltaNotWorthwhile):
+            compute_delta(local, signatures, BLOCK_SIZE)
+
+    def test_rewritten_file_stops_rolling_early(self, tmp_path):
+        """Sem casamento, só blocos alinhados são testados; a troca no lugar ainda reaproveita"""
+        original = os.urandom(BLOCK_SIZE * 1024)
+        remote = tmp_path / "remote.bin"
+        remote.write_bytes(original)
+        signatures = parse_signatures(_remote("sig", remote).decode())
+
+        rewritten = tmp_path / "rewritten.bin"
+        rewritten.write_bytes(os.urandom(len(original)))
+        started = time.perf_counter()
+        with pytest.raises(DeltaNotWorthwhile):
+            compute_delta(rewritten, signatures, BLOCK_SIZE, max_unmatched_blocks=4)
+        # Rolar 2 MB byte a byte em Python leva segundos
+        assert time.perf_counter() - started < 0.5
+
+        edited = tmp_path / "edited.bin"
+        edited.write_bytes(
+            original[:BLOCK_SIZE * 10 + 7] + os.urandom(BLOCK_SIZE * 8 - 7)
+            + original[BLOCK_SIZE * 18:]
+        )
+        ops, literal = compute_delta(edited, signatures, BLOCK_SIZE, max_unmatched_blocks=4)
+        assert literal == BLOCK_SIZE * 8
+        assert (ops[-1].kind, ops[-1].start) == (OP_COPY, 18)
+
+
+class TestSSHDeltaProgress:
+    async def _delta(self, tmp_path, expected_digest=None):
+        remote = tmp_path / "remote.bin"
+        original = os.urandom(BLOCK_SIZE * 16 + 100)
+        remote.write_bytes(original)
+        local = tmp_path / "local.bin"
+        local.write_bytes(
+            original[:BLOCK_SIZE * 4] + os.urandom(BLOCK_SIZE) + original[BLOCK_SIZE * 5:]
+        )
+
+        async with SFTPStandIn(allow_exec=True) as server:
+            deployer = SSHDeployer("test_delta", {
+                **server.deployer_config(),
+                "source_path": str(tmp_path),
+                "dest_path": str(tmp_path),
+            })
+            deployer.progress.start_transfer(local.stat().st_size, 1)
+            await deployer.connect()
+            try:
+                if expected_digest:
+                    hasher = Mock(hash_file_async=AsyncMock(return_value=expected_digest))
+                    shared = "src.deployers.ssh_deployer.HashingService.shared"
+                    with patch(shared, return_value=hasher):
+                        synced = await deployer.delta_sync(local, remote)
+                else:
+                    synced = await deployer.delta_sync(local, remote)
+            finally:
+                deployer.progress.abort()
+                await deployer.disconnect()
+        return synced, deployer.progress.stats, local, remote
+
+    @pytest.mark.asyncio
+    async def test_progress_counts_the_file_once(self, tmp_path):
+        synced, stats, local, remote = await self._delta(tmp_path)
+        assert synced
+        assert remote.read_bytes() == local.read_bytes()
+        assert stats.bytes_transferred == local.stat().st_size
+        assert stats.bytes_sent < local.stat().st_size
+
+    @pytest.mark.asyncio
+    async def test_failed_patch_reverts_progress(self, tmp_path):
+        synced, stats, _, _ = await self._delta(tmp_path, expected_digest="0" * 64)
+        # O envio completo que segue volta a contar o arquivo do zero
+        assert not synced
+        assert stats.bytes_transferred == 0
+        assert stats.bytes_sent > 0
@@ -0,0 +1,114 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.cli import CLI
+from src.core.deploy_manager import DeployManager, HostResult
+from src.deploy_client import DeployClient
+
+
+class _FakeDeployer:
+    def __init__(self, host_name, tracker):
+        self.host_name = host_name
+        self.tracker = tracker
+        self.incremental = True
+
+    async def deploy(self):
+        self.tracker["running"] += 1
+        self.tracker["peak"] = max(self.tracker["peak"], self.tracker["running"])
+        try:
+            await asyncio.sleep(0.01)
+            self.tracker["calls"][self.host_name] = self.tracker["calls"].get(self.host_name, 0) + 1
+            self.tracker["order"].append(self.host_name)
+            if self.host_name == "broken":
+                raise ConnectionError("unreachable")
+        finally:
+            self.tracker["running"] -= 1
+
+
+def _config(parallel, hosts):
+    return {
+        "parallel_deploy": parallel,
+        "max_parallel_hosts": 2,
+        "hosts": {
+            name: {"enabled": True, "protocol": "local", "groups": groups}
+            for name, groups in hosts.items()
+        },
+    }
+
+
+@pytest.mark.asyncio
+class TestDeployManager:
+    async def _run(self, config, group=None, retry_delay=0):
+        tracker = {"running": 0, "peak": 0, "calls": {}, "order": []}
+        manager = DeployManager(config)
+        with patch.object(
+            manager, "create_deployer", side_effect=lambda name: _FakeDeployer(name, tracker)
+        ), patch("src.core.deploy_manager.DEPLOY_RETRY_DELAY", retry_delay):
+            results = await manager.deploy_all(group)
+        return results, tracker
+
+    @pytest.mark.asyncio
+    async def test_parallel_hosts_respect_limit(self):
+        """Hosts rodam em paralelo sem passar de max_parallel_hosts"""
+        config = _config(True, {f"h{i}": [] for i in range(5)})
+        results, tracker = await self._run(config)
+
+        assert all(result.success for result in results)
+        assert tracker["peak"] == 2
+
+    @pytest.mark.asyncio
+    async def test_sequential_when_parallel_disabled(self):
+        """parallel_deploy desligado executa um host por vez"""
+        config = _config(False, {"a": [], "b": [], "c": []})
+        _, tracker = await self._run(config)
+
+        assert tracker["peak"] == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_host_is_retried_and_isolated(self):
+        """Falha em um host é repetida e não interrompe os demais"""
+        config = _config(True, {"ok": ["web"], "broken": ["web"], "db": ["data"]})
+        results, tracker = await self._run(config, group="web")
+
+        by_host = {result.host: result for result in results}
+        assert set(by_host) == {"ok", "broken"}
+        assert by_host["ok"].success
+        assert not by_host["broken"].success
+        assert by_host["broken"].attempts == 3
+        assert tracker["calls"]["broken"] == 3
+
+    @pytest.mark.asyncio
+    async def test_retry_backoff_releases_the_host_slot(self):
+        """Com um host por vez, a espera entre tentativas não bloqueia os demais"""
+        config = _config(False, {"broken": [], "ok": []})
+        results, tracker = await self._run(config, retry_delay=0.2)
+
+        assert {result.host: result.success for result in results} == {
+            "broken": False, "ok": True
+        }
+        # ok roda durante a primeira espera do host com falha
+        assert tracker["order"] == ["broken", "ok", "broken", "broken"]
+        assert tracker["peak"] == 1
+
+
+class TestEntryPoints:
+    @pytest.mark.parametrize("selection", [["--all"], ["--group", "production"]])
+    def test_cli_rejects_watch_for_several_hosts(self, selection):
+        with patch("sys.argv", ["noktech-deploy", "--watch", *selection]):
+            with pytest.raises(SystemExit) as exit_info:
+                CLI().parse_args()
+        assert exit_info.value.code == 2
+
+    @pytest.mark.asyncio
+    async def test_client_reports_failed_hosts(self):
+        client = DeployClient()
+        client._deploy_manager = MagicMock(deploy_all=AsyncMock(return_value=[
+            HostResult("web", True, 1, 0.1),
+            HostResult("db", False, 3, 0.1, "unreachable"),
+        ]))
+        assert await client.run() is False
+
+        with pytest.raises(ValueError):
+            await client.setup({"watch": {"enabled": True}, "hosts": {}})
@@ -3,6 +3,7 @@ from unittest.mock import AsyncMock, patch
 
 import pytest
 
+from src.core.changes import ChangeKind, Operation
 from src.deployers.ftp_deployer import FTPDeployer
 from src.deployers.local_deployer import LocalDeployer
 from src.deployers.ssh_deployer import SSHDeployer
@@ -133,3 +134,265 @@ class TestLocalDeployer:
     async def test_file_exists(self, local_deployer):
         """Testa verificação de existência de arquivo"""
         assert await local_deployer.file_exists("test.txt")
+
+
+@pytest.mark.asyncio
+class TestTransferPool:
+    @pytest.mark.asyncio
+    async def test_failed_file_does_not_abort_others(self, tmp_path):
+        """Falha em um arquivo não interrompe os demais envios"""
+        source = tmp_path / "src"
+        source.mkdir()
+        files = []
+        for name in ("a.txt", "b.txt", "c.txt"):
+            file = source / name
+            file.write_text(name)
+            files.append(file)
+
+        deployer = LocalDeployer(
+            "test_local", {"source_path": str(source), "dest_path": str(tmp_path / "dest")}
+        )
+        deployer.manifest.path = tmp_path / "manifest.json"
+        original_sync = deployer.sync_file
+
+        async def flaky_sync(src, dest):
+            if src.name == "b.txt":
+                raise OSError("disk full")
+            await original_sync(src, dest)
+
+        deployer.sync_file = flaky_sync
+        await deployer.prepare_transfer(files)
+
+        with pytest.raises(RuntimeError):
+            await deployer.transfer_files(files, source, workers=2)
+
+        assert (tmp_path / "dest/a.txt").exists()
+        assert (tmp_path / "dest/c.txt").exists()
+        assert not (tmp_path / "dest/b.txt").exists()
+        assert set(deployer.manifest.entries) == {"a.txt", "c.txt"}
+
+
+class TestRemoteDirPlan:
+    def test_plan_lists_unique_dirs_parents_first(self, tmp_path):
+        """Plano de diretórios é único, ordenado e respeita o cache"""
+        source = tmp_path / "src"
+        dest = tmp_path / "dest"
+        deployer = LocalDeployer(
+            "test_local", {"source_path": str(source), "dest_path": str(dest)}
+        )
+        files = [
+            source / "a/b/one.txt",
+            source / "a/b/two.txt",
+            source / "a/c/three.txt",
+            source / "root.txt",
+        ]
+
+        assert deployer.plan_remote_dirs(files, source) == [
+            dest / "a",
+            dest / "a/b",
+            dest / "a/c",
+        ]
+
+        deployer.known_remote_dirs.update({(dest / "a").as_posix(), (dest / "a/b").as_posix()})
+        assert deployer.plan_remote_dirs(files, source) == [dest / "a/c"]
+
+
+@pytest.mark.asyncio
+class TestSSHTarStream:
+    @pytest.mark.asyncio
+    async def test_tar_members_form_valid_archive(self, tmp_path):
+        """Stream tar gerado sob demanda é um arquivo tar válido"""
+        import io
+        import tarfile
+
+        source = tmp_path / "src"
+        (source / "sub").mkdir(parents=True)
+        (source / "sub/a.txt").write_text("conteúdo")
+        (source / "b.bin").write_bytes(b"\x00\x01" * 1000)
+
+        deployer = SSHDeployer(
+            "test_ssh",
+            {
+                "host": "test.example.com",
+                "user": "testuser",
+                "source_path": str(source),
+                "dest_path": "/remote/path",
+            },
+        )
+        await deployer.prepare_transfer([source / "sub/a.txt", source / "b.bin"])
+        buffer = io.BytesIO()
+
+        async def send(data):
+            buffer.write(data)
+
+        for file in (source / "sub/a.txt", source / "b.bin"):
+            await deployer._send_tar_member(file, source, send)
+        buffer.write(b"\0" * 1024)
+        buffer.seek(0)
+
+        with tarfile.open(fileobj=buffer) as archive:
+            assert archive.getnames() == ["sub/a.txt", "b.bin"]
+            assert archive.extractfile("sub/a.txt").read() == "conteúdo".encode()
+            assert archive.extractfile("b.bin").read() == b"\x00\x01" * 1000
+
+
+class TestLocalFastCopy:
+    @pytest.mark.parametrize("method", ["copy_file_range", "sendfile", "buffer"])
+    def test_copy_range_methods(self, tmp_path, method):
+        """Todos os métodos de cópia produzem o mesmo conteúdo"""
+        import os
+
+        from src.deployers.local_deployer import _copy_range
+
+        data = os.urandom(3 * 1024 * 1024 + 17)
+        source = tmp_path / "source.bin"
+        source.write_bytes(data)
+        dest = tmp_path / "dest.bin"
+
+        src_fd = os.open(source, os.O_RDONLY)
+        dst_fd = os.open(dest, os.O_WRONLY | os.O_CREAT | os.O_TRUNC)
+        try:
+            offset = 0
+            while offset < len(data):
+                copied, method = _copy_range(
+                    src_fd, dst_fd, offset, min(1024 * 1024, len(data) - offset), method
+                )
+                offset += copied
+        finally:
+            os.close(src_fd)
+            os.close(dst_fd)
+
+        assert dest.read_bytes() == data
+
+    @pytest.mark.asyncio
+    async def test_sync_file_preserves_content_and_mtime(self, tmp_path):
+        """Cópia rápida preserva conteúdo, metadados e contabiliza progresso"""
+        source_dir = tmp_path / "src"
+        source_dir.mkdir()
+        source = source_dir / "data.bin"
+        source.write_bytes(b"abc" * 100000)
+
+        deployer = LocalDeployer(
+            "test_local", {"source_path": str(source_dir), "dest_path": str(tmp_path / "dest")}
+        )
+        await deployer.prepare_transfer([source])
+        await deployer.sync_file(source, tmp_path / "dest/data.bin")
+
+        dest = tmp_path / "dest/data.bin"
+        assert dest.read_bytes() == source.read_bytes()
+        assert dest.stat().st_mtime == source.stat().st_mtime
+        assert deployer.progress.stats.bytes_transferred == 300000
+
+
+@pytest.mark.asyncio
+class TestStreamingPipeline:
+    @pytest.mark.asyncio
+    async def test_stream_directory_sends_tree_and_grows_total(self, tmp_path):
+        """Varredura em fluxo envia a árvore toda e soma o total durante o scan"""
+        source = tmp_path / "src"
+        for index in range(30):
+            file = source / f"d{index % 3}" / f"sub{index % 2}" / f"f{index}.txt"
+            file.parent.mkdir(parents=True, exist_ok=True)
+            file.write_text("x" * index)
+
+        deployer = LocalDeployer(
+            "test_local", {"source_path": str(source), "dest_path": str(tmp_path / "dest")}
+        )
+        deployer.manifest.path = tmp_path / "manifest.json"
+        created = []
+        original_mkdir = deployer.make_remote_dir
+
+        async def counting_mkdir(path):
+            created.append(path)
+            await original_mkdir(path)
+
+        deployer.make_remote_dir = counting_mkdir
+        await deployer.stream_directory(source, workers=3)
+
+        sent = sorted(p.relative_to(tmp_path / "dest") for p in (tmp_path / "dest").rglob("*.txt"))
+        assert sent == sorted(p.relative_to(source) for p in source.rglob("*.txt"))
+        assert deployer.progress.stats.files_total == 30
+        assert deployer.progress.stats.bytes_total == sum(range(30))
+        assert not deployer.progress.stats.scanning
+        # Um mkdir por diretório novo (3 + 6), sem repetição
+        assert len(created) == len(set(created)) == 9
+
+
+@pytest.mark.asyncio
+class TestRemoteOperations:
+    @pytest.mark.asyncio
+    async def test_rename_and_delete_follow_source(self, tmp_path):
+        """Renomeações e remoções viram operações no destino e no manifesto"""
+        source = tmp_path / "src"
+        (source / "media").mkdir(parents=True)
+        (source / "media" / "clip.mp4").write_bytes(b"x" * 1000)
+        (source / "old.txt").write_text("old")
+
+        deployer = LocalDeployer(
+            "test_local", {"source_path": str(source), "dest_path": str(tmp_path / "dest")}
+        )
+        deployer.manifest.path = tmp_path / "manifest.json"
+        await deployer.deploy_directory(source)
+
+        (source / "media").rename(source / "videos")
+        (source / "old.txt").unlink()
+        sync_file = AsyncMock()
+        deployer.sync_file = sync_file
+        resend = await deployer.apply_changes(
+            [Operation(ChangeKind.MOVED, source / "media", True, source / "videos")],
+            [source / "old.txt", source / "never_sent.txt"]
+        )
+
+        assert resend == []
+        assert (tmp_path / "dest" / "videos" / "clip.mp4").read_bytes() == b"x" * 1000
+        assert not (tmp_path / "dest" / "media").exists()
+        assert not (tmp_path / "dest" / "old.txt").exists()
+        assert set(deployer.manifest.entries) == {"videos/clip.mp4"}
+
+        # Após a renomeação o arquivo não é reenviado
+        await deployer.deploy_files([source / "videos" / "clip.mp4"])
+        sync_file.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_failed_rename_resends_with_source_relative_rules(self, tmp_path):
+        """O reenvio de um diretório renomeado usa as regras relativas à origem"""
+        source = tmp_path / "src"
+        (source / "videos" / "cache").mkdir(parents=True)
+        for name in ("videos/clip.mp4", "videos/raw.txt", "videos/cache/x.bin"):
+            (source / name).write_text(name)
+
+        deployer = LocalDeployer("test_local", {
+            "source_path": str(source),
+            "dest_path": str(tmp_path / "dest"),
+            "ignore_patterns": ["/videos/cache/", "/raw.txt"],
+        })
+        deployer.manifest.path = tmp_path / "manifest.json"
+        deployer.move_path = AsyncMock(side_effect=FileNotFoundError("media"))
+
+        resend = await deployer.apply_changes(
+            [Operation(ChangeKind.MOVED, source / "media", True, source / "videos")], []
+        )
+
+        # /raw.txt só vale na raiz; /videos/cache/ é ignorado
+        assert sorted(p.relative_to(source).as_posix() for p in resend) == [
+            "videos/clip.mp4", "videos/raw.txt"
+        ]
+
+    @pytest.mark.asyncio
+    async def test_prune_deleted_removes_files_missing_from_source(self, tmp_path):
+        """Reconciliação remove o que sumiu da origem desde o último deploy"""
+        source = tmp_path / "src"
+        source.mkdir()
+        for name in ("keep.txt", "gone.txt"):
+            (source / name).write_text(name)
+
+        deployer = LocalDeployer(
+            "test_local", {"source_path": str(source), "dest_path": str(tmp_path / "dest")}
+        )
+        deployer.manifest.path = tmp_path / "manifest.json"
+        await deployer.deploy_directory(source)
+        (source / "gone.txt").unlink()
+
+        assert await deployer.prune_deleted() == 1
+        assert sorted(p.name for p in (tmp_path / "dest").iterdir()) == ["keep.txt"]
+        assert set(deployer.manifest.entries) == {"keep.txt"}
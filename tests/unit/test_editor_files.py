@@ -0,0 +1,56 @@
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+from watchdog.events import FileCreatedEvent, FileDeletedEvent, FileMovedEvent  # type: ignore
+
+from src.core.changes import ChangeKind
+from src.core.editor_files import is_scratch_file, is_transient, save_artifact_target
+from src.core.watcher import DeployEventHandler
+
+
+class TestEditorFiles:
+    @pytest.mark.parametrize("name", [
+        ".app.py.swp", ".app.py.swo", "4913", ".#app.py", "#app.py#", ".~lock.doc.odt#",
+    ])
+    def test_scratch_files(self, name):
+        assert is_scratch_file(Path("/src") / name)
+
+    @pytest.mark.parametrize("name,target", [
+        ("app.py___jb_tmp___", "app.py"),
+        ("app.py___jb_old___", "app.py"),
+        ("app.py~", "app.py"),
+        (".goutputstream-X1Y2", None),
+    ])
+    def test_save_artifacts_resolve_to_target(self, name, target):
+        expected = Path("/src") / target if target else None
+        assert save_artifact_target(Path("/src") / name) == (True, expected)
+
+    @pytest.mark.parametrize("name", ["app.py", "swap.swp.txt", "4913.txt", "~notes.txt"])
+    def test_regular_files_pass(self, name):
+        assert not is_transient(Path("/src") / name)
+
+
+class TestHandlerFiltering:
+    def _handler(self):
+        watcher = MagicMock()
+        watcher.editor_filter = True
+        watcher.deployer.should_ignore.return_value = False
+        return DeployEventHandler(watcher), watcher
+
+    def test_atomic_save_reaches_watcher_as_real_file(self, tmp_path):
+        handler, watcher = self._handler()
+        target = tmp_path / "app.py"
+        target.write_text("v2")
+        handler.on_any_event(FileCreatedEvent(str(tmp_path / "app.py___jb_tmp___")))
+        handler.on_any_event(FileMovedEvent(str(target), str(tmp_path / "app.py___jb_old___")))
+        handler.on_any_event(FileMovedEvent(str(tmp_path / "app.py___jb_tmp___"), str(target)))
+        handler.on_any_event(FileDeletedEvent(str(tmp_path / "app.py___jb_old___")))
+
+        queued = [(call.args[0], call.args[1]) for call in watcher.queue_change.call_args_list]
+        assert queued == [
+            (target, ChangeKind.DELETED),
+            (target, ChangeKind.CREATED),
+            (target, ChangeKind.MODIFIED),
+        ]
+        assert handler.transient == 4
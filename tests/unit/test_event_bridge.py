@@ -0,0 +1,69 @@
+import asyncio
+import threading
+
+from watchdog.events import FileModifiedEvent  # type: ignore
+
+from src.core.event_bridge import EventBridge
+from src.core.watch_manager import AsyncWatchEventHandler
+
+
+class TestEventBridge:
+    def test_events_from_threads_arrive_in_batches(self):
+        async def scenario():
+            bridge = EventBridge(asyncio.get_running_loop())
+            threads = [
+                threading.Thread(target=lambda n=n: [bridge.put((n, i)) for i in range(500)])
+                for n in range(4)
+            ]
+            for thread in threads:
+                thread.start()
+            await asyncio.to_thread(lambda: [thread.join() for thread in threads])
+
+            received = []
+            while len(received) < 2000:
+                received.extend(await asyncio.wait_for(bridge.get(), 1))
+            for n in range(4):
+                assert [i for m, i in received if m == n] == list(range(500))
+            assert bridge.received == 2000
+            assert bridge.batches < 2000
+            assert bridge.dropped == 0
+
+        asyncio.run(scenario())
+
+    def test_full_queue_drops_and_reports(self):
+        async def scenario():
+            dropped = []
+            bridge = EventBridge(asyncio.get_running_loop(), maxsize=1, on_drop=dropped.append)
+            bridge.put("a")
+            await asyncio.sleep(0)
+            bridge.put("b")
+            bridge.put("c")
+            await asyncio.sleep(0)
+
+            assert await bridge.get() == ["a"]
+            assert bridge.dropped == 2
+            assert dropped == [2]
+
+        asyncio.run(scenario())
+
+    def test_handler_calls_coroutine_once_per_path_in_batch(self, tmp_path):
+        changed = tmp_path / "a.txt"
+
+        async def scenario():
+            seen = []
+
+            async def on_change(path):
+                seen.append(path)
+
+            handler = AsyncWatchEventHandler(on_change)
+            handler.bind()
+            # Eventos anteriores à entrega formam um único lote
+            for _ in range(3):
+                handler.on_modified(FileModifiedEvent(str(changed)))
+            for _ in range(10):
+                await asyncio.sleep(0)
+            handler.unbind()
+            assert seen == [changed]
+            assert handler.coalesced == 2
+
+        asyncio.run(scenario())
@@ -0,0 +1,54 @@
+import hashlib
+import os
+from unittest.mock import patch
+
+from src.core.hashing import HashingService, file_digest
+
+
+class TestHashingService:
+    def test_mmap_and_buffered_reads_agree(self, tmp_path):
+        file = tmp_path / "data.bin"
+        data = os.urandom(3 * 1024 * 1024 + 17)
+        file.write_bytes(data)
+
+        with patch("src.core.hashing.HASH_MMAP_MIN_SIZE", 1024):
+            mapped = file_digest(file, "blake2b")
+        buffered = file_digest(file, "blake2b")
+
+        assert mapped == buffered == hashlib.blake2b(data).hexdigest()
+
+    def test_unchanged_files_are_hashed_once(self, tmp_path):
+        files = []
+        for index in range(4):
+            file = tmp_path / f"f{index}.txt"
+            file.write_text(str(index))
+            files.append(file)
+
+        service = HashingService("sha256", workers=2)
+        with patch("src.core.hashing.file_digest", wraps=file_digest) as digest:
+            first = service.hash_files((file, None) for file in files)
+            second = service.hash_files((file, None) for file in files)
+            assert digest.call_count == 4
+
+            files[0].write_text("changed content")
+            service.hash_file(files[0])
+            assert digest.call_count == 5
+        service.shutdown()
+
+        assert first == second
+        assert first[files[1]] == hashlib.sha256(b"1").hexdigest()
+
+    def test_process_pool_executor(self, tmp_path):
+        file = tmp_path / "a.txt"
+        file.write_text("abc")
+        other = tmp_path / "b.txt"
+        other.write_text("def")
+
+        service = HashingService("sha256", executor="process", workers=2)
+        try:
+            result = service.hash_files([(file, None), (other, None)])
+        finally:
+            service.shutdown()
+
+        assert result[file] == hashlib.sha256(b"abc").hexdigest()
+        assert result[other] == hashlib.sha256(b"def").hexdigest()
@@ -0,0 +1,68 @@
+import asyncio
+
+from src.core.ignore_rules import IgnoreRules
+from src.core.scanner import walk_files
+
+
+class TestIgnoreRules:
+    def test_unanchored_pattern_matches_at_any_depth(self):
+        rules = IgnoreRules(["node_modules", "*.log"])
+
+        assert rules.match("node_modules", is_dir=True)
+        assert rules.match("web/node_modules", is_dir=True)
+        assert rules.match("web/app.log")
+        assert not rules.match("web/app.py")
+
+    def test_anchored_and_double_star(self):
+        rules = IgnoreRules(["/build", "docs/**/draft-*", "**/cache/*.bin"])
+
+        assert rules.match("build", is_dir=True)
+        assert not rules.match("src/build", is_dir=True)
+        assert rules.match("docs/draft-1.md")
+        assert rules.match("docs/a/b/draft-2.md")
+        assert rules.match("x/y/cache/data.bin")
+        assert not rules.match("x/cache/sub/data.bin")
+
+    def test_negation_last_rule_wins(self):
+        rules = IgnoreRules(["*.log", "!keep.log", "keep.log/"])
+
+        assert rules.match("app.log")
+        assert not rules.match("logs/keep.log")
+        # Regra apenas de diretório não afeta arquivos
+        assert rules.match("keep.log", is_dir=True)
+
+    def test_is_ignored_checks_parent_dirs(self):
+        rules = IgnoreRules(["tmp/", "!tmp/keep.txt"])
+
+        # Como no git, não é possível reincluir dentro de diretório ignorado
+        assert rules.is_ignored("tmp/keep.txt")
+        assert not rules.is_ignored("src/tmp.txt")
+
+    def test_deployignore_extends_config_patterns(self, tmp_path):
+        (tmp_path / ".deployignore").write_text("# comentário\n\n!important.tmp\n")
+        rules = IgnoreRules.for_source(tmp_path, ["*.tmp"])
+
+        assert rules.match("other.tmp")
+        assert not rules.match("important.tmp")
+
+    def test_walk_prunes_ignored_directories(self, tmp_path):
+        for rel in ("a.txt", "node_modules/pkg/index.js", "src/b.txt", "src/debug.log"):
+            (tmp_path / rel).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / rel).write_text(rel)
+
+        class CountingRules(IgnoreRules):
+            checked = []
+
+            def match(self, rel_path, is_dir=False):
+                self.checked.append(rel_path)
+                return super().match(rel_path, is_dir)
+
+        rules = CountingRules(["node_modules/", "*.log"])
+
+        async def collect():
+            return [f async for batch in walk_files(tmp_path, rules) for f, _ in batch]
+
+        files = asyncio.run(collect())
+
+        assert sorted(f.relative_to(tmp_path).as_posix() for f in files) == ["a.txt", "src/b.txt"]
+        assert not any(path.startswith("node_modules/") for path in rules.checked)
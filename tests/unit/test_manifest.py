@@ -0,0 +1,78 @@
+import os
+from pathlib import Path
+
+from src.core.manifest import DeployManifest
+
+
+class TestDeployManifest:
+    def _manifest(self, tmp_path: Path, source: Path) -> DeployManifest:
+        return DeployManifest(
+            "test_host", source, Path("/remote/path"), manifest_dir=tmp_path / "manifests"
+        )
+
+    def test_new_files_are_changed(self, tmp_path):
+        """Arquivos sem registro no manifesto devem ser enviados"""
+        source = tmp_path / "src"
+        source.mkdir()
+        (source / "a.txt").write_text("a")
+
+        manifest = self._manifest(tmp_path, source)
+        changed, skipped, skipped_bytes = manifest.partition([source / "a.txt"], source)
+
+        assert changed == [source / "a.txt"]
+        assert (skipped, skipped_bytes) == (0, 0)
+
+    def test_recorded_files_are_skipped_after_reload(self, tmp_path):
+        """Arquivos registrados e inalterados são pulados no próximo deploy"""
+        source = tmp_path / "src"
+        source.mkdir()
+        files = [source / "a.txt", source / "b.txt"]
+        files[0].write_text("aaa")
+        files[1].write_text("bb")
+
+        manifest = self._manifest(tmp_path, source)
+        for file in files:
+            manifest.record(file, file.relative_to(source))
+        manifest.save()
+
+        files[1].write_text("changed")
+        reloaded = self._manifest(tmp_path, source)
+        changed, skipped, skipped_bytes = reloaded.partition(files, source)
+
+        assert changed == [files[1]]
+        assert (skipped, skipped_bytes) == (1, 3)
+
+    def test_touched_file_with_same_content_is_skipped(self, tmp_path):
+        """Mudança apenas de mtime não força reenvio"""
+        source = tmp_path / "src"
+        source.mkdir()
+        file = source / "a.txt"
+        file.write_text("same")
+
+        manifest = self._manifest(tmp_path, source)
+        manifest.record(file, Path("a.txt"))
+        stat = file.stat()
+        os.utime(file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        changed, skipped, _ = manifest.partition([file], source)
+
+        assert changed == []
+        assert skipped == 1
+
+    def test_manifest_for_other_destination_is_discarded(self, tmp_path):
+        """Manifesto gravado para outro destino não é reaproveitado"""
+        source = tmp_path / "src"
+        source.mkdir()
+        file = source / "a.txt"
+        file.write_text("a")
+
+        manifest = self._manifest(tmp_path, source)
+        manifest.record(file, Path("a.txt"))
+        manifest.save()
+
+        other = DeployManifest(
+            "test_host", source, Path("/other/path"), manifest_dir=tmp_path / "manifests"
+        )
+        changed, _, _ = other.partition([file], source)
+
+        assert changed == [file]
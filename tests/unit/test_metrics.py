@@ -0,0 +1,90 @@
+import json
+
+import pytest
+
+from src.core.metrics import DeployMetrics, MetricsExporter, percentile
+from src.deployers.local_deployer import LocalDeployer
+
+
+class TestDeployMetrics:
+    def test_percentile_nearest_rank(self):
+        values = [float(n) for n in range(1, 101)]
+        assert percentile(values, 0.5) == 50
+        assert percentile(values, 0.99) == 99
+        assert percentile([], 0.5) == 0
+
+    def test_exporter_writes_json_lines_and_textfile(self, tmp_path):
+        exporter = MetricsExporter(tmp_path / "metrics", tmp_path / "prom/deploy.prom")
+        for success in (True, False):
+            metrics = DeployMetrics("web", "ssh")
+            metrics.add_phase("transfer", 2.0)
+            metrics.files_sent, metrics.bytes_sent = 4, 1000
+            for latency in (0.1, 0.2, 0.3, 0.4):
+                metrics.record_file(latency)
+            metrics.finish(success, "" if success else "boom")
+            exporter.export(metrics)
+
+        records = [json.loads(line) for line in exporter.path.read_text().splitlines()]
+        assert [record["success"] for record in records] == [True, False]
+        assert records[0]["bytes_per_second"] == 500
+        assert records[0]["latency"]["p50"] == 0.2
+
+        textfile = (tmp_path / "prom/deploy.prom").read_text()
+        assert 'noktech_deploy_runs_total{host="web",mode="deploy"} 2' in textfile
+        assert 'noktech_deploy_failures_total{host="web",mode="deploy"} 1' in textfile
+        assert 'noktech_deploy_bytes_sent_total{host="web",mode="deploy"} 2000' in textfile
+        assert 'quantile="p99"' in textfile
+        assert not list((tmp_path / "prom").glob(".*.tmp"))
+
+    def test_watch_batches_publish_queue_gauges(self, tmp_path):
+        exporter = MetricsExporter(tmp_path / "metrics", tmp_path / "deploy.prom")
+        metrics = DeployMetrics("web", "ssh", "watch")
+        metrics.lag = 0.5
+        metrics.watch = {
+            "queue_depth": 7, "pending": 5, "overflows": 1, "storms": 2,
+            "drop_syncs": 0, "failure_syncs": 0,
+        }
+        metrics.finish(True)
+        exporter.export(metrics)
+
+        record = json.loads(exporter.path.read_text())
+        assert record["watch"]["queue_depth"] == 7
+        textfile = (tmp_path / "deploy.prom").read_text()
+        assert 'noktech_deploy_watch_queue_depth{host="web",mode="watch"} 7' in textfile
+        assert 'noktech_deploy_watch_pending_changes{host="web",mode="watch"} 5' in textfile
+        assert (
+            'noktech_deploy_watch_full_syncs_total{host="web",mode="watch",cause="storm"} 2'
+            in textfile
+        )
+
+    def test_exporter_is_off_unless_configured(self, tmp_path):
+        assert MetricsExporter.for_config({}) is None
+        assert MetricsExporter.for_config({"enabled": True}) is not None
+        exporter = MetricsExporter.for_config({"path": str(tmp_path)})
+        assert exporter is not None and exporter.directory == tmp_path
+        assert MetricsExporter.for_config({"path": str(tmp_path), "enabled": False}) is None
+
+
+class TestDeployerMetrics:
+    @pytest.mark.asyncio
+    async def test_deploy_reports_phases_and_files(self, tmp_path):
+        source = tmp_path / "src"
+        (source / "sub").mkdir(parents=True)
+        for name in ("a.txt", "sub/b.txt"):
+            (source / name).write_text(name)
+
+        deployer = LocalDeployer("test_local", {
+            "source_path": str(source),
+            "dest_path": str(tmp_path / "dest"),
+            "protocol": "local",
+            "metrics": {"path": str(tmp_path / "metrics")},
+        })
+        deployer.manifest.path = tmp_path / "manifest.json"
+        await deployer.deploy()
+
+        record = json.loads(deployer.metrics_exporter.path.read_text().splitlines()[-1])
+        assert record["success"]
+        assert record["files"]["sent"] == 2
+        assert record["bytes"]["sent"] == len("a.txt") + len("sub/b.txt")
+        assert {"scan", "mkdir", "transfer", "record"} <= set(record["phases"])
+        assert record["latency"]["max"] > 0
@@ -0,0 +1,87 @@
+from contextlib import asynccontextmanager
+import asyncio
+import time
+
+import aioftp  # type: ignore
+import pytest
+
+from benchmarks.netem import LatencyProxy, LinkProfile
+from benchmarks.servers import FTPStandIn
+
+
+async def _echo(reader, writer):
+    while data := await reader.read(65536):
+        writer.write(data)
+        await writer.drain()
+    writer.close()
+
+
+@asynccontextmanager
+async def _echo_server():
+    server = await asyncio.start_server(_echo, "127.0.0.1", 0)
+    try:
+        yield server.sockets[0].getsockname()[1]
+    finally:
+        server.close()
+
+
+class TestLatencyProxy:
+    @pytest.mark.asyncio
+    async def test_delay_and_bandwidth_shape_the_link(self):
+        async with _echo_server() as echo_port, LatencyProxy(
+            "127.0.0.1", echo_port, LinkProfile(delay=0.05)
+        ) as proxy:
+            reader, writer = await asyncio.open_connection("127.0.0.1", proxy.port)
+            started = time.perf_counter()
+            for _ in range(3):
+                writer.write(b"x")
+                await writer.drain()
+                await reader.readexactly(1)
+            assert time.perf_counter() - started >= 0.3
+            # A primeira ida não vem de uma resposta, então não abre turno
+            assert proxy.turns == 2
+            writer.close()
+
+        async with _echo_server() as echo_port, LatencyProxy(
+            "127.0.0.1", echo_port, LinkProfile(bandwidth=1e6)
+        ) as proxy:
+            reader, writer = await asyncio.open_connection("127.0.0.1", proxy.port)
+            started = time.perf_counter()
+            writer.write(b"y" * 300_000)
+            await reader.readexactly(300_000)
+            assert time.perf_counter() - started >= 0.3
+            writer.close()
+
+    @pytest.mark.asyncio
+    async def test_drop_after_and_refused_connects(self):
+        profile = LinkProfile(drop_after=1000, fail_connects=1)
+        async with _echo_server() as echo_port, LatencyProxy(
+            "127.0.0.1", echo_port, profile
+        ) as proxy:
+            reader, writer = await asyncio.open_connection("127.0.0.1", proxy.port)
+            with pytest.raises((ConnectionError, asyncio.IncompleteReadError)):
+                await reader.readexactly(1)
+
+            reader, writer = await asyncio.open_connection("127.0.0.1", proxy.port)
+            writer.write(b"z" * 5000)
+            received = b""
+            with pytest.raises((ConnectionError, asyncio.IncompleteReadError)):
+                while True:
+                    received += await reader.readexactly(1)
+            # Cortada no meio do caminho: só parte dos bytes passa
+            assert len(received) < 1000
+            assert (proxy.refused, proxy.dropped) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_ftp_data_connections_go_through_the_proxy(self, tmp_path):
+        source = tmp_path / "index.html"
+        source.write_text("<html></html>")
+        async with FTPStandIn(tmp_path / "root") as ftp:
+            async with LatencyProxy(ftp.host, ftp.port, LinkProfile(), ftp=True) as proxy:
+                async with aioftp.Client.context(
+                    "127.0.0.1", proxy.port, ftp.user, ftp.password
+                ) as client:
+                    await client.upload(source, "/index.html", write_into=True)
+                # Controle + a conexão de dados anunciada pelo EPSV reescrito
+                assert proxy.connections == 2
+        assert (tmp_path / "root" / "index.html").read_text() == "<html></html>"
@@ -0,0 +1,32 @@
+from pathlib import Path
+from unittest.mock import mock_open, patch
+
+from src.core.observers import choose_backend, filesystem_type
+
+MOUNTS = (
+    "/dev/sda1 / ext4 rw 0 0\n"
+    "server:/export /mnt/share nfs4 rw 0 0\n"
+    "//nas/dados /mnt/my\\040files cifs rw 0 0\n"
+)
+
+
+class TestObserverSelection:
+    def _fs_type(self, path):
+        with patch("src.core.observers.sys.platform", "linux"), \
+                patch("builtins.open", mock_open(read_data=MOUNTS)), \
+                patch.object(Path, "resolve", lambda self: self):
+            return filesystem_type(Path(path))
+
+    def test_longest_mount_point_wins(self):
+        assert self._fs_type("/home/app") == "ext4"
+        assert self._fs_type("/mnt/share/site") == "nfs4"
+        assert self._fs_type("/mnt/my files/site") == "cifs"
+        assert self._fs_type("/mnt/sharedir") == "ext4"
+
+    def test_auto_uses_polling_only_on_network_filesystems(self):
+        with patch("src.core.observers.filesystem_type", return_value="nfs4"):
+            assert choose_backend(Path("/mnt/share"), "auto") == ("polling", "nfs4")
+            assert choose_backend(Path("/mnt/share"), "native")[0] == "native"
+        with patch("src.core.observers.filesystem_type", return_value="ext4"):
+            assert choose_backend(Path("/srv"), "auto") == ("native", "ext4")
+            assert choose_backend(Path("/srv"), "polling")[0] == "polling"
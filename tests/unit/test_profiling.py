@@ -0,0 +1,46 @@
+import asyncio
+import json
+import pstats
+
+from src.core import profiling
+from src.core.metrics import DeployMetrics
+
+
+class TestDiagnostics:
+    def test_trace_has_phase_spans_per_task(self, tmp_path):
+        async def scenario():
+            metrics = DeployMetrics("web", "ssh")
+
+            async def worker():
+                with metrics.phase("transfer"):
+                    await asyncio.sleep(0.01)
+
+            with profiling.span("deploy"):
+                await asyncio.gather(worker(), worker())
+
+        trace_file = tmp_path / "run.trace.json"
+        with profiling.diagnostics(tmp_path / "run.prof", trace_file, memory=True):
+            asyncio.run(scenario())
+
+        trace = json.loads(trace_file.read_text())
+        spans = [event for event in trace["traceEvents"] if event["ph"] == "X"]
+        transfers = [event for event in spans if event["name"] == "transfer"]
+        assert len(transfers) == 2
+        assert transfers[0]["tid"] != transfers[1]["tid"]
+        assert transfers[0]["args"] == {"host": "web"}
+        assert any(event["name"] == "deploy" for event in spans)
+        assert trace["otherData"]["memory"]["peak_bytes"] > 0
+        assert pstats.Stats(str(tmp_path / "run.prof")).total_calls > 0
+
+    def test_spans_are_noops_without_trace(self, tmp_path):
+        with profiling.diagnostics():
+            with profiling.span("deploy"):
+                profiling.record_span("file", "file", 0.0, 1.0)
+        assert list(tmp_path.iterdir()) == []
+
+    def test_output_path_defaults_to_profiles_dir(self):
+        assert profiling.output_path(None, ".prof") is None
+        assert profiling.output_path("x.prof", ".prof").name == "x.prof"
+        default = profiling.output_path("", ".trace.json")
+        assert default.parent.name == "profiles"
+        assert default.name.endswith(".trace.json")
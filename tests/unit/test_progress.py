@@ -0,0 +1,91 @@
+import asyncio
+import io
+from unittest.mock import Mock
+
+import pytest
+
+from src.core.progress import ProgressManager
+from src.deployers.local_deployer import LocalDeployer
+
+
+class _Terminal(io.StringIO):
+    def isatty(self):
+        return True
+
+
+class TestProgressManager:
+    def test_files_processed_counts_files_not_chunks(self):
+        progress = ProgressManager(stream=io.StringIO())
+        progress.start_transfer(300, 2)
+        for _ in range(3):
+            progress.update_progress(50, "a.txt")
+        progress.file_completed("a.txt")
+        progress.update_progress(150, "b.txt", bytes_sent=10)
+        progress.file_completed("b.txt")
+
+        assert progress.stats.files_processed == 2
+        assert progress.stats.bytes_transferred == 300
+        assert progress.stats.bytes_sent == 160
+        assert progress.stats.progress == 100
+
+    def test_speed_is_smoothed(self):
+        progress = ProgressManager(stream=io.StringIO())
+        progress.start_transfer(10_000, 1)
+        start = progress.stats.start_time
+
+        progress.update_progress(1000, "a")
+        progress.sample(start + 1)
+        assert progress.stats.rate == 1000
+
+        # Uma pausa curta não derruba a velocidade a zero
+        progress.sample(start + 1.1)
+        assert 900 < progress.stats.rate < 1000
+
+    def test_non_tty_logs_instead_of_drawing(self):
+        lines = []
+
+        async def scenario():
+            stream = io.StringIO()
+            progress = ProgressManager(stream=stream)
+            progress.logger = Mock(info=lines.append)
+            progress.log_interval = 0.01
+            progress.start_transfer(100, 1)
+            progress.update_progress(40, "a")
+            await asyncio.sleep(0.05)
+            progress.complete()
+            return stream.getvalue()
+
+        assert asyncio.run(scenario()) == ""
+        progress_lines = [line for line in lines if line.startswith("Progress:")]
+        # Sem novos bytes, a linha não se repete a cada intervalo
+        assert len(progress_lines) == 1
+        assert "40.0%" in progress_lines[0]
+
+    @pytest.mark.asyncio
+    async def test_failed_transfer_stops_the_renderer(self, tmp_path):
+        source = tmp_path / "src"
+        source.mkdir()
+        deployer = LocalDeployer("test_local", {
+            "source_path": str(source),
+            "dest_path": str(tmp_path / "dest"),
+            "protocol": "local",
+        })
+        deployer.progress = ProgressManager(stream=_Terminal())
+        deployer.progress.render_interval = 0.01
+
+        async def failing_scan(path):
+            await deployer.begin_scan()
+            deployer.progress.update_progress(10, "a.txt")
+            await asyncio.sleep(0.05)
+            raise ConnectionError("link down")
+
+        deployer.stream_directory = failing_scan
+        with pytest.raises(ConnectionError):
+            await deployer.deploy()
+
+        # Sem tarefa de desenho viva, e a linha da barra foi encerrada
+        assert deployer.progress._renderer is None
+        frames = deployer.progress.stream.getvalue()
+        assert frames.startswith("\r[") and frames.endswith("\n")
+        await asyncio.sleep(0.05)
+        assert deployer.progress.stream.getvalue() == frames
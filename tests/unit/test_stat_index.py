@@ -0,0 +1,55 @@
+import os
+
+from src.core.hashing import file_digest
+from src.core.manifest import DeployManifest
+from src.core.stat_index import StatIndex
+
+
+class TestStatIndex:
+    def test_hash_is_reused_until_signature_changes(self, tmp_path):
+        """Hash só é recalculado quando inode, tamanho ou mtime mudam"""
+        file = tmp_path / "a.txt"
+        file.write_text("content")
+        calls = []
+
+        def compute(path):
+            calls.append(path)
+            return file_digest(path)
+
+        index = StatIndex(tmp_path, index_dir=tmp_path / "index")
+        first = index.digest(file, "a.txt", compute)
+        assert index.digest(file, "a.txt", compute) == first
+        assert len(calls) == 1
+
+        stat = file.stat()
+        os.utime(file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        index.digest(file, "a.txt", compute)
+        assert len(calls) == 2
+
+    def test_index_persists_between_runs(self, tmp_path):
+        """Hash registrado é lido por uma nova instância após o flush"""
+        file = tmp_path / "a.txt"
+        file.write_text("content")
+
+        index = StatIndex(tmp_path, index_dir=tmp_path / "index")
+        digest = index.digest(file, "a.txt", file_digest)
+        index.close()
+
+        reopened = StatIndex(tmp_path, index_dir=tmp_path / "index")
+        assert reopened.lookup("a.txt", file.stat()) == digest
+
+    def test_manifest_record_uses_index(self, tmp_path):
+        """Manifesto de outro host reaproveita o hash já indexado"""
+        source = tmp_path / "src"
+        source.mkdir()
+        file = source / "a.txt"
+        file.write_text("content")
+
+        index = StatIndex(source, index_dir=tmp_path / "index")
+        index.store("a.txt", file.stat(), "cached-digest")
+        manifest = DeployManifest(
+            "other_host", source, tmp_path / "dest", manifest_dir=tmp_path, index=index
+        )
+        manifest.record(file, file.relative_to(source))
+
+        assert manifest.entries["a.txt"].hash == "cached-digest"